@@ -2,18 +2,33 @@
 경기 기후 체감 맵 - Vercel Serverless API
 """
 from http.server import BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
-from urllib.request import urlopen
-from urllib.error import URLError
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlparse, urlsplit, parse_qs, unquote
+import cProfile
+import heapq
+import hmac
+import io
+import itertools
 import json
+import math
+import os
+import pstats
 import random
 import re
-from datetime import datetime
+import struct
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 
 # 기상청 API 설정
 KMA_AUTH_KEY = "DbUh4_ekRRi1IeP3pPUYog"
 KMA_FORECAST_KEY = "Ns9jp8v2RkSPY6fL9gZEeg"  # 예보 API 인증키
-KMA_BASE_URL = "https://apihub.kma.go.kr/api/typ01/url"
+KMA_BASE_URL = os.environ.get("KMA_BASE_URL", "https://apihub.kma.go.kr/api/typ01/url")  # 로컬 대역 서버로 교체 가능
 KMA_COLUMNS = [
     'TM', 'STN', 'WD', 'WS', 'GST_WD', 'GST_WS', 'GST_TM',
     'PA', 'PS', 'PT', 'PR', 'TA', 'TD', 'HM', 'PV',
@@ -24,57 +39,790 @@ KMA_COLUMNS = [
     'ST_SEA', 'WH', 'BF', 'IR', 'IX'
 ]
 
+# 요청 단계 추적: Server-Timing 헤더를 붙일 요청 비율(0~1), 트레이스 로그 출력 여부
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_LOG = os.environ.get("TRACE_LOG", "false").lower() in ("1", "true", "yes")
+_trace_local = threading.local()
+
+
+class RequestTrace:
+    """한 요청의 단계별 소요 시간 (같은 이름의 단계는 합산)"""
+
+    def __init__(self, route):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.route = route
+        self.start = time.perf_counter()
+        self.spans = []
+
+    def server_timing(self):
+        totals = {}
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "route": self.route,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 2),
+            "spans": [
+                {"name": name, "offset_ms": round((start - self.start) * 1000, 2), "duration_ms": round(duration * 1000, 2)}
+                for name, start, duration in self.spans
+            ],
+        }
+
+
+def start_trace(route):
+    """샘플링 비율에 따라 트레이스 시작 (미샘플링이면 None)"""
+    if TRACE_SAMPLE_RATE <= 0 or (TRACE_SAMPLE_RATE < 1 and random.random() >= TRACE_SAMPLE_RATE):
+        _trace_local.trace = None
+        return None
+    trace = RequestTrace(route)
+    _trace_local.trace = trace
+    return trace
+
+
+def finish_trace(trace):
+    _trace_local.trace = None
+    if TRACE_LOG:
+        print("trace " + json.dumps(trace.to_dict(), ensure_ascii=False))
+
+
+@contextmanager
+def span(name):
+    """현재 요청의 단계 기록 (트레이스가 없으면 no-op)"""
+    trace = getattr(_trace_local, "trace", None)
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append((name, start, time.perf_counter() - start))
+
+
+# 운영자 토큰 (X-Profile 헤더, /api/admin 엔드포인트 인증), 요청 프로파일링 샘플링 비율과 저장 위치
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/climate-profiles")
+PROFILE_LOG_LINES = 40
+
+
+def is_admin(token):
+    """운영자 토큰 확인 (토큰 미설정 시 항상 거부)"""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def start_profile(header_token):
+    """
+    운영자 헤더 또는 샘플링으로 선택된 요청만 cProfile 시작 (아니면 None)
+    다른 요청이 이미 프로파일링 중이면 건너뜀
+    """
+    if not (is_admin(header_token) or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
+
+
+def profile_text(path, limit=PROFILE_LOG_LINES):
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def finish_profile(profiler, route):
+    """
+    프로파일 저장 후 ID 반환
+    /tmp는 인스턴스마다 따로이므로 요약을 로그에도 남김 (Vercel 로그에서 조회 가능)
+    """
+    profiler.disable()
+    profile_id = uuid.uuid4().hex[:16]
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, profile_id + ".prof")
+    profiler.dump_stats(path)
+    print(f"profile {profile_id} {route}\n{profile_text(path)}")
+    return profile_id
+
+
+# 기상청 호출 기한(초)/재시도 횟수, 회로 차단 기준 (연속 실패 횟수, 차단 유지 초)
+KMA_CONNECT_TIMEOUT = float(os.environ.get("KMA_CONNECT_TIMEOUT", "3"))
+KMA_READ_TIMEOUT = float(os.environ.get("KMA_READ_TIMEOUT", "8"))
+KMA_DEADLINE_SECONDS = float(os.environ.get("KMA_DEADLINE_SECONDS", "15"))
+KMA_RETRIES = int(os.environ.get("KMA_RETRIES", "2"))
+KMA_BREAKER_FAILURES = int(os.environ.get("KMA_BREAKER_FAILURES", "3"))
+KMA_BREAKER_RESET_SECONDS = float(os.environ.get("KMA_BREAKER_RESET_SECONDS", "30"))
+RETRY_BACKOFF_BASE = 0.2
+RETRY_BACKOFF_MAX = 2.0
+# 엔드포인트별 마지막 정상 응답 수/추정 크기 상한 (요청 키가 사용자 입력이므로 둘 다 제한)
+LAST_GOOD_MAX_ENTRIES = 64
+LAST_GOOD_MAX_BYTES = 16 * 1024 * 1024
+_SCALAR_BYTES = 32
+
+
+class UpstreamStatusError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} 호출 차단 중 ({retry_after:.0f}초 후 재시도)")
+        self.retry_after = retry_after
+
+
+# 호스트별 keep-alive 연결 (웜 인스턴스의 연속 요청, 배치 하위 요청이 재사용)
+KMA_POOL_SIZE = 4
+_idle_connections = {}
+_pool_lock = threading.Lock()
+
+
+def _take_connection(key):
+    with _pool_lock:
+        idle = _idle_connections.get(key)
+        return idle.pop() if idle else None
+
+
+def _release_connection(key, conn):
+    with _pool_lock:
+        idle = _idle_connections.setdefault(key, [])
+        if len(idle) < KMA_POOL_SIZE:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+@contextmanager
+def kma_open(url):
+    """
+    연결/읽기 기한을 따로 적용한 GET (2xx가 아니면 UpstreamStatusError)
+    응답을 끝까지 읽었고 서버가 연결을 유지하면 풀에 반납해 다음 호출이 재사용
+    """
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.hostname, parts.port)
+    connection_class = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+    conn = _take_connection(key)
+    reused = conn is not None
+    response = None
+    try:
+        while True:
+            if conn is None:
+                conn, reused = connection_class(parts.hostname, parts.port, timeout=KMA_CONNECT_TIMEOUT), False
+                conn.connect()
+            conn.sock.settimeout(KMA_READ_TIMEOUT)
+            try:
+                conn.request("GET", parts.path + ("?" + parts.query if parts.query else ""))
+                response = conn.getresponse()
+                break
+            except (OSError, HTTPException):
+                # 재사용한 연결을 서버가 이미 닫았으면 새 연결로 한 번 더
+                conn.close()
+                conn = None
+                if not reused:
+                    raise
+        if not 200 <= response.status < 300:
+            raise UpstreamStatusError(response.status)
+        yield response
+    finally:
+        if conn is not None:
+            if response is not None and response.isclosed() and not response.will_close:
+                _release_connection(key, conn)
+            else:
+                conn.close()
+
+
+def approx_size(value):
+    """응답의 추정 크기 (바이트, 스칼라만 담은 목록은 None이 아닌 원소당 _SCALAR_BYTES)"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (dict, list, tuple)):
+            return sys.getsizeof(value) + sum(approx_size(item) for item in value)
+        return sys.getsizeof(value) + (len(value) - value.count(None)) * _SCALAR_BYTES
+    return sys.getsizeof(value)
+
+
+def is_retryable(error):
+    if isinstance(error, UpstreamStatusError):
+        return error.status >= 500
+    return isinstance(error, (OSError, HTTPException))
+
+
+class GuardedUpstream:
+    """
+    엔드포인트별 회로 차단 + 재시도 + 마지막 정상 응답 대체
+    - 연속 실패가 KMA_BREAKER_FAILURES에 도달하면 KMA_BREAKER_RESET_SECONDS 동안 호출 차단 (open)
+    - 이후 한 요청만 시험 호출 (half_open), 성공하면 다시 정상
+    - 4xx·파싱 오류는 성공도 실패도 아님 (상태는 그대로, 시험 호출이었으면 자리만 비움)
+    - 차단 중이거나 재시도까지 실패하면 같은 요청의 마지막 정상 응답을 stale 표시와 함께 반환
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.last_good = OrderedDict()
+        self.last_good_bytes = 0
+        self.lock = threading.Lock()
+
+    def retry_after(self):
+        return max(0.0, KMA_BREAKER_RESET_SECONDS - (time.monotonic() - self.opened_at))
+
+    def allow(self):
+        """(호출 가능 여부, 시험 호출 여부)"""
+        with self.lock:
+            if self.state == "closed":
+                return True, False
+            if (self.state == "open" and self.retry_after() > 0) or self.trial_in_flight:
+                return False, False
+            self.state = "half_open"
+            self.trial_in_flight = True
+            return True, True
+
+    def record(self, key, result, error=None, trial=False):
+        with self.lock:
+            if error is not None and not is_retryable(error):
+                if trial:
+                    self.trial_in_flight = False
+                return
+            self.trial_in_flight = False
+            if error is None:
+                self.state = "closed"
+                self.failures = 0
+            else:
+                self.failures += 1
+                if self.state == "half_open" or self.failures >= KMA_BREAKER_FAILURES:
+                    self.state = "open"
+                    self.opened_at = time.monotonic()
+            if result is not None:
+                self._remember(key, result)
+
+    def _remember(self, key, result):
+        """마지막 정상 응답 보관 (혼자서 상한을 넘는 응답은 보관하지 않음, lock 안에서 호출)"""
+        previous = self.last_good.pop(key, None)
+        if previous is not None:
+            self.last_good_bytes -= previous[2]
+        size = approx_size(result)
+        if size > LAST_GOOD_MAX_BYTES:
+            return
+        self.last_good[key] = (time.time(), result, size)
+        self.last_good_bytes += size
+        while len(self.last_good) > LAST_GOOD_MAX_ENTRIES or self.last_good_bytes > LAST_GOOD_MAX_BYTES:
+            self.last_good_bytes -= self.last_good.popitem(last=False)[1][2]
+
+    def stale_or_raise(self, key, error):
+        entry = self.last_good.get(key)
+        if entry is None:
+            raise error
+        stored_at, value, _ = entry
+        return {**value, "stale": True, "staleSeconds": int(time.time() - stored_at)}
+
+    def call(self, key, fetch):
+        allowed, trial = self.allow()
+        if not allowed:
+            return self.stale_or_raise(key, CircuitOpenError(self.name, self.retry_after()))
+        deadline = time.monotonic() + KMA_DEADLINE_SECONDS
+        attempt = 0
+        while True:
+            try:
+                result = fetch()
+            except Exception as e:
+                attempt += 1
+                backoff = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+                if (is_retryable(e) and attempt <= KMA_RETRIES
+                        and deadline - time.monotonic() - backoff > KMA_CONNECT_TIMEOUT):
+                    time.sleep(backoff)
+                    continue
+                self.record(key, None, e, trial)
+                return self.stale_or_raise(key, e)
+            self.record(key, result)
+            return result
+
+
+_upstreams = {}
+_upstreams_lock = threading.Lock()
+
+
+def guarded(name):
+    with _upstreams_lock:
+        if name not in _upstreams:
+            _upstreams[name] = GuardedUpstream(name)
+        return _upstreams[name]
+
+
+_KMA_NUMBER = re.compile(r'^-?\d+\.?\d*$')
+
+
+def _kma_token(value):
+    """결측값(-9, -99.0, -9.0)은 None, 숫자는 float, 그 외는 문자열"""
+    if value in ('-9', '-99.0', '-9.0'):
+        return None
+    if _KMA_NUMBER.match(value):
+        return float(value)
+    return value
+
+
+def parse_kma_columns(text):
+    """기상청 API 텍스트 응답을 컬럼 버퍼로 파싱 (KMA_COLUMNS 순서, 컬럼 → 행별 값 목록)"""
+    width = len(KMA_COLUMNS)
+    padding = [None] * width
+    rows = []
+    for line in text.split('\n'):
+        if not line.strip() or line.startswith('#') or 'END7777' in line or 'START7777' in line:
+            continue
+        values = [_kma_token(value) for value in line.split()[:width]]
+        if len(values) < width:
+            values += padding[len(values):]
+        rows.append(values)
+    if not rows:
+        return {col: [] for col in KMA_COLUMNS}
+    return {col: list(values) for col, values in zip(KMA_COLUMNS, zip(*rows))}
+
+
+def kma_rows(columns):
+    """컬럼 버퍼 → 기존 JSON 형태의 행 목록"""
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
 
 def parse_kma_response(text):
     """기상청 API 텍스트 응답을 JSON으로 파싱"""
-    lines = [
-        line for line in text.split('\n')
-        if line.strip() and not line.startswith('#')
-        and 'END7777' not in line and 'START7777' not in line
-    ]
+    return kma_rows(parse_kma_columns(text))
+
+
+_json_encode = json.JSONEncoder(ensure_ascii=False).encode
+# JSON 직렬화 시 한 번에 만드는 행 dict 수
+JSON_CHUNK_ROWS = 256
+
+
+def kma_json(result):
+    """조회 결과의 컬럼 버퍼를 행 목록("data")으로 바꾼 JSON 응답 본문 (행 dict는 JSON_CHUNK_ROWS행씩만 만들어 바로 직렬화)"""
+    body = {key: value for key, value in result.items() if key != "columns"}
+    columns = result["columns"]
+    names = list(columns)
+    rows = zip(*columns.values())
+    parts = []
+    while True:
+        chunk = [dict(zip(names, values)) for values in itertools.islice(rows, JSON_CHUNK_ROWS)]
+        if not chunk:
+            break
+        parts.append(_json_encode(chunk)[1:-1].encode('utf-8'))
+    head = (_json_encode(body)[:-1] + (", " if body else "") + '"data": [').encode('utf-8')
+    if not parts:
+        return head + b"]}"
+    # 앞뒤를 첫/마지막 조각에 붙여 전체 본문 복사를 한 번(join)으로 줄임
+    parts[0] = head + parts[0]
+    parts[-1] += b"]}"
+    return b", ".join(parts)
+
+
+def kma_columnar(result):
+    """조회 결과의 컬럼 버퍼를 그대로 "data"(컬럼 → 값 배열)로 둔 MessagePack 응답 본문"""
+    body = {key: value for key, value in result.items() if key != "columns"}
+    body["data"] = compact_columns(result["columns"])
+    return body
+
+
+# --- 컬럼형 바이너리 응답 (MessagePack, backend/columnar.py와 동일) ---
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+_DOUBLE = struct.Struct(">Bd")
+# msgpack 정수 범위 (음수는 int64, 양수는 uint64까지)
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 64) - 1
+
+
+def wants_msgpack(accept):
+    """Accept 헤더에 MessagePack이 있는지 (q=0은 거부로 간주)"""
+    if not accept:
+        return False
+    for part in accept.split(","):
+        media, *params = part.split(";")
+        if media.strip().lower() not in MSGPACK_MEDIA_TYPES:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _pack_int(n, out):
+    if 0 <= n < 0x80:
+        out.append(n)
+    elif -0x20 <= n < 0:
+        out.append(n & 0xFF)
+    elif 0 <= n <= 0xFF:
+        out += b"\xcc" + n.to_bytes(1, "big")
+    elif 0 <= n <= 0xFFFF:
+        out += b"\xcd" + n.to_bytes(2, "big")
+    elif 0 <= n <= 0xFFFFFFFF:
+        out += b"\xce" + n.to_bytes(4, "big")
+    elif n > 0:
+        out += b"\xcf" + n.to_bytes(8, "big")
+    elif n >= -0x80:
+        out += b"\xd0" + n.to_bytes(1, "big", signed=True)
+    elif n >= -0x8000:
+        out += b"\xd1" + n.to_bytes(2, "big", signed=True)
+    elif n >= -0x80000000:
+        out += b"\xd2" + n.to_bytes(4, "big", signed=True)
+    else:
+        out += b"\xd3" + n.to_bytes(8, "big", signed=True)
 
-    data = []
-    for line in lines:
-        values = line.strip().split()
-        record = {}
-        for idx, col in enumerate(KMA_COLUMNS):
-            if idx < len(values):
-                value = values[idx]
-                if value in ['-9', '-99.0', '-9.0']:
-                    record[col] = None
-                elif re.match(r'^-?\d+\.?\d*$', value):
-                    record[col] = float(value)
-                else:
-                    record[col] = value
+
+def _pack_header(n, fix, fix_max, tag16, tag32, out):
+    if n <= fix_max:
+        out.append(fix | n)
+    elif n <= 0xFFFF:
+        out += tag16 + n.to_bytes(2, "big")
+    else:
+        out += tag32 + n.to_bytes(4, "big")
+
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, float):
+        if obj.is_integer() and _INT_MIN <= obj <= _INT_MAX:
+            _pack_int(int(obj), out)
+        else:
+            out += _DOUBLE.pack(0xCB, obj)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n <= 31:
+            out.append(0xA0 | n)
+        elif n <= 0xFF:
+            out += b"\xd9" + n.to_bytes(1, "big")
+        else:
+            _pack_header(n, 0, -1, b"\xda", b"\xdb", out)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n <= 0xFF:
+            out += b"\xc4" + n.to_bytes(1, "big")
+        else:
+            _pack_header(n, 0, -1, b"\xc5", b"\xc6", out)
+        out += obj
+    elif isinstance(obj, dict):
+        _pack_header(len(obj), 0x80, 15, b"\xde", b"\xdf", out)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    elif isinstance(obj, (list, tuple)):
+        _pack_header(len(obj), 0x90, 15, b"\xdc", b"\xdd", out)
+        _pack_values(obj, out)
+    else:
+        raise TypeError(f"MessagePack으로 인코딩할 수 없는 타입: {type(obj).__name__}")
+
+
+def _pack_values(values, out):
+    """배열 원소 인코딩 (결측/작은 정수/실수는 함수 호출 없이 처리)"""
+    append = out.append
+    pack_double = _DOUBLE.pack
+    for value in values:
+        cls = type(value)
+        if value is None:
+            append(0xC0)
+        elif cls is float:
+            if value.is_integer() and -0x20 <= value < 0x80:
+                append(int(value) & 0xFF)
+            elif value.is_integer() and _INT_MIN <= value <= _INT_MAX:
+                _pack_int(int(value), out)
+            else:
+                out += pack_double(0xCB, value)
+        elif cls is int and -0x20 <= value < 0x80:
+            append(value & 0xFF)
+        else:
+            _pack(value, out)
+
+
+def packb(obj):
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def compact_columns(columns):
+    """모두 결측인 컬럼은 None으로 (컬럼 목록과 순서는 유지)"""
+    return {name: None if values and all(v is None for v in values) else values for name, values in columns.items()}
+
+
+# Accept에 따라 MessagePack 컬럼형 응답을 지원하는 경로
+COLUMNAR_PATHS = ('/api/kma', '/api/kma-period', '/api/climate/all')
+# 컬럼형 전체 시군 응답의 점수 컬럼 (climate_data 항목은 그 뒤에 펼쳐서 추가)
+ALL_REGIONS_SCORE_COLUMNS = ("region", "lat", "lng", "score", "adjusted_score", "risk_level", "risk_label", "risk_color")
+
+
+def all_regions_columns(result):
+    """get_all_climate_data 결과 → 컬럼형 응답 (시군 31곳이라 행에서 바로 전치)"""
+    regions = result["regions"]
+    columns = {name: [r[name] for r in regions] for name in ALL_REGIONS_SCORE_COLUMNS}
+    for name in (regions[0]["climate_data"] if regions else ()):
+        if name not in columns:
+            columns[name] = [r["climate_data"].get(name) for r in regions]
+    return {"count": len(regions), "timestamp": result["timestamp"], "regions": compact_columns(columns)}
+
+
+def calculate_apparent_temperatures(temps, humidities=None, wind_speeds=None):
+    """
+    체감온도 일괄 계산 (관측소 컬럼/예보 시간 전체를 한 번에)
+    - 27°C 이상: 여름철 체감온도 (습구온도 기반, 기상청)
+    - 10°C 이하, 풍속 1.3m/s 이상: 겨울철 체감온도 (풍속 냉각)
+    - 습도/풍속이 없으면 50%, 2.0m/s
+    """
+    n = len(temps)
+    humidities = humidities if humidities is not None else [None] * n
+    wind_speeds = wind_speeds if wind_speeds is not None else [None] * n
+    atan, sqrt = math.atan, math.sqrt
+    result = []
+    append = result.append
+
+    for t, rh, v in zip(temps, humidities, wind_speeds):
+        if t is None:
+            append(None)
+        elif t >= 27:
+            if rh is None:
+                rh = 50.0
+            tw = (t * atan(0.151977 * sqrt(rh + 8.313659)) + atan(t + rh) - atan(rh - 1.67633)
+                  + 0.00391838 * rh ** 1.5 * atan(0.023101 * rh) - 4.686035)
+            append(round(-0.2442 + 0.55399 * tw + 0.45535 * t - 0.0022 * tw * tw + 0.00278 * tw * t + 3.0, 1))
+        elif t <= 10:
+            if v is None:
+                v = 2.0
+            if v >= 1.3:
+                vk = (v * 3.6) ** 0.16
+                append(round(13.12 + 0.6215 * t - 11.37 * vk + 0.3965 * vk * t, 1))
             else:
-                record[col] = None
-        data.append(record)
-    return data
+                append(round(t, 1))
+        else:
+            append(round(t, 1))
+    return result
+
+
+def add_apparent_temperature(columns):
+    """관측 행 전체의 체감온도(AT)를 TA/HM/WS 컬럼 단위로 한 번에 계산해 컬럼으로 추가"""
+    columns['AT'] = calculate_apparent_temperatures(columns['TA'], columns['HM'], columns['WS'])
+    return columns
 
 
 def fetch_kma_data(tm, stn="0"):
-    """기상청 API 호출"""
-    try:
-        url = f"{KMA_BASE_URL}/kma_sfctm2.php?tm={tm}&stn={stn}&authKey={KMA_AUTH_KEY}"
-        with urlopen(url, timeout=30) as response:
+    """기상청 API 호출 (차단 중/장애 시 마지막 정상 응답을 stale로 반환)"""
+    url = f"{KMA_BASE_URL}/kma_sfctm2.php?tm={tm}&stn={stn}&authKey={KMA_AUTH_KEY}"
+
+    def fetch():
+        with span("fetch"), kma_open(url) as response:
             text = response.read().decode('utf-8')
-            data = parse_kma_response(text)
-            return {"success": True, "datetime": tm, "count": len(data), "data": data}
+        with span("parse"):
+            columns = add_apparent_temperature(parse_kma_columns(text))
+        return {"success": True, "datetime": tm, "count": len(columns["TM"]), "columns": columns}
+
+    try:
+        return guarded("kma_sfctm2").call((tm, stn), fetch)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 def fetch_kma_period(tm1, tm2, stn="0"):
-    """기상청 기간 API 호출"""
-    try:
-        url = f"{KMA_BASE_URL}/kma_sfctm3.php?tm1={tm1}&tm2={tm2}&stn={stn}&authKey={KMA_AUTH_KEY}"
-        with urlopen(url, timeout=30) as response:
+    """기상청 기간 API 호출 (차단 중/장애 시 마지막 정상 응답을 stale로 반환)"""
+    url = f"{KMA_BASE_URL}/kma_sfctm3.php?tm1={tm1}&tm2={tm2}&stn={stn}&authKey={KMA_AUTH_KEY}"
+
+    def fetch():
+        with span("fetch"), kma_open(url) as response:
             text = response.read().decode('utf-8')
-            data = parse_kma_response(text)
-            return {"success": True, "startTime": tm1, "endTime": tm2, "count": len(data), "data": data}
+        with span("parse"):
+            columns = add_apparent_temperature(parse_kma_columns(text))
+        return {"success": True, "startTime": tm1, "endTime": tm2, "count": len(columns["TM"]), "columns": columns}
+
+    try:
+        return guarded("kma_sfctm3").call((tm1, tm2, stn), fetch)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+# 경기도 ASOS 관측소 → 시군
+KMA_STATION_REGIONS = {98: "동두천시", 99: "파주시", 119: "수원시", 202: "양평군", 203: "이천시"}
+KMA_MISSING_VALUES = ('-9', '-99.0', '-9.0')
+KST = timezone(timedelta(hours=9))
+
+# 완료된 날짜의 일별 통계 캐시: (stn, YYYYMMDD) → {"stations", "regions"}
+DAILY_CACHE_MAX_DAYS = 512
+# 일별 통계 한 번에 조회할 수 있는 최대 일수
+DAILY_MAX_DAYS = 366
+_daily_cache = OrderedDict()
+# 배치 하위 요청이 스레드로 동시에 실행되므로 갱신은 잠금 안에서
+_daily_cache_lock = threading.Lock()
+
+
+def _kma_value(values, idx):
+    """결측이면 None, 아니면 float"""
+    if idx >= len(values) or values[idx] in KMA_MISSING_VALUES:
+        return None
+    try:
+        return float(values[idx])
+    except ValueError:
+        return None
+
+
+class DailyAggregator:
+    """기간 응답을 한 줄씩 받아 관측소/일 단위 통계 누적 (TA, HM, WS, RN 컬럼만 읽음)"""
+
+    TA_MIN, TA_MAX, TA_SUM, TA_N, RN_SUM, HM_SUM, HM_N, WS_MAX, N = range(9)
+
+    def __init__(self):
+        self._acc = {}
+
+    def add_line(self, line):
+        if not line or line.startswith('#') or 'END7777' in line or 'START7777' in line:
+            return
+        values = line.split()
+        if len(values) <= 15:
+            return
+        try:
+            date = values[0][:8]
+            stn = int(values[1])
+        except ValueError:
+            return
+
+        acc = self._acc.get((date, stn))
+        if acc is None:
+            acc = self._acc[(date, stn)] = [None, None, 0.0, 0, 0.0, 0.0, 0, None, 0]
+        acc[self.N] += 1
+
+        ta = _kma_value(values, 11)
+        if ta is not None:
+            acc[self.TA_MIN] = ta if acc[self.TA_MIN] is None else min(acc[self.TA_MIN], ta)
+            acc[self.TA_MAX] = ta if acc[self.TA_MAX] is None else max(acc[self.TA_MAX], ta)
+            acc[self.TA_SUM] += ta
+            acc[self.TA_N] += 1
+        rn = _kma_value(values, 15)
+        if rn is not None and rn > 0:
+            acc[self.RN_SUM] += rn
+        hm = _kma_value(values, 13)
+        if hm is not None:
+            acc[self.HM_SUM] += hm
+            acc[self.HM_N] += 1
+        ws = _kma_value(values, 3)
+        if ws is not None:
+            acc[self.WS_MAX] = ws if acc[self.WS_MAX] is None else max(acc[self.WS_MAX], ws)
+
+    @classmethod
+    def _merge(cls, into, acc):
+        for idx, pick in ((cls.TA_MIN, min), (cls.TA_MAX, max), (cls.WS_MAX, max)):
+            if acc[idx] is not None:
+                into[idx] = acc[idx] if into[idx] is None else pick(into[idx], acc[idx])
+        for idx in (cls.TA_SUM, cls.TA_N, cls.RN_SUM, cls.HM_SUM, cls.HM_N, cls.N):
+            into[idx] += acc[idx]
+
+    @classmethod
+    def _finalize(cls, acc):
+        return {
+            "TA_MIN": acc[cls.TA_MIN],
+            "TA_MAX": acc[cls.TA_MAX],
+            "TA_AVG": round(acc[cls.TA_SUM] / acc[cls.TA_N], 1) if acc[cls.TA_N] else None,
+            "RN_DAY": round(acc[cls.RN_SUM], 1),
+            "HM_AVG": round(acc[cls.HM_SUM] / acc[cls.HM_N], 1) if acc[cls.HM_N] else None,
+            "WS_MAX": acc[cls.WS_MAX],
+            "COUNT": acc[cls.N],
+        }
+
+    def days(self):
+        """날짜별 {"stations": {STN: 통계}, "regions": {시군: 통계}}"""
+        result = {}
+        region_acc = {}
+        for (date, stn), acc in self._acc.items():
+            day = result.setdefault(date, {"stations": {}, "regions": {}})
+            day["stations"][str(stn)] = self._finalize(acc)
+            region = KMA_STATION_REGIONS.get(stn)
+            if region:
+                merged = region_acc.get((date, region))
+                if merged is None:
+                    merged = region_acc[(date, region)] = [None, None, 0.0, 0, 0.0, 0.0, 0, None, 0]
+                self._merge(merged, acc)
+        for (date, region), acc in region_acc.items():
+            result[date]["regions"][region] = self._finalize(acc)
+        return result
+
+
+def daily_range(tm1, tm2):
+    """일별 통계 조회 구간 (종료일은 오늘(KST)까지, 순서가 틀리거나 DAILY_MAX_DAYS일을 넘으면 ValueError)"""
+    start, end = tm1[:8], tm2[:8]
+    first = datetime.strptime(start, "%Y%m%d")
+    last = min(datetime.strptime(end, "%Y%m%d"), datetime.strptime(datetime.now(KST).strftime("%Y%m%d"), "%Y%m%d"))
+    if first > last:
+        raise ValueError("tm1은 tm2(오늘 이후면 오늘)보다 이전이어야 합니다.")
+    if (last - first).days + 1 > DAILY_MAX_DAYS:
+        raise ValueError(f"조회 기간은 최대 {DAILY_MAX_DAYS}일입니다.")
+    return start, last.strftime("%Y%m%d")
+
+
+def fetch_kma_daily(tm1, tm2, stn="0"):
+    """기간 데이터를 일별 통계로 집계 (스트리밍 한 번 통과, 완료된 날짜는 캐시, 구간은 daily_range로 먼저 검사)"""
+    try:
+        start, end = tm1[:8], tm2[:8]
+        day = datetime.strptime(start, "%Y%m%d")
+        last = datetime.strptime(end, "%Y%m%d")
+        days = []
+        while day <= last:
+            days.append(day.strftime("%Y%m%d"))
+            day += timedelta(days=1)
+        today = datetime.now(KST).strftime("%Y%m%d")
+
+        missing = [d for d in days if d >= today or (stn, d) not in _daily_cache]
+        fetched = {}
+        stale = {}
+        if missing:
+            url = (f"{KMA_BASE_URL}/kma_sfctm3.php?tm1={missing[0]}0000&tm2={missing[-1]}2300"
+                   f"&stn={stn}&authKey={KMA_AUTH_KEY}")
+
+            def fetch():
+                aggregator = DailyAggregator()
+                with span("fetch"), kma_open(url) as response:  # 스트리밍 집계 포함
+                    for raw in response:
+                        aggregator.add_line(raw.decode('utf-8', errors='ignore'))
+                return {"days": aggregator.days()}
+
+            outcome = guarded("kma_sfctm3_daily").call((stn, missing[0], missing[-1]), fetch)
+            fetched = outcome["days"]
+            if outcome.get("stale"):
+                # 마지막 정상 집계는 응답에만 쓰고 일별 캐시에는 넣지 않음
+                stale = {"stale": True, "staleSeconds": outcome["staleSeconds"]}
+            else:
+                with _daily_cache_lock:
+                    for d in missing:
+                        if d < today:
+                            _daily_cache[(stn, d)] = fetched.get(d, {"stations": {}, "regions": {}})
+                            _daily_cache.move_to_end((stn, d))
+                    while len(_daily_cache) > DAILY_CACHE_MAX_DAYS:
+                        _daily_cache.popitem(last=False)
+
+        missing_set = set(missing)
+        result = []
+        for d in days:
+            entry = fetched.get(d) if d in missing_set else _daily_cache.get((stn, d))
+            result.append({"date": d, **(entry or {"stations": {}, "regions": {}})})
+        return {"success": True, "startTime": start, "endTime": end, "count": len(result), "days": result, **stale}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+
 # 경기도 31개 시군 정보
 GYEONGGI_REGIONS = {
     "수원시": {"code": "41110", "lat": 37.2636, "lng": 127.0286},
@@ -167,13 +915,24 @@ SKY_CODES_KMA = {
 
 
 def fetch_kma_hub_forecast(reg_code):
-    """기상청 API허브 단기예보 호출"""
-    try:
-        url = f"{KMA_BASE_URL}/fct_afs_dl.php?reg={reg_code}&tmfc=0&authKey={KMA_FORECAST_KEY}"
-
-        with urlopen(url, timeout=30) as response:
+    """
+    기상청 API허브 단기예보 호출 → {"forecasts", "baseTime"} (실패 시 None)
+    차단 중/장애 시 같은 예보구역의 마지막 정상 응답을 stale로 반환
+    """
+    url = f"{KMA_BASE_URL}/fct_afs_dl.php?reg={reg_code}&tmfc=0&authKey={KMA_FORECAST_KEY}"
+
+    def fetch():
+        with span("fetch"), kma_open(url) as response:
             text = response.read().decode('euc-kr', errors='ignore')
-            return parse_kma_hub_forecast(text)
+        with span("parse"):
+            forecasts = parse_kma_hub_forecast(text)
+        if not forecasts:
+            raise ValueError("예보 데이터 없음")
+        now = datetime.now() + timedelta(hours=9)  # KST
+        return {"forecasts": forecasts, "baseTime": now.strftime("%m/%d %H:00 기준")}
+
+    try:
+        return guarded("fct_afs_dl").call(reg_code, fetch)
     except Exception as e:
         print(f"KMA Hub Forecast API Error: {e}")
 
@@ -233,6 +992,11 @@ def parse_kma_hub_forecast(text):
         except (ValueError, IndexError) as e:
             continue
 
+    # 예보 전체 시간의 체감온도를 한 번에 계산 (예보 응답에는 습도/풍속이 없어 기본값 사용)
+    feels_like = calculate_apparent_temperatures([f['temperature'] for f in forecasts])
+    for forecast, value in zip(forecasts, feels_like):
+        forecast['feelsLike'] = value
+
     return forecasts
 
 
@@ -279,30 +1043,33 @@ def get_mock_forecast(region_name):
             "windSpeed": 2 + random.randint(0, 3),
         })
 
+    feels_like = calculate_apparent_temperatures(
+        [f["temperature"] for f in forecasts],
+        [f["humidity"] for f in forecasts],
+        [f["windSpeed"] for f in forecasts],
+    )
+    for forecast, value in zip(forecasts, feels_like):
+        forecast["feelsLike"] = value
+
     return forecasts
 
 
 def get_real_forecast(region_name):
     """실제 기상청 예보 데이터 조회 (API허브 사용)"""
-    from datetime import timedelta
-
     # 지역 코드 조회
     reg_code = FORECAST_REG_CODES.get(region_name, '11B20601')  # 기본값: 수원시
 
-    # 기상청 API허브 호출
-    forecasts = fetch_kma_hub_forecast(reg_code)
-
-    if forecasts and len(forecasts) > 0:
-        # 현재 시간 기준 정보
-        now = datetime.now() + timedelta(hours=9)  # KST
-        base_time = now.strftime("%m/%d %H:00 기준")
+    # 기상청 API허브 호출 (차단 중이면 마지막 정상 예보)
+    result = fetch_kma_hub_forecast(reg_code)
 
+    if result:
         return {
             "success": True,
             "region": region_name,
-            "baseTime": base_time,
-            "forecasts": forecasts,
-            "isMock": False
+            "baseTime": result["baseTime"],
+            "forecasts": result["forecasts"],
+            "isMock": False,
+            **({"stale": True, "staleSeconds": result["staleSeconds"]} if result.get("stale") else {})
         }
 
     # API 실패시 Mock 데이터
@@ -316,17 +1083,174 @@ def get_real_forecast(region_name):
     }
 
 
-def get_weather_alerts():
-    """기상 특보 데이터"""
+# 기상 특보: 폴링 주기, 해제 예고 시각이 없는 특보의 만료 기한 (초)
+ALERT_POLL_SECONDS = int(os.environ.get("ALERT_POLL_SECONDS", "300"))
+ALERT_HOLD_SECONDS = int(os.environ.get("ALERT_HOLD_SECONDS", "86400"))
+WARNING_KINDS = {
+    "W": "강풍", "R": "호우", "C": "한파", "D": "건조", "O": "해일", "N": "지진해일",
+    "V": "풍랑", "T": "태풍", "S": "대설", "Y": "황사", "H": "폭염", "F": "안개",
+}
+WARNING_LEVELS = {"1": "예비특보", "2": "주의보", "3": "경보"}
+WARNING_COMMANDS = {"1": "발표", "2": "대치", "3": "해제", "4": "대치해제", "5": "연장", "6": "변경", "7": "변경해제"}
+RELEASE_COMMANDS = ("해제", "대치해제", "변경해제")
+ALERT_TYPES = {"경보": "danger", "주의보": "warning", "예비특보": "watch"}
+LEVEL_RANK = {"예비특보": 1, "주의보": 2, "경보": 3}
+ALERT_ADVICE = {
+    "폭염": "야외활동을 자제하고 충분한 수분을 섭취하세요.",
+    "한파": "외출 시 보온에 유의하고 수도관 동파에 대비하세요.",
+    "호우": "하천변과 저지대 접근을 피하세요.",
+    "대설": "대중교통을 이용하고 빙판길 보행에 유의하세요.",
+    "강풍": "간판·시설물 낙하에 유의하세요.",
+    "건조": "산불 등 화재 예방에 유의하세요.",
+    "황사": "외출 시 마스크를 착용하세요.",
+}
+
+
+def _kst_time(value):
+    return datetime.strptime(value, "%Y%m%d%H%M").replace(tzinfo=KST) if re.match(r'^\d{12}$', value) else None
+
+
+def parse_warnings(text):
+    """특보 현황 응답 → 경기도 시군 특보 목록 (해제 명령, 다른 시도, 알 수 없는 구역 제외)"""
+    zones = {region[:-1]: region for region in GYEONGGI_REGIONS}
+    alerts = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = [field.strip() for field in line.rstrip('=').split(',')]
+        if len(fields) < 10 or "경기" not in fields[1]:
+            continue
+        region = zones.get(fields[3])
+        issued_at = _kst_time(fields[4])
+        if region is None or issued_at is None or WARNING_COMMANDS.get(fields[8], fields[8]) in RELEASE_COMMANDS:
+            continue
+        kind = WARNING_KINDS.get(fields[6], fields[6])
+        level = WARNING_LEVELS.get(fields[7], fields[7])
+        current = alerts.get((region, kind))
+        if current is None or LEVEL_RANK.get(level, 0) > LEVEL_RANK.get(current["level"], 0):
+            alerts[(region, kind)] = {"region": region, "kind": kind, "level": level,
+                                      "issued_at": issued_at, "expires_at": _kst_time(fields[9])}
+    return list(alerts.values())
+
+
+class AlertIndex:
+    """(시군, 종류) → 특보, 시군별 색인, 만료 시각 최소 힙 (교체된 힙 항목은 꺼낼 때 건너뜀)"""
+
+    def __init__(self):
+        self.alerts = {}
+        self.by_region = {}
+        self.heap = []
+        self.seq = itertools.count()
+
+    def put(self, alert):
+        key = (alert["region"], alert["kind"])
+        self.alerts[key] = alert
+        self.by_region.setdefault(alert["region"], {})[alert["kind"]] = alert
+        heapq.heappush(self.heap, (alert["expires_at"].timestamp(), next(self.seq), alert))
+        if len(self.heap) > 2 * len(self.alerts) + 64:
+            self.heap = [e for e in self.heap if self.alerts.get((e[2]["region"], e[2]["kind"])) is e[2]]
+            heapq.heapify(self.heap)
+
+    def remove(self, key):
+        alert = self.alerts.pop(key, None)
+        if alert is not None:
+            kinds = self.by_region[alert["region"]]
+            del kinds[alert["kind"]]
+            if not kinds:
+                del self.by_region[alert["region"]]
+
+    def expire(self, now):
+        limit = now.timestamp()
+        while self.heap and self.heap[0][0] <= limit:
+            _, _, alert = heapq.heappop(self.heap)
+            key = (alert["region"], alert["kind"])
+            if self.alerts.get(key) is alert:
+                self.remove(key)
+
+
+_alert_index = AlertIndex()
+_alert_state = {"polled_at": 0.0, "version": 0, "updated_at": None}
+_alert_lock = threading.Lock()
+
+
+def refresh_alerts():
+    """
+    폴링 주기가 지났으면 특보 현황을 받아 색인과 비교해 바뀐 특보만 반영
+    (서버리스는 백그라운드 작업이 없으므로 요청 시점에 갱신, 웜 인스턴스는 색인 재사용)
+    """
+    with _alert_lock:
+        if time.monotonic() - _alert_state["polled_at"] < ALERT_POLL_SECONDS:
+            return
+        now = datetime.now(KST)
+        url = f"{KMA_BASE_URL}/wrn_now_data.php?fe=f&tm={now:%Y%m%d%H%M}&disp=0&help=0&authKey={KMA_AUTH_KEY}"
+
+        def fetch():
+            with span("fetch"), kma_open(url) as response:
+                return {"text": response.read().decode('euc-kr', errors='ignore')}
+
+        result = guarded("wrn_now_data").call("now", fetch)
+        _alert_state["polled_at"] = time.monotonic()
+        if result.get("stale"):
+            return
+        seen = set()
+        changed = False
+        for alert in parse_warnings(result["text"]):
+            key = (alert["region"], alert["kind"])
+            seen.add(key)
+            previous = _alert_index.alerts.get(key)
+            if alert["expires_at"] is None:
+                keep = previous is not None and (previous["expires_at"] - now).total_seconds() > 2 * ALERT_POLL_SECONDS
+                alert["expires_at"] = previous["expires_at"] if keep else now + timedelta(seconds=ALERT_HOLD_SECONDS)
+            if previous is None or any(previous[f] != alert[f] for f in ("level", "issued_at", "expires_at")):
+                _alert_index.put(alert)
+                changed = True
+        for key in [key for key in _alert_index.alerts if key not in seen]:
+            _alert_index.remove(key)
+            changed = True
+        _alert_state["updated_at"] = now
+        if changed:
+            _alert_state["version"] += 1
+
+
+def alert_dict(alert):
+    title = f"{alert['kind']}{alert['level']}"
     return {
-        "success": True,
-        "alerts": [],
-        "message": "현재 발효 중인 기상 특보가 없습니다."
+        "id": f"{alert['region']}-{alert['kind']}",
+        "type": ALERT_TYPES.get(alert["level"], "info"),
+        "title": title,
+        "message": f"{alert['region']}에 {title}가 발효 중입니다. {ALERT_ADVICE.get(alert['kind'], '기상 정보에 유의하세요.')}",
+        "region": alert["region"],
+        "issued_at": alert["issued_at"].isoformat(),
+        "expires_at": alert["expires_at"].isoformat(),
     }
 
 
+def get_weather_alerts(region=None):
+    """발효 중인 기상 특보 (메모리 색인에서 응답, 수준 높은 순)"""
+    try:
+        refresh_alerts()
+    except Exception as e:
+        print(f"특보 수집 실패: {e}")
+    with _alert_lock:
+        _alert_index.expire(datetime.now(KST))
+        alerts = list(_alert_index.by_region.get(region, {}).values()) if region else list(_alert_index.alerts.values())
+        alerts.sort(key=lambda a: (-LEVEL_RANK.get(a["level"], 0), -a["issued_at"].timestamp(), a["region"]))
+        updated_at = _alert_state["updated_at"]
+        body = {
+            "success": True,
+            "region": region,
+            "alerts": [alert_dict(alert) for alert in alerts],
+            "version": _alert_state["version"],
+            "updatedAt": updated_at.isoformat() if updated_at else None,
+        }
+    if not alerts:
+        body["message"] = "현재 발효 중인 기상 특보가 없습니다."
+    return body
+
+
 def get_mock_climate_data(region_name):
-    """Mock 기후 데이터 생성"""
+    """Mock 기후 데이터 생성 (체감온도는 fill_apparent_temperature에서 일괄 계산)"""
     info = GYEONGGI_REGIONS.get(region_name, {"lat": 37.5, "lng": 127.0})
     base_temp = 28 + random.uniform(-5, 8)
     humidity = 55 + random.uniform(-15, 25)
@@ -339,7 +1263,7 @@ def get_mock_climate_data(region_name):
         "lng": info.get("lng", 127.0),
         "temperature": round(base_temp, 1),
         "humidity": round(humidity, 1),
-        "apparent_temperature": round(base_temp + (humidity - 50) * 0.1, 1),
+        "apparent_temperature": None,
         "pm10": round(pm10, 0),
         "pm25": round(pm25, 0),
         "heat_wave_days": random.randint(0, 15),
@@ -350,6 +1274,18 @@ def get_mock_climate_data(region_name):
     }
 
 
+def fill_apparent_temperature(rows):
+    """기후 데이터 목록의 체감온도를 한 번에 계산"""
+    apparent = calculate_apparent_temperatures(
+        [row["temperature"] for row in rows],
+        [row["humidity"] for row in rows],
+        [row["wind_speed"] for row in rows],
+    )
+    for row, value in zip(rows, apparent):
+        row["apparent_temperature"] = value
+    return rows
+
+
 def calculate_climate_score(data):
     """체감 기후 점수 계산 (0~100)"""
     score = 0
@@ -426,17 +1362,19 @@ def calculate_climate_score(data):
     score += surface_score
 
     final_score = min(100, max(0, int(score)))
+    return final_score, risk_level_for(final_score)
 
-    if final_score >= RISK_THRESHOLDS["DANGER"]:
-        risk_level = "danger"
-    elif final_score >= RISK_THRESHOLDS["WARNING"]:
-        risk_level = "warning"
-    elif final_score >= RISK_THRESHOLDS["CAUTION"]:
-        risk_level = "caution"
-    else:
-        risk_level = "safe"
 
-    return final_score, risk_level
+def risk_level_for(score, adjusted=None):
+    """점수 → 위험 등급 (대상 보정 점수가 있으면 그 점수 기준, 모든 응답이 이 규칙을 사용)"""
+    display = adjusted if adjusted else score
+    if display >= RISK_THRESHOLDS["DANGER"]:
+        return "danger"
+    elif display >= RISK_THRESHOLDS["WARNING"]:
+        return "warning"
+    elif display >= RISK_THRESHOLDS["CAUTION"]:
+        return "caution"
+    return "safe"
 
 
 def adjust_score_for_target(base_score, target):
@@ -449,32 +1387,26 @@ def get_all_climate_data(target=None):
     results = []
     target_group = target if target else "general"
 
-    for region_name in GYEONGGI_REGIONS.keys():
-        data = get_mock_climate_data(region_name)
-        score, risk_level = calculate_climate_score(data)
-        adjusted = adjust_score_for_target(score, target_group) if target else None
-
-        display_score = adjusted if adjusted else score
-        if display_score >= 75:
-            display_risk = "danger"
-        elif display_score >= 50:
-            display_risk = "warning"
-        elif display_score >= 30:
-            display_risk = "caution"
-        else:
-            display_risk = "safe"
-
-        results.append({
-            "region": data["region"],
-            "lat": data["lat"],
-            "lng": data["lng"],
-            "score": score,
-            "adjusted_score": adjusted,
-            "risk_level": display_risk,
-            "risk_label": RISK_LABELS.get(display_risk, "알 수 없음"),
-            "risk_color": RISK_COLORS.get(display_risk, "#9E9E9E"),
-            "climate_data": data
-        })
+    with span("fetch"):
+        all_data = fill_apparent_temperature([get_mock_climate_data(r) for r in GYEONGGI_REGIONS.keys()])
+    with span("score"):
+        for data in all_data:
+            score, risk_level = calculate_climate_score(data)
+            adjusted = adjust_score_for_target(score, target_group) if target else None
+
+            display_risk = risk_level_for(score, adjusted)
+
+            results.append({
+                "region": data["region"],
+                "lat": data["lat"],
+                "lng": data["lng"],
+                "score": score,
+                "adjusted_score": adjusted,
+                "risk_level": display_risk,
+                "risk_label": RISK_LABELS.get(display_risk, "알 수 없음"),
+                "risk_color": RISK_COLORS.get(display_risk, "#9E9E9E"),
+                "climate_data": data
+            })
 
     return {
         "regions": results,
@@ -488,19 +1420,11 @@ def get_region_climate(region, target=None):
         return None
 
     target_group = target if target else "general"
-    data = get_mock_climate_data(region)
+    data = fill_apparent_temperature([get_mock_climate_data(region)])[0]
     score, risk_level = calculate_climate_score(data)
     adjusted = adjust_score_for_target(score, target_group) if target else None
 
-    display_score = adjusted if adjusted else score
-    if display_score >= 75:
-        display_risk = "danger"
-    elif display_score >= 50:
-        display_risk = "warning"
-    elif display_score >= 30:
-        display_risk = "caution"
-    else:
-        display_risk = "safe"
+    display_risk = risk_level_for(score, adjusted)
 
     return {
         "region": data["region"],
@@ -515,79 +1439,286 @@ def get_region_climate(region, target=None):
     }
 
 
+# 이보다 먼 좌표는 경기도 밖으로 보고 조회하지 않음 (프론트엔드 위치 감지 기준과 동일)
+MAX_LOCATE_KM = 50.0
+_LNG_KM = 111.195 * math.cos(math.radians(37.5))
+# 시군 중심 좌표 (km 평면, 31개뿐이라 격자 없이 전체 비교로도 수 µs)
+_REGION_POINTS = [(name, info["lng"] * _LNG_KM, info["lat"] * 111.195) for name, info in GYEONGGI_REGIONS.items()]
+
+
+def locate_region(lat, lng):
+    """가장 가까운 시군 중심 → (시군, 거리 km), 경기도 밖이면 None"""
+    x, y = lng * _LNG_KM, lat * 111.195
+    name, d2 = min(((n, (px - x) ** 2 + (py - y) ** 2) for n, px, py in _REGION_POINTS), key=lambda item: item[1])
+    if d2 > MAX_LOCATE_KM ** 2:
+        return None
+    return name, math.sqrt(d2)
+
+
+def get_climate_at(lat, lng, target=None):
+    """좌표가 속한 시군과 점수 (가장 가까운 중심 기준)"""
+    found = locate_region(lat, lng)
+    if found is None:
+        return None
+    region, distance = found
+    return {
+        "lat": lat,
+        "lng": lng,
+        "distance_km": round(distance, 2),
+        "region": get_region_climate(region, target),
+        "subregion": None,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+# 배치 요청(/api/batch): 하위 요청 최대 수, 배치로 호출할 수 없는 경로
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "10"))
+BATCH_EXCLUDED_PREFIXES = ('/api/batch', '/api/admin')
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def parse_batch(body):
+    """배치 요청 본문 검사 → [(id, path)] (잘못되면 ValueError)"""
+    try:
+        items = json.loads(body or b'null')["requests"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("requests 목록이 필요합니다.")
+    if not isinstance(items, list) or not items:
+        raise ValueError("requests 목록이 필요합니다.")
+    if len(items) > BATCH_MAX_REQUESTS:
+        raise ValueError(f"하위 요청은 최대 {BATCH_MAX_REQUESTS}개입니다.")
+    parsed, ids = [], set()
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("id"), str) or not isinstance(item.get("path"), str):
+            raise ValueError("하위 요청에는 id, path 문자열이 필요합니다.")
+        if item["id"] in ids:
+            raise ValueError(f"중복된 id: {item['id']}")
+        ids.add(item["id"])
+        parts = urlsplit(item["path"])
+        if parts.scheme or parts.netloc or not parts.path.startswith('/'):
+            raise ValueError(f"같은 서버의 경로만 허용됩니다: {item['path']}")
+        if parts.path.startswith(BATCH_EXCLUDED_PREFIXES):
+            raise ValueError(f"배치로 호출할 수 없는 경로입니다: {item['path']}")
+        parsed.append((item["id"], item["path"]))
+    return parsed
+
+
+def batch_entry(item_id, path, result):
+    """하위 결과 한 건 JSON 바이트 (본문은 이미 직렬화된 바이트를 그대로 사용)"""
+    head = json.dumps({"id": item_id, "path": path}, ensure_ascii=False)
+    return head[:-1].encode('utf-8') + b"," + result + b"}"
+
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         parsed_path = urlparse(self.path)
         path = parsed_path.path
         query_params = parse_qs(parsed_path.query)
 
-        # CORS 헤더
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-
-        response = {}
-
+        # 응답 본문을 먼저 만든 뒤 상태 코드/헤더 전송 (404 등 상태 코드와 Server-Timing 반영)
+        trace = start_trace(path)
+        profiler = start_profile(self.headers.get('X-Profile'))
+        profile_id = None
+        try:
+            try:
+                with span("handler"):
+                    status, response = self.route(path, query_params)
+                with span("serialize"):
+                    body, content_type = self.encode(path, response)
+            finally:
+                if profiler is not None:
+                    profile_id = finish_profile(profiler, path)
+
+            # CORS 헤더
+            self.send_response(status)
+            self.send_header('Content-type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if path in COLUMNAR_PATHS:
+                self.send_header('Vary', 'Accept')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            if trace is not None:
+                self.send_header('Server-Timing', trace.server_timing())
+                self.send_header('Timing-Allow-Origin', '*')
+            if profile_id:
+                self.send_header('X-Profile-Id', profile_id)
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            if trace is not None:
+                finish_trace(trace)
+
+    def encode(self, path, response):
+        """응답 직렬화 → (본문, 콘텐츠 타입), 컬럼형 지원 경로는 Accept에 따라 MessagePack"""
+        msgpack = path in COLUMNAR_PATHS and wants_msgpack(self.headers.get('Accept'))
+        if isinstance(response, dict) and "columns" in response:
+            if msgpack:
+                return packb(kma_columnar(response)), MSGPACK_MEDIA_TYPE
+            return kma_json(response), 'application/json'
+        elif msgpack and path == '/api/climate/all':
+            return packb(all_regions_columns(response)), MSGPACK_MEDIA_TYPE
+        return json.dumps(response, ensure_ascii=False).encode('utf-8'), 'application/json'
+
+    def route(self, path, query_params):
+        """경로별 응답 생성 → (상태 코드, 응답 객체)"""
+        if path.startswith('/api/admin/'):
+            return self.route_admin(path)
         if path == '/api' or path == '/api/':
-            response = {
+            return 200, {
                 "service": "경기 기후 체감 맵",
                 "version": "1.0.0",
                 "endpoints": {
                     "all_regions": "/api/climate/all",
                     "single_region": "/api/climate/{region}",
                     "regions": "/api/regions",
+                    "batch": "POST /api/batch",
                     "health": "/api/health"
                 }
             }
         elif path == '/api/regions':
-            response = list(GYEONGGI_REGIONS.keys())
+            return 200, list(GYEONGGI_REGIONS.keys())
         elif path == '/api/health':
-            response = {"status": "healthy", "service": "gyeonggi-climate-map"}
+            return 200, {"status": "healthy", "service": "gyeonggi-climate-map"}
         elif path == '/api/kma':
             tm = query_params.get('tm', [None])[0]
             stn = query_params.get('stn', ['0'])[0]
             if tm:
-                response = fetch_kma_data(tm, stn)
-            else:
-                response = {"error": "tm 파라미터가 필요합니다"}
+                return 200, fetch_kma_data(tm, stn)
+            return 200, {"error": "tm 파라미터가 필요합니다"}
         elif path == '/api/kma-period':
             tm1 = query_params.get('tm1', [None])[0]
             tm2 = query_params.get('tm2', [None])[0]
             stn = query_params.get('stn', ['0'])[0]
             if tm1 and tm2:
-                response = fetch_kma_period(tm1, tm2, stn)
-            else:
-                response = {"error": "tm1, tm2 파라미터가 필요합니다"}
+                return 200, fetch_kma_period(tm1, tm2, stn)
+            return 200, {"error": "tm1, tm2 파라미터가 필요합니다"}
+        elif path == '/api/kma-daily':
+            tm1 = query_params.get('tm1', [None])[0]
+            tm2 = query_params.get('tm2', [None])[0]
+            stn = query_params.get('stn', ['0'])[0]
+            if tm1 and tm2:
+                try:
+                    start, end = daily_range(tm1, tm2)
+                except ValueError as e:
+                    return 400, {"error": str(e)}
+                return 200, fetch_kma_daily(start, end, stn)
+            return 200, {"error": "tm1, tm2 파라미터가 필요합니다"}
         elif path == '/api/kma-forecast':
-            from urllib.parse import unquote
-            region = query_params.get('region', ['수원시'])[0]
-            region = unquote(region)
-            response = get_real_forecast(region)
+            region = unquote(query_params.get('region', ['수원시'])[0])
+            return 200, get_real_forecast(region)
         elif path == '/api/kma-alerts':
-            response = get_weather_alerts()
+            region = query_params.get('region', [None])[0]
+            if region is not None and region not in GYEONGGI_REGIONS:
+                return 404, {"error": f"'{region}' 지역을 찾을 수 없습니다."}
+            return 200, get_weather_alerts(region)
         elif path == '/api/climate/all':
             target = query_params.get('target', [None])[0]
-            response = get_all_climate_data(target)
+            return 200, get_all_climate_data(target)
+        elif path == '/api/climate/at':
+            try:
+                lat = float(query_params.get('lat', [''])[0])
+                lng = float(query_params.get('lng', [''])[0])
+            except ValueError:
+                return 400, {"error": "lat, lng 파라미터가 필요합니다"}
+            result = get_climate_at(lat, lng, query_params.get('target', [None])[0])
+            if result:
+                return 200, result
+            return 404, {"error": "경기도 범위 밖의 좌표입니다."}
         elif path.startswith('/api/climate/'):
-            region = path.replace('/api/climate/', '').strip('/')
-            region = region.replace('%EC%', '').replace('%', '')  # URL decode 시도
-            # URL 디코딩
-            from urllib.parse import unquote
             region = unquote(path.replace('/api/climate/', '').strip('/'))
             target = query_params.get('target', [None])[0]
             result = get_region_climate(region, target)
             if result:
-                response = result
+                return 200, result
+            return 404, {"error": f"'{region}' 지역을 찾을 수 없습니다."}
+        return 200, {"error": "Not found", "path": path}
+
+    def route_admin(self, path):
+        """운영자 전용 엔드포인트 (X-Admin-Token 필요)"""
+        if not is_admin(self.headers.get('X-Admin-Token')):
+            return 403, {"error": "관리자 토큰이 필요합니다."}
+        if path.rstrip('/') == '/api/admin/profiles':
+            names = os.listdir(PROFILE_DIR) if os.path.isdir(PROFILE_DIR) else []
+            return 200, {"profiles": sorted(n[:-5] for n in names if n.endswith('.prof'))}
+        match = re.match(r'^/api/admin/profiles/([0-9a-f]{16})$', path)
+        if match:
+            profile_path = os.path.join(PROFILE_DIR, match.group(1) + ".prof")
+            if os.path.exists(profile_path):
+                return 200, {"id": match.group(1), "text": profile_text(profile_path, limit=100)}
+            return 404, {"error": "프로파일을 찾을 수 없습니다."}
+        return 404, {"error": "Not found", "path": path}
+
+    def do_POST(self):
+        """배치 요청: 하위 GET 요청을 스레드로 동시에 실행 (같은 경로는 한 번만, 캐시/연결 풀 공유)"""
+        parsed_path = urlparse(self.path)
+        if parsed_path.path.rstrip('/') != '/api/batch':
+            self.send_body(404, json.dumps({"error": "Not found", "path": parsed_path.path}).encode('utf-8'), 'application/json')
+            return
+        try:
+            items = parse_batch(self.rfile.read(int(self.headers.get('Content-Length') or 0)))
+        except ValueError as e:
+            self.send_body(400, json.dumps({"error": str(e)}, ensure_ascii=False).encode('utf-8'), 'application/json')
+            return
+
+        stream = (parse_qs(parsed_path.query).get('stream', ['false'])[0].lower() in ('1', 'true', 'yes')
+                  or NDJSON_MEDIA_TYPE in (self.headers.get('Accept') or ''))
+        trace = start_trace('/api/batch')
+        paths = list(dict.fromkeys(path for _, path in items))
+        try:
+            with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+                futures = {executor.submit(self.run_sub_request, path, trace): path for path in paths}
+                if stream:
+                    # 완료되는 순서대로 한 줄씩 (연결 종료로 본문 끝 표시)
+                    self.send_response(200)
+                    self.send_header('Content-type', NDJSON_MEDIA_TYPE)
+                    self.send_header('Connection', 'close')
+                    self.send_header('Access-Control-Allow-Origin', '*')
+                    self.end_headers()
+                    self.close_connection = True
+                    for future in as_completed(futures):
+                        path = futures[future]
+                        for item_id, item_path in items:
+                            if item_path == path:
+                                self.wfile.write(batch_entry(item_id, path, future.result()) + b"\n")
+                        self.wfile.flush()
+                    return
+                results = {futures[future]: future.result() for future in as_completed(futures)}
+            entries = [batch_entry(item_id, path, results[path]) for item_id, path in items]
+            self.send_body(200, b'{"responses":[' + b",".join(entries) + b"]}", 'application/json', trace)
+        finally:
+            if trace is not None:
+                finish_trace(trace)
+
+    def run_sub_request(self, path, trace):
+        """하위 요청 하나 실행 → 결과 필드 바이트 ("status":..,"ms":..,"body":..), 단계 기록은 배치 트레이스에 합산"""
+        _trace_local.trace = trace
+        start = time.perf_counter()
+        try:
+            parsed = urlparse(path)
+            status, response = self.route(parsed.path, parse_qs(parsed.query))
+            if isinstance(response, dict) and "columns" in response:
+                body = kma_json(response)
             else:
-                self.send_response(404)
-                response = {"error": f"'{region}' 지역을 찾을 수 없습니다."}
-        else:
-            response = {"error": "Not found", "path": path}
-
-        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+                body = json.dumps(response, ensure_ascii=False).encode('utf-8')
+        except Exception as e:
+            body = json.dumps({"error": str(e)}, ensure_ascii=False).encode('utf-8')
+            status = 500
+        finally:
+            _trace_local.trace = None
+        ms = round((time.perf_counter() - start) * 1000, 1)
+        return f'"status":{status},"ms":{ms},"body":'.encode() + body
+
+    def send_body(self, status, body, content_type, trace=None):
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if trace is not None:
+            self.send_header('Server-Timing', trace.server_timing())
+            self.send_header('Timing-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
 
     def do_OPTIONS(self):
         self.send_response(200)
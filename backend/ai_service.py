@@ -2,10 +2,17 @@
 AI 기후 설명 생성 모듈
 OpenAI/Claude API를 활용한 자연어 설명 생성
 """
+import logging
 from typing import Dict, Any, Optional
 from openai import AsyncOpenAI
 from climate_index import RiskLevel, TargetGroup, get_risk_label
 from config import settings
+from metrics import LLM_REQUESTS, LLM_TOKENS, upstream_client
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = "gpt-3.5-turbo"
 
 
 class AIClimateExplainer:
@@ -14,7 +21,7 @@ class AIClimateExplainer:
     def __init__(self):
         self.client = None
         if settings.OPENAI_API_KEY and settings.OPENAI_API_KEY != "your_openai_api_key_here":
-            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=upstream_client())
 
     async def generate_explanation(
         self,
@@ -71,18 +78,24 @@ class AIClimateExplainer:
 - 이모지는 사용하지 마세요"""
 
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 시민들에게 날씨와 건강 정보를 알기 쉽게 전달하는 기상 안내 전문가입니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
+            with span("llm"):
+                response = await self.client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": "당신은 시민들에게 날씨와 건강 정보를 알기 쉽게 전달하는 기상 안내 전문가입니다."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=200,
+                    temperature=0.7
+                )
+            LLM_REQUESTS.inc(model=LLM_MODEL, status="ok")
+            if response.usage:
+                LLM_TOKENS.inc(response.usage.prompt_tokens, model=LLM_MODEL, kind="prompt")
+                LLM_TOKENS.inc(response.usage.completion_tokens, model=LLM_MODEL, kind="completion")
             return response.choices[0].message.content.strip()
         except Exception as e:
-            print(f"OpenAI API 오류: {e}")
+            LLM_REQUESTS.inc(model=LLM_MODEL, status="error")
+            logger.warning(f"OpenAI API 오류: {e}")
             return self._generate_fallback(region, climate_data, score, risk_level, target)
 
     def _generate_fallback(
@@ -0,0 +1,340 @@
+"""
+기상 특보 모듈
+기상청 특보 현황(wrn_now_data.php)을 주기적으로 받아 현재 상태와 비교
+- 시군별 색인 + 만료 힙: /api/kma-alerts?region=은 메모리에서 응답하고,
+  만료된 특보는 힙 앞에서만 꺼내 제거 (전체 순회 없음)
+- 새로 발표·변경·해제된 특보만 weather_alerts 테이블에 기록 (변화 없는 폴링은 쓰기 없음)
+
+특보는 (시군, 종류) 단위로 하나만 유지 (같은 종류는 주의보 → 경보 대치 시 갱신)
+"""
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from circuit_breaker import guarded
+from climate_api import GYEONGGI_REGIONS
+from config import settings
+from kma_proxy import KMA_AUTH_KEY, KMA_BASE_URL, KST, kma_client
+from memory import track
+from supabase_client import weather_alert_service
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# 특보 종류/수준/명령 코드 (응답이 코드로 오는 경우), 이름으로 오면 그대로 사용
+WARNING_KINDS = {
+    "W": "강풍", "R": "호우", "C": "한파", "D": "건조", "O": "해일", "N": "지진해일",
+    "V": "풍랑", "T": "태풍", "S": "대설", "Y": "황사", "H": "폭염", "F": "안개",
+}
+WARNING_LEVELS = {"1": "예비특보", "2": "주의보", "3": "경보"}
+WARNING_COMMANDS = {"1": "발표", "2": "대치", "3": "해제", "4": "대치해제", "5": "연장", "6": "변경", "7": "변경해제"}
+RELEASE_COMMANDS = ("해제", "대치해제", "변경해제")
+
+# 특보 수준 → 프론트엔드 배너 유형 (우선순위 순)
+ALERT_TYPES = {"경보": "danger", "주의보": "warning", "예비특보": "watch"}
+LEVEL_RANK = {"예비특보": 1, "주의보": 2, "경보": 3}
+
+ALERT_ADVICE = {
+    "폭염": "야외활동을 자제하고 충분한 수분을 섭취하세요.",
+    "한파": "외출 시 보온에 유의하고 수도관 동파에 대비하세요.",
+    "호우": "하천변과 저지대 접근을 피하세요.",
+    "대설": "대중교통을 이용하고 빙판길 보행에 유의하세요.",
+    "강풍": "간판·시설물 낙하에 유의하세요.",
+    "건조": "산불 등 화재 예방에 유의하세요.",
+    "황사": "외출 시 마스크를 착용하세요.",
+}
+
+# 특보구역 이름(시군에서 '시'/'군'을 뺀 이름) → 시군
+ZONE_REGIONS = {region[:-1]: region for region in GYEONGGI_REGIONS}
+_TIMESTAMP = re.compile(r"^\d{12}$")
+
+
+def _kst(value: str) -> Optional[datetime]:
+    return datetime.strptime(value, "%Y%m%d%H%M").replace(tzinfo=KST) if _TIMESTAMP.match(value) else None
+
+
+class Alert:
+    """발효 중인 특보 하나 (row_id: weather_alerts 행 id, 저장 전/미설정이면 None)"""
+
+    __slots__ = ("region", "kind", "level", "issued_at", "expires_at", "row_id")
+
+    def __init__(self, region: str, kind: str, level: str, issued_at: datetime,
+                 expires_at: Optional[datetime] = None, row_id: Optional[int] = None):
+        self.region = region
+        self.kind = kind
+        self.level = level
+        self.issued_at = issued_at
+        self.expires_at = expires_at
+        self.row_id = row_id
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.region, self.kind
+
+    @property
+    def title(self) -> str:
+        return f"{self.kind}{self.level}"
+
+    def same_as(self, other: "Alert") -> bool:
+        return self.level == other.level and self.issued_at == other.issued_at
+
+    def to_row(self) -> Dict[str, Any]:
+        """weather_alerts 행"""
+        advice = ALERT_ADVICE.get(self.kind, "기상 정보에 유의하세요.")
+        return {
+            "type": ALERT_TYPES.get(self.level, "info"),
+            "title": self.title,
+            "message": f"{self.region}에 {self.title}가 발효 중입니다. {advice}",
+            "region": self.region,
+            "issued_at": self.issued_at.isoformat(),
+            "expires_at": self.expires_at.isoformat(),
+            "is_active": True,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API 응답 (프론트엔드 배너 형식)"""
+        row = self.to_row()
+        del row["is_active"]
+        return {"id": self.row_id if self.row_id is not None else f"{self.region}-{self.kind}", **row}
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> Optional["Alert"]:
+        """저장된 행 → 특보 (이 모듈이 기록한 시군 특보가 아니면 None)"""
+        if row.get("region") not in GYEONGGI_REGIONS:
+            return None
+        title = row.get("title") or ""
+        level = next((name for name in LEVEL_RANK if title.endswith(name)), None)
+        if level is None or len(title) == len(level):
+            return None
+        return cls(
+            row["region"], title[:-len(level)], level,
+            datetime.fromisoformat(row["issued_at"]), datetime.fromisoformat(row["expires_at"]), row.get("id"),
+        )
+
+
+def parse_warnings(text: str) -> List[Alert]:
+    """
+    특보 현황 응답 → 경기도 시군 특보 (해제 명령, 다른 시도, 알 수 없는 구역 제외)
+    행 형식: REG_UP, REG_UP_KO, REG_ID, REG_KO, TM_FC, TM_EF, WRN, LVL, CMD, ED_TM,=
+    """
+    alerts: Dict[Tuple[str, str], Alert] = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = [field.strip() for field in line.rstrip("=").split(",")]
+        if len(fields) < 10 or "경기" not in fields[1]:
+            continue
+        region = ZONE_REGIONS.get(fields[3])
+        command = WARNING_COMMANDS.get(fields[8], fields[8])
+        issued_at = _kst(fields[4])
+        if region is None or issued_at is None or command in RELEASE_COMMANDS:
+            continue
+        kind = WARNING_KINDS.get(fields[6], fields[6])
+        level = WARNING_LEVELS.get(fields[7], fields[7])
+        alert = Alert(region, kind, level, issued_at, _kst(fields[9]))
+        # 같은 시군·종류가 여러 줄이면 높은 수준만
+        current = alerts.get(alert.key)
+        if current is None or LEVEL_RANK.get(level, 0) > LEVEL_RANK.get(current.level, 0):
+            alerts[alert.key] = alert
+    return list(alerts.values())
+
+
+class AlertIndex:
+    """
+    (시군, 종류) → 특보, 시군별 색인, 만료 시각 최소 힙
+    교체/삭제된 특보의 힙 항목은 꺼낼 때 건너뜀 (지연 삭제)
+    """
+
+    def __init__(self):
+        self._alerts: Dict[Tuple[str, str], Alert] = {}
+        self._by_region: Dict[str, Dict[str, Alert]] = {}
+        self._heap: List[Tuple[float, int, Alert]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def get(self, key: Tuple[str, str]) -> Optional[Alert]:
+        return self._alerts.get(key)
+
+    def put(self, alert: Alert) -> None:
+        self._alerts[alert.key] = alert
+        self._by_region.setdefault(alert.region, {})[alert.kind] = alert
+        heapq.heappush(self._heap, (alert.expires_at.timestamp(), next(self._seq), alert))
+        # 지연 삭제 항목이 쌓이면 힙 재구성
+        if len(self._heap) > 2 * len(self._alerts) + 64:
+            self._heap = [entry for entry in self._heap if self._alerts.get(entry[2].key) is entry[2]]
+            heapq.heapify(self._heap)
+
+    def remove(self, key: Tuple[str, str]) -> Optional[Alert]:
+        alert = self._alerts.pop(key, None)
+        if alert is not None:
+            kinds = self._by_region[alert.region]
+            del kinds[alert.kind]
+            if not kinds:
+                del self._by_region[alert.region]
+        return alert
+
+    def expire(self, now: datetime) -> List[Alert]:
+        """만료 시각이 지난 특보 제거 (힙 앞부분만 확인)"""
+        expired = []
+        limit = now.timestamp()
+        while self._heap and self._heap[0][0] <= limit:
+            _, _, alert = heapq.heappop(self._heap)
+            if self._alerts.get(alert.key) is alert:
+                self.remove(alert.key)
+                expired.append(alert)
+        return expired
+
+    def region(self, region: str) -> List[Alert]:
+        return list(self._by_region.get(region, {}).values())
+
+    def all(self) -> List[Alert]:
+        return list(self._alerts.values())
+
+
+def sort_alerts(alerts: List[Alert]) -> List[Alert]:
+    """수준 높은 순, 같은 수준은 최근 발표 순"""
+    return sorted(alerts, key=lambda a: (-LEVEL_RANK.get(a.level, 0), -a.issued_at.timestamp(), a.region))
+
+
+# 변경 리스너: {"issued": [...], "updated": [...], "cleared": [...]} → None 또는 코루틴
+AlertListener = Callable[[Dict[str, List[Alert]]], Any]
+
+
+class AlertFeed:
+    """특보 폴링, 현재 상태와의 차이 계산, 변경분만 저장"""
+
+    def __init__(self, poll_seconds: int, hold_seconds: int):
+        self.poll_seconds = poll_seconds
+        # 해제 예고 시각이 없는 특보의 만료 기한 (폴링이 멈춰도 오래된 특보가 남지 않도록)
+        self.hold = timedelta(seconds=hold_seconds)
+        self.index = AlertIndex()
+        self.version = 0
+        self.updated_at: Optional[datetime] = None
+        self._listeners: List[AlertListener] = []
+        self._lock = asyncio.Lock()
+
+    def subscribe(self, listener: AlertListener) -> None:
+        """변경이 있을 때 호출될 리스너 등록"""
+        self._listeners.append(listener)
+
+    def _expiry(self, alert: Alert, previous: Optional[Alert], now: datetime) -> datetime:
+        if alert.expires_at is not None:
+            return alert.expires_at
+        # 기한이 한 폴링 주기 안으로 다가왔을 때만 연장 (매 폴링마다 쓰지 않도록)
+        if previous is not None and previous.expires_at - now > timedelta(seconds=2 * self.poll_seconds):
+            return previous.expires_at
+        return now + self.hold
+
+    def diff(self, alerts: List[Alert], now: datetime) -> Dict[str, List[Alert]]:
+        """피드 결과와 현재 색인 비교 → 발표/변경(연장 포함)/해제 목록 (색인은 바꾸지 않음)"""
+        issued, updated = [], []
+        seen = set()
+        for alert in alerts:
+            seen.add(alert.key)
+            previous = self.index.get(alert.key)
+            alert.expires_at = self._expiry(alert, previous, now)
+            if previous is None:
+                issued.append(alert)
+            elif not alert.same_as(previous) or alert.expires_at != previous.expires_at:
+                alert.row_id = previous.row_id
+                updated.append(alert)
+        cleared = [alert for alert in self.index.all() if alert.key not in seen]
+        return {"issued": issued, "updated": updated, "cleared": cleared}
+
+    def apply(self, changes: Dict[str, List[Alert]]) -> None:
+        for alert in changes["cleared"]:
+            self.index.remove(alert.key)
+        for alert in changes["issued"] + changes["updated"]:
+            self.index.put(alert)
+
+    async def _persist(self, changes: Dict[str, List[Alert]]) -> None:
+        issued = changes["issued"]
+        if issued:
+            ids = await weather_alert_service.insert([alert.to_row() for alert in issued])
+            for alert, row_id in zip(issued, ids):
+                alert.row_id = row_id
+        for alert in changes["updated"]:
+            if alert.row_id is not None:
+                await weather_alert_service.update(alert.row_id, alert.to_row())
+        cleared = [alert.row_id for alert in changes["cleared"] if alert.row_id is not None]
+        if cleared:
+            await weather_alert_service.deactivate(cleared)
+
+    async def load(self) -> None:
+        """재시작 후 이전 상태 복원 (저장된 발효 중 특보를 색인에 적재, 이후 차이 계산의 기준)"""
+        now = datetime.now(KST)
+        for row in await weather_alert_service.load_active(now):
+            alert = Alert.from_row(row)
+            if alert is not None and alert.expires_at > now:
+                self.index.put(alert)
+
+    async def fetch(self) -> Dict[str, Any]:
+        now = datetime.now(KST)
+        url = f"{KMA_BASE_URL}/wrn_now_data.php?fe=f&tm={now:%Y%m%d%H%M}&disp=0&help=0&authKey={KMA_AUTH_KEY}"
+
+        async def fetch() -> Dict[str, Any]:
+            with span("fetch"):
+                response = await kma_client().get(url)
+                response.raise_for_status()
+            return {"text": response.content.decode("euc-kr", errors="ignore")}
+
+        return await guarded("wrn_now_data").call("now", fetch)
+
+    async def poll(self) -> Dict[str, List[Alert]]:
+        """피드 한 번 반영 → 변경 목록 (stale 응답이면 해제 판단 없이 빈 변경)"""
+        async with self._lock:
+            result = await self.fetch()
+            now = datetime.now(KST)
+            if result.get("stale"):
+                return {"issued": [], "updated": [], "cleared": []}
+            changes = self.diff(parse_warnings(result["text"]), now)
+            self.updated_at = now
+            if not any(changes.values()):
+                return changes
+            await self._persist(changes)
+            self.apply(changes)
+            self.version += 1
+
+        for listener in self._listeners:
+            try:
+                outcome = listener(changes)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as e:
+                logger.error(f"특보 리스너 오류: {e}")
+        return changes
+
+    def current(self, region: Optional[str] = None) -> List[Alert]:
+        """발효 중인 특보 (만료분은 먼저 제거)"""
+        self.index.expire(datetime.now(KST))
+        return sort_alerts(self.index.region(region) if region else self.index.all())
+
+    async def run(self) -> None:
+        """저장된 상태 적재 후 주기적으로 폴링"""
+        try:
+            await self.load()
+        except Exception as e:
+            logger.warning(f"특보 상태 적재 실패: {e}")
+        while True:
+            try:
+                changes = await self.poll()
+                if any(changes.values()):
+                    logger.info(
+                        f"특보 변경: 발표 {len(changes['issued'])}, 변경 {len(changes['updated'])}, "
+                        f"해제 {len(changes['cleared'])}"
+                    )
+            except Exception as e:
+                logger.warning(f"특보 수집 실패: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+
+alert_feed = AlertFeed(settings.ALERT_POLL_SECONDS, settings.ALERT_HOLD_SECONDS)
+track("weather_alerts", "kma", lambda: alert_feed.index)
@@ -0,0 +1,278 @@
+"""
+관측 아카이브 모듈
+수집한 시간별 관측을 월·관측소별 Parquet 파티션에 쌓아 두고 기간 집계 질의를 처리
+(계절 분석 때 /api/kma-period를 월마다 다시 호출하지 않도록)
+
+- 파티션: {ARCHIVE_DIR}/month=YYYYMM/stn=NNN/data.parquet
+- 수집 행은 메모리 대기 버퍼에 모았다가 flush 때 파티션 파일과 병합 (같은 시각은 새 값 우선)
+  조회 응답에서 모은 행은 매시간 수집의 flush에 묻어 기록하고, 대기 행이 ARCHIVE_FLUSH_ROWS를 넘을 때만 먼저 기록
+  TM 순으로 다시 쓰므로 행 그룹(ARCHIVE_ROW_GROUP_ROWS행)마다 TM 최소/최대 통계가 겹치지 않음
+- 질의는 월·관측소 경로로 파티션을 고르고, 행 그룹 TM 통계로 범위 밖 그룹을 건너뛴 뒤
+  필요한 컬럼만 읽음 (1년 질의도 해당 관측소·컬럼만 읽음)
+
+pyarrow는 선택 의존성이며 없으면 수집은 건너뛰고 질의는 ArchiveUnavailableError
+"""
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 의존성 (pip install pyarrow)
+    pa = pc = pq = None
+
+from config import settings
+from kma_proxy import KMA_COLUMNS, fetch_kma_period
+from memory import track
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS: Tuple[str, ...] = tuple(KMA_COLUMNS) + ("AT",)
+# 코드 문자열이 섞이는 컬럼 (나머지 관측값은 float64)
+TEXT_COLUMNS = ("WW", "CT")
+# 집계 가능한 컬럼
+VALUE_COLUMNS: Tuple[str, ...] = tuple(c for c in ARCHIVE_COLUMNS if c not in ("TM", "STN") + TEXT_COLUMNS)
+
+# 집계 구간 → TM(YYYYMMDDHHmm) 나눗수 (hourly: YYYYMMDDHH, daily: YYYYMMDD, monthly: YYYYMM)
+INTERVALS = {"hourly": 100, "daily": 10_000, "monthly": 1_000_000}
+AGGREGATES = ("mean", "min", "max", "sum", "count")
+
+# backfill 시 한 번에 요청할 기간 (일)
+BACKFILL_WINDOW_DAYS = 7
+
+
+class ArchiveUnavailableError(Exception):
+    """pyarrow가 설치되지 않아 아카이브를 사용할 수 없음"""
+
+
+def _schema():
+    fields = [("TM", pa.int64()), ("STN", pa.int32())]
+    fields += [(name, pa.string() if name in TEXT_COLUMNS else pa.float64()) for name in ARCHIVE_COLUMNS[2:]]
+    return pa.schema(fields)
+
+
+def _months(start: int, end: int) -> List[str]:
+    """TM 범위에 걸친 YYYYMM 목록"""
+    year, month = divmod(start // 1_000_000, 100)
+    last = end // 1_000_000
+    result = []
+    while year * 100 + month <= last:
+        result.append(f"{year:04d}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return result
+
+
+class ObservationArchive:
+    """월·관측소 파티션 Parquet 아카이브"""
+
+    def __init__(self, root: str, row_group_rows: int, flush_rows: int):
+        self.root = root
+        self.row_group_rows = row_group_rows
+        self.flush_rows = flush_rows
+        # (YYYYMM, 관측소) → TM → ARCHIVE_COLUMNS[2:] 값
+        self._pending: Dict[Tuple[str, int], Dict[int, Tuple[Any, ...]]] = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def available(self) -> bool:
+        return pq is not None
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._pending.values())
+
+    def partition_path(self, month: str, stn: int) -> str:
+        return os.path.join(self.root, f"month={month}", f"stn={stn}", "data.parquet")
+
+    def append(self, columns: Dict[str, List[Any]]) -> int:
+        """파싱된 관측 컬럼을 파티션별 대기 버퍼에 추가 (같은 관측소·시각은 나중 값 우선)"""
+        if not self.available or not columns.get("TM"):
+            return 0
+        n = len(columns["TM"])
+        values = [columns.get(name) or [None] * n for name in ARCHIVE_COLUMNS[2:]]
+        added = 0
+        with self._pending_lock:
+            for i, (tm, stn) in enumerate(zip(columns["TM"], columns["STN"])):
+                try:
+                    tm, stn = int(tm), int(stn)
+                except (TypeError, ValueError):
+                    continue
+                self._pending.setdefault((str(tm)[:6], stn), {})[tm] = tuple(column[i] for column in values)
+                added += 1
+        return added
+
+    def flush(self) -> int:
+        """대기 버퍼를 파티션 파일에 병합해 기록 (기록한 행 수)"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        written = 0
+        with self._write_lock:
+            for (month, stn), rows in pending.items():
+                self._merge(month, stn, rows)
+                written += len(rows)
+        return written
+
+    def _merge(self, month: str, stn: int, rows: Dict[int, Tuple[Any, ...]]) -> None:
+        """기존 파티션과 합쳐 TM 순으로 다시 씀 (임시 파일 기록 후 교체하므로 읽는 쪽은 항상 완전한 파일을 봄)"""
+        schema = _schema()
+        tms = sorted(rows)
+        data: Dict[str, List[Any]] = {"TM": tms, "STN": [stn] * len(tms)}
+        for j, name in enumerate(ARCHIVE_COLUMNS[2:]):
+            if name in TEXT_COLUMNS:
+                data[name] = [None if rows[tm][j] is None else str(rows[tm][j]) for tm in tms]
+            else:
+                data[name] = [rows[tm][j] if isinstance(rows[tm][j], float) else None for tm in tms]
+        table = pa.Table.from_pydict(data, schema=schema)
+
+        path = self.partition_path(month, stn)
+        if os.path.exists(path):
+            existing = pq.read_table(path, schema=schema)
+            keep = pc.invert(pc.is_in(existing["TM"], value_set=table["TM"]))
+            table = pa.concat_tables([existing.filter(keep), table]).sort_by("TM")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        pq.write_table(table, tmp, row_group_size=self.row_group_rows, compression="zstd")
+        os.replace(tmp, path)
+
+    async def ingest(self, columns: Dict[str, List[Any]]) -> int:
+        """버퍼에 추가하고 파일 기록은 스레드에서 수행"""
+        if not self.append(columns):
+            return 0
+        return await asyncio.to_thread(self.flush)
+
+    def ingest_later(self, columns: Dict[str, List[Any]]) -> None:
+        """
+        조회 응답용: 대기 버퍼에 추가만 함 (파티션 기록은 매시간 수집의 ingest가 함께 처리)
+        대기 행이 flush_rows 이상이면 백그라운드에서 한 번 기록 (이미 기록 중이면 건너뜀)
+        """
+        if not self.append(columns) or self._tasks or len(self) < self.flush_rows:
+            return
+        task = asyncio.get_running_loop().create_task(asyncio.to_thread(self.flush))
+        self._tasks.add(task)
+        task.add_done_callback(self._ingest_done)
+
+    def _ingest_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"관측 아카이브 기록 실패: {task.exception()}")
+
+    def _partition_files(self, months: Sequence[str], stations: Sequence[int]) -> List[str]:
+        """질의 범위의 파티션 파일 (관측소가 주어지면 디렉터리 목록도 읽지 않음)"""
+        files = []
+        for month in months:
+            if stations:
+                candidates = [self.partition_path(month, stn) for stn in stations]
+            else:
+                month_dir = os.path.join(self.root, f"month={month}")
+                names = sorted(os.listdir(month_dir)) if os.path.isdir(month_dir) else []
+                candidates = [os.path.join(month_dir, name, "data.parquet") for name in names]
+            files.extend(path for path in candidates if os.path.exists(path))
+        return files
+
+    def query(self, stations: Sequence[int], start: int, end: int, fields: Sequence[str],
+              interval: str, aggregates: Sequence[str]) -> Dict[str, Any]:
+        """
+        관측소·기간·컬럼 조건의 구간별 집계
+        - start/end: TM (YYYYMMDDHHmm, 양 끝 포함)
+        - 결과 "columns": STN, period(구간 TM 앞자리), {필드}_{집계}
+        - "scan": 읽은 파티션/행 그룹 수와 통계로 건너뛴 행 그룹 수
+        """
+        if not self.available:
+            raise ArchiveUnavailableError("pyarrow가 설치되지 않아 관측 아카이브를 사용할 수 없습니다.")
+
+        read_columns = ["TM", "STN", *fields]
+        scan = {"partitions": 0, "row_groups": 0, "row_groups_skipped": 0, "rows": 0}
+        tables = []
+        with span("archive_scan"):
+            files = self._partition_files(_months(start, end), stations)
+            scan["partitions"] = len(files)
+            for path in files:
+                parquet = pq.ParquetFile(path)
+                tm_index = parquet.schema_arrow.get_field_index("TM")
+                groups = []
+                for g in range(parquet.metadata.num_row_groups):
+                    stats = parquet.metadata.row_group(g).column(tm_index).statistics
+                    if stats is not None and stats.has_min_max and (stats.max < start or stats.min > end):
+                        scan["row_groups_skipped"] += 1
+                        continue
+                    groups.append(g)
+                scan["row_groups"] += len(groups)
+                if groups:
+                    tables.append(parquet.read_row_groups(groups, columns=read_columns))
+
+        schema = _schema()
+        table = pa.concat_tables(tables) if tables else schema.empty_table().select(read_columns)
+        scan["rows"] = table.num_rows
+
+        with span("archive_aggregate"):
+            table = table.filter((pc.field("TM") >= start) & (pc.field("TM") <= end))
+            table = table.append_column("period", pc.divide(table["TM"], INTERVALS[interval]))
+            grouped = table.group_by(["STN", "period"]).aggregate(
+                [(field, agg) for field in fields for agg in aggregates]
+            ).sort_by([("STN", "ascending"), ("period", "ascending")])
+
+        columns: Dict[str, List[Any]] = {
+            "STN": grouped["STN"].to_pylist(),
+            "period": grouped["period"].to_pylist(),
+        }
+        for field in fields:
+            for agg in aggregates:
+                column = grouped[f"{field}_{agg}"]
+                if agg == "mean":
+                    column = pc.round(column, 2)
+                columns[f"{field}_{agg}"] = column.to_pylist()
+        return {
+            "success": True,
+            "startTime": str(start),
+            "endTime": str(end),
+            "interval": interval,
+            "count": grouped.num_rows,
+            "scan": scan,
+            "columns": columns,
+        }
+
+
+async def backfill(archive: ObservationArchive, first_month: str, last_month: str, stn: str = "0") -> int:
+    """기간 API를 BACKFILL_WINDOW_DAYS 단위로 호출해 월 범위를 아카이브에 채움"""
+    start = datetime.strptime(first_month, "%Y%m")
+    last = datetime.strptime(last_month, "%Y%m")
+    end = (last.replace(day=28) + timedelta(days=4)).replace(day=1)
+    written = 0
+    while start < end:
+        window_end = min(start + timedelta(days=BACKFILL_WINDOW_DAYS), end) - timedelta(hours=1)
+        result = await fetch_kma_period(f"{start:%Y%m%d%H}00", f"{window_end:%Y%m%d%H}00", stn)
+        if not result.get("stale"):
+            written += await archive.ingest(result["columns"])
+        logger.info(f"아카이브 채움: {start:%Y-%m-%d} ~ {window_end:%Y-%m-%d %H}시, 누적 {written}행")
+        start = window_end + timedelta(hours=1)
+    return written
+
+
+observation_archive = ObservationArchive(
+    settings.ARCHIVE_DIR, settings.ARCHIVE_ROW_GROUP_ROWS, settings.ARCHIVE_FLUSH_ROWS
+)
+track("archive_pending", "kma", lambda: observation_archive._pending)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="관측 아카이브 채우기 (기상청 기간 API)")
+    parser.add_argument("first_month", help="시작 월 (YYYYMM)")
+    parser.add_argument("last_month", help="끝 월 (YYYYMM, 포함)")
+    parser.add_argument("--stn", default="0", help="관측소 번호 (0: 전체)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if not observation_archive.available:
+        raise SystemExit("pyarrow가 설치되지 않았습니다 (pip install pyarrow).")
+    total = asyncio.run(backfill(observation_archive, args.first_month, args.last_month, args.stn))
+    print(f"{total}행 기록: {observation_archive.root}")
@@ -0,0 +1,153 @@
+"""
+배치 요청 모듈
+여러 GET 하위 요청을 한 번의 호출 안에서 동시에 실행하고 결과를 모아 반환
+- 하위 요청은 네트워크를 거치지 않고 같은 프로세스의 앱으로 바로 전달
+  (스냅샷/일별 캐시, 기상청 연결 풀, 회로 차단 상태를 그대로 공유)
+- 같은 경로의 하위 요청은 한 번만 실행
+- 하위 응답 JSON은 다시 파싱하지 않고 원본 바이트를 그대로 끼워 넣음
+- 결과를 요청 순서대로 한 번에 반환하거나, 완료되는 순서대로 한 줄씩(NDJSON) 스트리밍
+- 끝나지 않는 응답(text/event-stream)은 본문을 모으지 않고 406으로 거절
+"""
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Dict, List
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel, Field
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# 배치 안에서 호출할 수 없는 경로 (재귀 배치, 실시간 스트림, 운영자 전용, 메트릭)
+EXCLUDED_PREFIXES = ("/api/batch", "/api/stream", "/admin", "/metrics")
+# 하위 요청은 JSON으로만 받고 압축하지 않음 (응답 본문에 그대로 포함)
+SUB_REQUEST_HEADERS = {"Accept": "application/json", "Accept-Encoding": "identity"}
+
+
+class BatchItem(BaseModel):
+    id: str = Field(..., min_length=1, max_length=64, description="응답에서 결과를 찾기 위한 식별자")
+    path: str = Field(..., description="GET 경로와 쿼리 (예: /api/climate/수원시?target=elderly)")
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1)
+
+
+def validate_batch(items: List[BatchItem], max_requests: int) -> None:
+    """하위 요청 목록 검사 (잘못되면 ValueError)"""
+    if len(items) > max_requests:
+        raise ValueError(f"하위 요청은 최대 {max_requests}개입니다.")
+    ids = set()
+    for item in items:
+        if item.id in ids:
+            raise ValueError(f"중복된 id: {item.id}")
+        ids.add(item.id)
+        parts = urlsplit(item.path)
+        if parts.scheme or parts.netloc or not parts.path.startswith("/"):
+            raise ValueError(f"같은 서버의 경로만 허용됩니다: {item.path}")
+        if parts.path.startswith(EXCLUDED_PREFIXES):
+            raise ValueError(f"배치로 호출할 수 없는 경로입니다: {item.path}")
+
+
+class _StreamRejected(Exception):
+    """하위 응답이 이벤트 스트림이라 실행을 중단함"""
+
+
+def reject_event_streams(app):
+    """
+    하위 요청용 ASGI 래퍼: 응답 시작이 text/event-stream이면 406 본문으로 바꿔 보내고 앱 실행을 중단
+    (ASGI 전송은 본문을 끝까지 모은 뒤 반환하므로 끝나지 않는 스트림은 배치 전체를 멈춤)
+    """
+    async def guarded(scope, receive, send):
+        async def guarded_send(message):
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers") or [])
+                if headers.get(b"content-type", b"").startswith(b"text/event-stream"):
+                    body = json.dumps({"detail": "이벤트 스트림은 배치로 호출할 수 없습니다."},
+                                      ensure_ascii=False).encode("utf-8")
+                    await send({"type": "http.response.start", "status": 406,
+                                "headers": [(b"content-type", b"application/json"),
+                                            (b"content-length", str(len(body)).encode())]})
+                    await send({"type": "http.response.body", "body": body})
+                    raise _StreamRejected()
+            await send(message)
+
+        await app(scope, receive, guarded_send)
+
+    return guarded
+
+
+def _body_bytes(response: httpx.Response) -> bytes:
+    """하위 응답 본문 → JSON 값 바이트 (JSON이면 원본 그대로, 아니면 문자열, 없으면 null)"""
+    if not response.content:
+        return b"null"
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith("application/json") or "+json" in content_type:
+        return response.content
+    return json.dumps(response.text, ensure_ascii=False).encode("utf-8")
+
+
+class BatchRunner:
+    """앱 내부로 하위 요청을 보내는 실행기 (ASGI 전송, 연결 비용 없음)"""
+
+    def __init__(self, app):
+        self._app = app
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            transport = httpx.ASGITransport(app=reject_event_streams(self._app), raise_app_exceptions=False)
+            self._client = httpx.AsyncClient(transport=transport, base_url="http://batch")
+        return self._client
+
+    async def _call(self, item: BatchItem) -> bytes:
+        """하위 요청 하나 실행 → id/path를 제외한 결과 필드 바이트 ("status":..,"ms":..,"body":..)"""
+        start = time.perf_counter()
+        try:
+            response = await self._get_client().get(item.path, headers=SUB_REQUEST_HEADERS)
+            status, body = response.status_code, _body_bytes(response)
+        except Exception as e:
+            status, body = 502, json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8")
+        ms = round((time.perf_counter() - start) * 1000, 1)
+        return f'"status":{status},"ms":{ms},"body":'.encode() + body
+
+    def _start(self, items: List[BatchItem]) -> Dict[str, asyncio.Task]:
+        """경로별로 한 번만 실행 (경로 → 태스크)"""
+        tasks: Dict[str, asyncio.Task] = {}
+        for item in items:
+            if item.path not in tasks:
+                tasks[item.path] = asyncio.ensure_future(self._call(item))
+        return tasks
+
+    @staticmethod
+    def _entry(item: BatchItem, result: bytes) -> bytes:
+        head = json.dumps({"id": item.id, "path": item.path}, ensure_ascii=False)
+        return head[:-1].encode("utf-8") + b"," + result + b"}"
+
+    async def run(self, items: List[BatchItem]) -> bytes:
+        """모든 하위 요청 완료 후 {"responses": [...]} (요청 순서) 본문"""
+        tasks = self._start(items)
+        await asyncio.gather(*tasks.values())
+        entries = [self._entry(item, tasks[item.path].result()) for item in items]
+        return b'{"responses":[' + b",".join(entries) + b"]}"
+
+    async def stream(self, items: List[BatchItem]) -> AsyncIterator[bytes]:
+        """완료되는 순서대로 하위 결과를 한 줄씩 (NDJSON)"""
+        tasks = self._start(items)
+        waiting = {task: [item for item in items if item.path == path] for path, task in tasks.items()}
+        pending = set(waiting)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for item in waiting[task]:
+                        yield self._entry(item, task.result()) + b"\n"
+        finally:
+            # 클라이언트가 중간에 끊으면 남은 하위 요청 취소
+            for task in pending:
+                task.cancel()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
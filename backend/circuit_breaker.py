@@ -0,0 +1,236 @@
+"""
+외부 API 회로 차단기 모듈
+기상청 API허브 장애 시 요청마다 긴 타임아웃을 기다리지 않도록 엔드포인트별로 호출을 차단하고
+마지막 정상 응답을 stale 표시와 함께 돌려줌
+
+- closed: 정상 호출, 연속 실패가 임계값에 도달하면 open
+- open: reset_seconds 동안 호출하지 않고 즉시 마지막 정상 응답(없으면 CircuitOpenError)
+- half_open: 대기 후 한 요청만 시험 호출, 성공하면 closed / 실패하면 다시 open / 취소되면 다음 요청이 다시 시험
+- 4xx·파싱 오류는 성공도 실패도 아님 (상태는 그대로, 시험 호출이었으면 자리만 비움)
+- 재시도는 연결 오류·타임아웃·5xx에만, 전체 기한 안에서 full jitter 백오프로 수행
+"""
+import asyncio
+import random
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import httpx
+
+from config import settings
+from memory import track
+from metrics import UPSTREAM_CIRCUIT_EVENTS
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# 재시도 백오프 기본값/상한 (초)
+RETRY_BACKOFF_BASE = 0.2
+RETRY_BACKOFF_MAX = 2.0
+# 엔드포인트별 보관할 마지막 정상 응답 수/추정 크기 상한 (요청 키가 사용자 입력이므로 둘 다 제한)
+LAST_GOOD_MAX_ENTRIES = 128
+LAST_GOOD_MAX_BYTES = 32 * 1024 * 1024
+# 스칼라 목록 원소 하나의 추정 크기 (float 24B, 짧은 문자열은 조금 더 큼)
+_SCALAR_BYTES = 32
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있고 돌려줄 마지막 정상 응답도 없음"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 호출 차단 중 ({retry_after:.0f}초 후 재시도)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """엔드포인트 하나의 차단 상태 (이벤트 루프 스레드에서만 사용)"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """호출 가능 여부 (half_open에서는 시험 호출 하나만 허용)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.retry_after() > 0:
+            return False
+        if self._trial_in_flight:
+            return False
+        self.state = HALF_OPEN
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """결과 없이 끝난(취소·비재시도 오류) 시험 호출의 자리를 비움 (half_open 유지, 다음 요청이 다시 시험)"""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                UPSTREAM_CIRCUIT_EVENTS.inc(endpoint=self.name, event="opened")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after": round(self.retry_after(), 1) if self.state == OPEN else 0,
+        }
+
+
+def approx_size(value: Any) -> int:
+    """
+    응답의 추정 크기 (바이트)
+    컬럼 버퍼처럼 스칼라만 담은 목록은 원소를 하나씩 재지 않고 None(공유 객체)이 아닌 원소당 _SCALAR_BYTES로 계산
+    """
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (dict, list, tuple)):
+            return sys.getsizeof(value) + sum(approx_size(item) for item in value)
+        return sys.getsizeof(value) + (len(value) - value.count(None)) * _SCALAR_BYTES
+    return sys.getsizeof(value)
+
+
+class LastGoodCache:
+    """요청 키별 마지막 정상 응답 (LRU, 항목 수와 추정 크기 합계로 제한)"""
+
+    def __init__(self, max_entries: int = LAST_GOOD_MAX_ENTRIES, max_bytes: int = LAST_GOOD_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any], int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, key: Hashable, value: Dict[str, Any]) -> None:
+        """보관 (혼자서 상한을 넘는 응답은 보관하지 않고 같은 키의 이전 응답도 버림)"""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[2]
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (time.time(), value, size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self.bytes -= self._entries.popitem(last=False)[1][2]
+
+    def stale(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """stale 표시를 붙인 사본 (없으면 None)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value, _ = entry
+        return {**value, "stale": True, "staleSeconds": int(time.time() - stored_at)}
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class GuardedUpstream:
+    """회로 차단 + 재시도 + 마지막 정상 응답 대체를 묶은 엔드포인트 호출기"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.breaker = CircuitBreaker(name, settings.KMA_BREAKER_FAILURES, settings.KMA_BREAKER_RESET_SECONDS)
+        self.last_good = LastGoodCache()
+
+    async def call(self, key: Hashable, fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                   remember: bool = True) -> Dict[str, Any]:
+        """
+        fetch()로 응답을 받아 반환 (성공 시 마지막 정상 응답 갱신, remember=False면 보관하지 않음)
+        차단 중이거나 재시도까지 실패하면 마지막 정상 응답을 stale로 반환, 없으면 예외 전달
+        """
+        if not self.breaker.allow():
+            UPSTREAM_CIRCUIT_EVENTS.inc(endpoint=self.name, event="short_circuit")
+            return self._stale_or_raise(key, CircuitOpenError(self.name, self.breaker.retry_after()))
+
+        trial = self.breaker.state == HALF_OPEN
+        try:
+            return await self._attempt(key, fetch, remember, trial)
+        except BaseException as e:
+            # 취소 등으로 성공/실패 기록 없이 빠져나가면 시험 호출 자리가 영영 막히지 않도록 비움
+            if trial and not isinstance(e, Exception):
+                self.breaker.release_trial()
+            raise
+
+    async def _attempt(self, key: Hashable, fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                       remember: bool, trial: bool) -> Dict[str, Any]:
+        """기한 안에서 재시도하며 호출하고 결과를 차단기에 기록"""
+        deadline = time.monotonic() + settings.KMA_DEADLINE_SECONDS
+        attempt = 0
+        while True:
+            try:
+                result = await fetch()
+            except Exception as e:
+                attempt += 1
+                backoff = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+                remaining = deadline - time.monotonic() - backoff
+                if (is_retryable(e) and attempt <= settings.KMA_RETRIES
+                        and remaining > settings.KMA_CONNECT_TIMEOUT):
+                    UPSTREAM_CIRCUIT_EVENTS.inc(endpoint=self.name, event="retry")
+                    await asyncio.sleep(backoff)
+                    continue
+                if is_retryable(e):
+                    self.breaker.record_failure()
+                elif trial:
+                    # 4xx·파싱 오류는 업스트림 상태를 알려주지 않으므로 시험 호출 자리만 비우고 상태는 유지
+                    self.breaker.release_trial()
+                return self._stale_or_raise(key, e)
+            self.breaker.record_success()
+            if remember:
+                self.last_good.put(key, result)
+            return result
+
+    def _stale_or_raise(self, key: Hashable, error: Exception) -> Dict[str, Any]:
+        stale = self.last_good.stale(key)
+        if stale is None:
+            raise error
+        UPSTREAM_CIRCUIT_EVENTS.inc(endpoint=self.name, event="stale")
+        return stale
+
+
+def upstream_timeout() -> httpx.Timeout:
+    """연결/읽기 기한 (쓰기·커넥션 풀 대기는 읽기 기한과 동일)"""
+    return httpx.Timeout(settings.KMA_READ_TIMEOUT, connect=settings.KMA_CONNECT_TIMEOUT)
+
+
+_upstreams: Dict[str, GuardedUpstream] = {}
+
+
+def guarded(name: str) -> GuardedUpstream:
+    """엔드포인트 이름별 호출기 (없으면 생성)"""
+    upstream = _upstreams.get(name)
+    if upstream is None:
+        upstream = _upstreams[name] = GuardedUpstream(name)
+    return upstream
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {name: upstream.breaker.to_dict() for name, upstream in _upstreams.items()}
+
+
+track("kma_last_good", "kma", lambda: _upstreams)
@@ -2,9 +2,13 @@
 경기도 기후변화 API 연동 모듈
 climate.gg.go.kr API 데이터 조회
 """
-import httpx
+import logging
 from typing import Optional, Dict, Any, List
 from config import settings
+from climate_index import calculate_apparent_temperature, calculate_apparent_temperatures
+from metrics import upstream_client
+
+logger = logging.getLogger(__name__)
 
 # 경기도 31개 시군 정보 (좌표 포함)
 GYEONGGI_REGIONS = {
@@ -55,7 +59,7 @@ class ClimateAPIClient:
         data_type: temperature, humidity, pm10, precipitation 등
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with upstream_client(timeout=30.0) as client:
                 params = {
                     "apiKey": self.api_key,
                     "regionCode": region_code,
@@ -68,7 +72,7 @@ class ClimateAPIClient:
                 else:
                     return None
         except Exception as e:
-            print(f"API 호출 오류: {e}")
+            logger.warning(f"기후 API 호출 오류: {e}")
             return None
 
     async def get_all_regions_data(self) -> List[Dict[str, Any]]:
@@ -86,11 +90,8 @@ class ClimateAPIClient:
         return results
 
 
-def get_mock_climate_data(region_name: str) -> Dict[str, Any]:
-    """
-    실제 API 연결 전 테스트용 Mock 데이터
-    실제 운영 시 API 데이터로 대체
-    """
+def _generate_mock_row(region_name: str) -> Dict[str, Any]:
+    """Mock 관측값 생성 (체감온도 제외)"""
     import random
 
     info = GYEONGGI_REGIONS.get(region_name, {"lat": 37.5, "lng": 127.0})
@@ -107,7 +108,7 @@ def get_mock_climate_data(region_name: str) -> Dict[str, Any]:
         "lng": info.get("lng", 127.0),
         "temperature": round(base_temp, 1),
         "humidity": round(humidity, 1),
-        "apparent_temperature": round(base_temp + (humidity - 50) * 0.1, 1),
+        "apparent_temperature": None,
         "pm10": round(pm10, 0),
         "pm25": round(pm25, 0),
         "heat_wave_days": random.randint(0, 15),
@@ -118,6 +119,26 @@ def get_mock_climate_data(region_name: str) -> Dict[str, Any]:
     }
 
 
+def get_mock_climate_data(region_name: str) -> Dict[str, Any]:
+    """
+    실제 API 연결 전 테스트용 Mock 데이터
+    실제 운영 시 API 데이터로 대체
+    """
+    data = _generate_mock_row(region_name)
+    data["apparent_temperature"] = calculate_apparent_temperature(
+        data["temperature"], data["humidity"], data["wind_speed"]
+    )
+    return data
+
+
 def get_all_mock_data() -> List[Dict[str, Any]]:
-    """모든 지역의 Mock 데이터 반환"""
-    return [get_mock_climate_data(region) for region in GYEONGGI_REGIONS.keys()]
+    """모든 지역의 Mock 데이터 반환 (체감온도는 전체 지역 일괄 계산)"""
+    rows = [_generate_mock_row(region) for region in GYEONGGI_REGIONS.keys()]
+    apparent = calculate_apparent_temperatures(
+        [row["temperature"] for row in rows],
+        [row["humidity"] for row in rows],
+        [row["wind_speed"] for row in rows],
+    )
+    for row, value in zip(rows, apparent):
+        row["apparent_temperature"] = value
+    return rows
@@ -2,7 +2,8 @@
 기후 체감 지수 계산 모듈
 0~100점 체감 기후 점수 산출
 """
-from typing import Dict, Any, Tuple
+import math
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from enum import Enum
 
 
@@ -57,21 +58,66 @@ class TargetGroup(str, Enum):
     GENERAL = "general"         # 일반 시민
 
 
+# 체감온도 공식 적용 구간
+HEAT_INDEX_MIN_TEMP = 27.0      # 이상: 여름철 체감온도 (습구온도 기반, 기상청)
+WIND_CHILL_MAX_TEMP = 10.0      # 이하: 겨울철 체감온도 (풍속 냉각)
+WIND_CHILL_MIN_SPEED = 1.3      # m/s (4.8 km/h 미만은 바람 영향 없음)
+
+
+def calculate_apparent_temperatures(
+    temps: Sequence[Optional[float]],
+    humidities: Optional[Sequence[Optional[float]]] = None,
+    wind_speeds: Optional[Sequence[Optional[float]]] = None,
+) -> List[Optional[float]]:
+    """
+    체감온도 일괄 계산 (관측소 컬럼/예보 시간 전체를 한 번에)
+    - temps: 기온 (°C), None이면 결과도 None
+    - humidities: 상대습도 (%), 없으면 50
+    - wind_speeds: 풍속 (m/s), 없으면 2.0
+    """
+    n = len(temps)
+    if humidities is None:
+        humidities = [None] * n
+    if wind_speeds is None:
+        wind_speeds = [None] * n
+
+    atan, sqrt = math.atan, math.sqrt
+    result: List[Optional[float]] = []
+    append = result.append
+
+    for t, rh, v in zip(temps, humidities, wind_speeds):
+        if t is None:
+            append(None)
+        elif t >= HEAT_INDEX_MIN_TEMP:
+            if rh is None:
+                rh = 50.0
+            tw = (
+                t * atan(0.151977 * sqrt(rh + 8.313659)) + atan(t + rh) - atan(rh - 1.67633)
+                + 0.00391838 * rh ** 1.5 * atan(0.023101 * rh) - 4.686035
+            )
+            append(round(-0.2442 + 0.55399 * tw + 0.45535 * t - 0.0022 * tw * tw + 0.00278 * tw * t + 3.0, 1))
+        elif t <= WIND_CHILL_MAX_TEMP:
+            if v is None:
+                v = 2.0
+            if v >= WIND_CHILL_MIN_SPEED:
+                vk = (v * 3.6) ** 0.16
+                append(round(13.12 + 0.6215 * t - 11.37 * vk + 0.3965 * vk * t, 1))
+            else:
+                append(round(t, 1))
+        else:
+            append(round(t, 1))
+
+    return result
+
+
 def calculate_apparent_temperature(temp: float, humidity: float, wind_speed: float = 2.0) -> float:
     """
-    체감온도 계산 (Heat Index 기반)
+    체감온도 계산 (단일 값)
     - temp: 기온 (°C)
     - humidity: 상대습도 (%)
     - wind_speed: 풍속 (m/s)
     """
-    if temp < 27:
-        # 저온에서는 풍속 영향 고려
-        return temp - (wind_speed * 0.7)
-
-    # 고온에서는 Heat Index 공식 적용 (간소화 버전)
-    hi = temp + 0.33 * (humidity / 100 * 6.105 * (17.27 * temp / (237.7 + temp))) - 4.0
-
-    return round(hi, 1)
+    return calculate_apparent_temperatures([temp], [humidity], [wind_speed])[0]
 
 
 def calculate_climate_score(data: Dict[str, Any]) -> Tuple[int, RiskLevel]:
@@ -168,18 +214,19 @@ def calculate_climate_score(data: Dict[str, Any]) -> Tuple[int, RiskLevel]:
 
     # 최종 점수 정규화
     final_score = min(100, max(0, int(score)))
+    return final_score, risk_level_for(final_score)
 
-    # 위험 등급 결정 (상수 사용)
-    if final_score >= RISK_THRESHOLDS["DANGER"]:
-        risk_level = RiskLevel.DANGER
-    elif final_score >= RISK_THRESHOLDS["WARNING"]:
-        risk_level = RiskLevel.WARNING
-    elif final_score >= RISK_THRESHOLDS["CAUTION"]:
-        risk_level = RiskLevel.CAUTION
-    else:
-        risk_level = RiskLevel.SAFE
 
-    return final_score, risk_level
+def risk_level_for(score: int, adjusted: Optional[int] = None) -> RiskLevel:
+    """점수 → 위험 등급 (대상 보정 점수가 있으면 그 점수 기준, 모든 API 응답이 이 규칙을 사용)"""
+    display = adjusted if adjusted else score
+    if display >= RISK_THRESHOLDS["DANGER"]:
+        return RiskLevel.DANGER
+    elif display >= RISK_THRESHOLDS["WARNING"]:
+        return RiskLevel.WARNING
+    elif display >= RISK_THRESHOLDS["CAUTION"]:
+        return RiskLevel.CAUTION
+    return RiskLevel.SAFE
 
 
 def get_risk_color(risk_level: RiskLevel) -> str:
@@ -200,3 +247,9 @@ def adjust_score_for_target(base_score: int, target: TargetGroup) -> int:
     multiplier = TARGET_MULTIPLIERS.get(target.value, 1.0)
     adjusted = int(base_score * multiplier)
     return min(100, adjusted)
+
+
+def target_risk(score: int, target: Optional[str]) -> Tuple[Optional[int], RiskLevel]:
+    """대상 보정 점수(대상 없으면 None)와 표시 위험 등급 (API 응답 규칙과 동일)"""
+    adjusted = adjust_score_for_target(score, TargetGroup(target)) if target else None
+    return adjusted, risk_level_for(score, adjusted)
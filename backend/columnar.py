@@ -0,0 +1,147 @@
+"""
+컬럼형 바이너리 응답 모듈 (MessagePack)
+대량 응답(관측 행, 전체 시군 점수)을 행마다 키를 반복하는 JSON 대신 컬럼 배열로 인코딩
+- Accept에 MessagePack 미디어 타입이 있을 때만 사용 (기본은 기존 JSON)
+- 값이 모두 결측인 컬럼은 배열 대신 nil 하나로 인코딩
+- 정수값 실수(관측소 번호, 시각 등)는 정수로 인코딩해 크기를 줄임
+
+외부 msgpack 패키지 없이 필요한 타입(nil/bool/int/float/str/bin/array/map)만 직접 인코딩
+"""
+import struct
+from typing import Any, Dict, List, Optional
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+_DOUBLE = struct.Struct(">Bd")
+# msgpack 정수 범위 (음수는 int64, 양수는 uint64까지, 벗어난 정수값 실수는 float64로 인코딩)
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 64) - 1
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """Accept 헤더에 MessagePack이 있는지 (q=0은 거부로 간주)"""
+    if not accept:
+        return False
+    for part in accept.split(","):
+        media, *params = part.split(";")
+        if media.strip().lower() not in MSGPACK_MEDIA_TYPES:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _pack_int(n: int, out: bytearray) -> None:
+    if 0 <= n < 0x80:
+        out.append(n)
+    elif -0x20 <= n < 0:
+        out.append(n & 0xFF)
+    elif 0 <= n <= 0xFF:
+        out += b"\xcc" + n.to_bytes(1, "big")
+    elif 0 <= n <= 0xFFFF:
+        out += b"\xcd" + n.to_bytes(2, "big")
+    elif 0 <= n <= 0xFFFFFFFF:
+        out += b"\xce" + n.to_bytes(4, "big")
+    elif n > 0:
+        out += b"\xcf" + n.to_bytes(8, "big")
+    elif n >= -0x80:
+        out += b"\xd0" + n.to_bytes(1, "big", signed=True)
+    elif n >= -0x8000:
+        out += b"\xd1" + n.to_bytes(2, "big", signed=True)
+    elif n >= -0x80000000:
+        out += b"\xd2" + n.to_bytes(4, "big", signed=True)
+    else:
+        out += b"\xd3" + n.to_bytes(8, "big", signed=True)
+
+
+def _pack_header(n: int, fix: int, fix_max: int, tag16: bytes, tag32: bytes, out: bytearray) -> None:
+    if n <= fix_max:
+        out.append(fix | n)
+    elif n <= 0xFFFF:
+        out += tag16 + n.to_bytes(2, "big")
+    else:
+        out += tag32 + n.to_bytes(4, "big")
+
+
+def _pack(obj: Any, out: bytearray) -> None:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, float):
+        if obj.is_integer() and _INT_MIN <= obj <= _INT_MAX:
+            _pack_int(int(obj), out)
+        else:
+            out += _DOUBLE.pack(0xCB, obj)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n <= 31:
+            out.append(0xA0 | n)
+        elif n <= 0xFF:
+            out += b"\xd9" + n.to_bytes(1, "big")
+        else:
+            _pack_header(n, 0, -1, b"\xda", b"\xdb", out)
+        out += data
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        n = len(obj)
+        if n <= 0xFF:
+            out += b"\xc4" + n.to_bytes(1, "big")
+        else:
+            _pack_header(n, 0, -1, b"\xc5", b"\xc6", out)
+        out += obj
+    elif isinstance(obj, dict):
+        _pack_header(len(obj), 0x80, 15, b"\xde", b"\xdf", out)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    elif isinstance(obj, (list, tuple)):
+        _pack_header(len(obj), 0x90, 15, b"\xdc", b"\xdd", out)
+        _pack_values(obj, out)
+    else:
+        raise TypeError(f"MessagePack으로 인코딩할 수 없는 타입: {type(obj).__name__}")
+
+
+def _pack_values(values, out: bytearray) -> None:
+    """배열 원소 인코딩 (컬럼 값의 대부분인 결측/작은 정수/실수는 함수 호출 없이 처리)"""
+    append = out.append
+    pack_double = _DOUBLE.pack
+    for value in values:
+        cls = type(value)
+        if value is None:
+            append(0xC0)
+        elif cls is float:
+            if value.is_integer() and -0x20 <= value < 0x80:
+                append(int(value) & 0xFF)
+            elif value.is_integer() and _INT_MIN <= value <= _INT_MAX:
+                _pack_int(int(value), out)
+            else:
+                out += pack_double(0xCB, value)
+        elif cls is int and -0x20 <= value < 0x80:
+            append(value & 0xFF)
+        else:
+            _pack(value, out)
+
+
+def packb(obj: Any) -> bytes:
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def compact_columns(columns: Dict[str, List[Any]]) -> Dict[str, Optional[List[Any]]]:
+    """모두 결측인 컬럼은 None으로 (컬럼 목록과 순서는 유지)"""
+    return {
+        name: None if values and all(v is None for v in values) else values
+        for name, values in columns.items()
+    }
@@ -8,8 +8,73 @@ class Settings:
     CLIMATE_API_BASE_URL: str = os.getenv("CLIMATE_API_BASE_URL", "https://climate.gg.go.kr/ols/data/api")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
 
+    # 기상청 API 기준 URL (로컬 대역 서버로 교체 가능)
+    KMA_BASE_URL: str = os.getenv("KMA_BASE_URL", "https://apihub.kma.go.kr/api/typ01/url")
+    # 기상청 호출 기한(초)과 재시도, 회로 차단 기준 (연속 실패 횟수, 차단 유지 시간)
+    KMA_CONNECT_TIMEOUT: float = float(os.getenv("KMA_CONNECT_TIMEOUT", "3"))
+    KMA_READ_TIMEOUT: float = float(os.getenv("KMA_READ_TIMEOUT", "8"))
+    KMA_DEADLINE_SECONDS: float = float(os.getenv("KMA_DEADLINE_SECONDS", "15"))
+    KMA_RETRIES: int = int(os.getenv("KMA_RETRIES", "2"))
+    KMA_BREAKER_FAILURES: int = int(os.getenv("KMA_BREAKER_FAILURES", "3"))
+    KMA_BREAKER_RESET_SECONDS: float = float(os.getenv("KMA_BREAKER_RESET_SECONDS", "30"))
+
     # Supabase 설정
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")  # service_role 키 권장
 
+    # 스냅샷/이력 설정
+    SNAPSHOT_REFRESH_SECONDS: int = int(os.getenv("SNAPSHOT_REFRESH_SECONDS", "300"))
+    HISTORY_RETENTION_DAYS: int = int(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+
+    # 읍·면·동 등록부 CSV (code,name,lat,lng[,parent]) 및 갱신 1회당 계산 시간 예산(초)
+    # 등록부는 저장소에 포함되지 않음 - 파일을 두기 전까지 읍·면·동 기능은 꺼져 있음
+    SUBREGION_CSV: str = os.getenv("SUBREGION_CSV") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "data", "gyeonggi_subregions.csv"
+    )
+    SUBREGION_BUDGET_SECONDS: float = float(os.getenv("SUBREGION_BUDGET_SECONDS", "0.25"))
+
+    # 관측 아카이브 (Parquet, pyarrow 필요) 저장 위치 및 행 그룹 크기 (행 = 관측소별 시간 수)
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "/tmp/climate-archive")
+    ARCHIVE_ROW_GROUP_ROWS: int = int(os.getenv("ARCHIVE_ROW_GROUP_ROWS", "168"))
+    # 조회 응답에서 모은 행은 매시간 수집 때 함께 기록, 대기 행이 이 수를 넘으면 그 전에 기록
+    ARCHIVE_FLUSH_ROWS: int = int(os.getenv("ARCHIVE_FLUSH_ROWS", "20000"))
+
+    # 폭염/열대야 카운터 저장 파일 (재시작 시 여기서 이어 받고 빈 구간만 다시 조회, 빈 값이면 저장 안 함)
+    HEATWAVE_STATE_PATH: str = os.getenv("HEATWAVE_STATE_PATH", "/tmp/climate-heatwave.json")
+
+    # 기상 특보 폴링 주기, 해제 예고 시각이 없는 특보의 만료 기한 (초)
+    ALERT_POLL_SECONDS: int = int(os.getenv("ALERT_POLL_SECONDS", "300"))
+    ALERT_HOLD_SECONDS: int = int(os.getenv("ALERT_HOLD_SECONDS", "86400"))
+
+    # 실시간 스트림(/api/stream): 재개용 이벤트 기록 수, 연결별 송신 버퍼, heartbeat 간격(초), 최대 동시 연결
+    STREAM_REPLAY_EVENTS: int = int(os.getenv("STREAM_REPLAY_EVENTS", "256"))
+    STREAM_BUFFER_EVENTS: int = int(os.getenv("STREAM_BUFFER_EVENTS", "32"))
+    STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+    STREAM_MAX_CONNECTIONS: int = int(os.getenv("STREAM_MAX_CONNECTIONS", "1000"))
+
+    # 위험 알림: 전송 채널(local|webhook), 구독 재적재 주기(초), 초당 전송 수, 최대 시도 횟수,
+    # 첫 재시도 대기(초, 이후 2배씩), 같은 (구독, 시군, 위험 등급) 중복 억제 창(초)
+    NOTIFY_SINK: str = os.getenv("NOTIFY_SINK", "local")
+    NOTIFY_LOCAL_PATH: str = os.getenv("NOTIFY_LOCAL_PATH", "")
+    NOTIFY_WEBHOOK_URL: str = os.getenv("NOTIFY_WEBHOOK_URL", "")
+    NOTIFY_RELOAD_SECONDS: int = int(os.getenv("NOTIFY_RELOAD_SECONDS", "300"))
+    NOTIFY_RATE_PER_SECOND: float = float(os.getenv("NOTIFY_RATE_PER_SECOND", "20"))
+    NOTIFY_MAX_ATTEMPTS: int = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "4"))
+    NOTIFY_RETRY_SECONDS: float = float(os.getenv("NOTIFY_RETRY_SECONDS", "5"))
+    NOTIFY_DEDUP_SECONDS: int = int(os.getenv("NOTIFY_DEDUP_SECONDS", "10800"))
+
+    # 배치 요청(/api/batch) 한 번에 허용하는 하위 요청 수
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "10"))
+
+    # 요청 단계 추적 (Server-Timing 헤더) 샘플링 비율 0~1, 로그 출력 여부
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+    TRACE_LOG: bool = os.getenv("TRACE_LOG", "false").lower() in ("1", "true", "yes")
+
+    # 운영자 전용 기능 인증 토큰 (비어 있으면 관리자 엔드포인트/프로파일 헤더 비활성)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    # 요청 프로파일링: 무작위 샘플링 비율(0~1), 저장 위치, 보관 개수
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "/tmp/climate-profiles")
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
 settings = Settings()
@@ -0,0 +1,378 @@
+"""
+폭염일/열대야 집계 모듈
+시간별 관측값을 받을 때마다 관측소별 카운터를 증분 갱신 (시즌 전체 재처리 없음)
+
+- 폭염일: 일 최고 체감온도 33°C 이상
+- 열대야: 밤(18시~다음날 09시) 최저기온 25°C 이상
+
+카운터는 정시 수집 작업(main.ingest_observations)으로만 갱신 (사용자 임의 시각 조회는 반영하지 않음)
+프로세스 시작 시 저장된 카운터(HEATWAVE_STATE_PATH)를 이어 받고 그 뒤의 빈 구간만 채움(backfill_season)
+저장된 카운터가 없으면 올해 1월 1일부터 채우며, 그 전에는 시군 카운터를 내보내지 않음
+시즌 채우기 중 들어온 정시 관측은 미뤄 두었다가 채우기가 끝나면 시각 순서대로 반영
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from climate_api import GYEONGGI_REGIONS
+from climate_index import calculate_apparent_temperatures
+from config import settings
+from kma_proxy import KST, KMA_STATION_REGIONS, fetch_kma_period
+from memory import track
+
+logger = logging.getLogger(__name__)
+
+HEAT_WAVE_APPARENT_TEMP = 33.0
+TROPICAL_NIGHT_TEMP = 25.0
+NIGHT_START_HOUR = 18
+NIGHT_END_HOUR = 9
+
+# 최근 N일 폭염일 수 (롤링 윈도우)
+ROLLING_WINDOW_DAYS = 30
+
+# 시즌 채우기: 관측소별 기간 조회 한 번의 최대 시간 수, 실패한 구간 재조회 대기 (초, 연속 실패마다 두 배, 상한까지)
+BACKFILL_CHUNK_HOURS = 31 * 24
+BACKFILL_RETRY_SECONDS = 60
+BACKFILL_RETRY_MAX_SECONDS = 3600
+
+# 저장 파일 형식 버전 (StationHeatState 필드가 바뀌면 올림, 다르면 무시하고 시즌 전체를 다시 채움)
+STATE_VERSION = 1
+
+# 경기도 ASOS 관측소 좌표
+KMA_STATION_COORDS = {
+    98: (37.9019, 127.0607),   # 동두천
+    99: (37.8859, 126.7665),   # 파주
+    119: (37.2723, 126.9853),  # 수원
+    202: (37.4886, 127.4945),  # 양평
+    203: (37.2640, 127.4842),  # 이천
+}
+
+
+def _nearest_station(lat: float, lng: float) -> int:
+    return min(
+        KMA_STATION_COORDS,
+        key=lambda stn: (KMA_STATION_COORDS[stn][0] - lat) ** 2 + (KMA_STATION_COORDS[stn][1] - lng) ** 2,
+    )
+
+
+# 시군 → 대표 관측소 (관측소가 있으면 그 관측소, 없으면 가장 가까운 관측소)
+REGION_STATIONS = {
+    region: next(
+        (stn for stn, name in KMA_STATION_REGIONS.items() if name == region),
+        _nearest_station(info["lat"], info["lng"]),
+    )
+    for region, info in GYEONGGI_REGIONS.items()
+}
+
+
+def _prev_day(date: str) -> str:
+    return (datetime.strptime(date, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+
+
+class StationHeatState:
+    """관측소 하나의 진행 중인 하루/밤 상태와 확정된 시즌 카운터"""
+
+    __slots__ = (
+        "day", "day_max_at", "night", "night_min_ta",
+        "season", "heat_wave_days", "tropical_nights", "streak", "max_streak",
+        "last_heat_day", "window", "window_heat_days",
+    )
+
+    def __init__(self):
+        self.day: Optional[str] = None          # 진행 중인 날짜 (YYYYMMDD)
+        self.day_max_at: Optional[float] = None
+        self.night: Optional[str] = None        # 진행 중인 밤 (시작 날짜)
+        self.night_min_ta: Optional[float] = None
+        self.season: Optional[str] = None       # 연도
+        self.heat_wave_days = 0
+        self.tropical_nights = 0
+        self.streak = 0
+        self.max_streak = 0
+        self.last_heat_day: Optional[str] = None
+        self.window = deque()                   # 최근 확정된 폭염일 날짜
+        self.window_heat_days = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["window"] = list(self.window)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StationHeatState":
+        state = cls()
+        for name in cls.__slots__:
+            setattr(state, name, data[name])
+        state.window = deque(data["window"])
+        return state
+
+    def _reset_season(self, year: str) -> None:
+        self.season = year
+        self.heat_wave_days = 0
+        self.tropical_nights = 0
+        self.streak = 0
+        self.max_streak = 0
+        self.last_heat_day = None
+
+    def _finalize_day(self) -> None:
+        if self.day is None or self.day_max_at is None:
+            return
+        if self.season != self.day[:4]:
+            self._reset_season(self.day[:4])
+
+        if self.day_max_at >= HEAT_WAVE_APPARENT_TEMP:
+            self.heat_wave_days += 1
+            consecutive = self.last_heat_day is not None and self.last_heat_day == _prev_day(self.day)
+            self.streak = self.streak + 1 if consecutive else 1
+            self.max_streak = max(self.max_streak, self.streak)
+            self.last_heat_day = self.day
+            self.window.append(self.day)
+        else:
+            self.streak = 0
+
+        cutoff = (datetime.strptime(self.day, "%Y%m%d") - timedelta(days=ROLLING_WINDOW_DAYS - 1)).strftime("%Y%m%d")
+        while self.window and self.window[0] < cutoff:
+            self.window.popleft()
+        self.window_heat_days = len(self.window)
+
+    def _finalize_night(self) -> None:
+        if self.night is None or self.night_min_ta is None:
+            return
+        if self.season != self.night[:4]:
+            self._reset_season(self.night[:4])
+        if self.night_min_ta >= TROPICAL_NIGHT_TEMP:
+            self.tropical_nights += 1
+
+    def observe(self, date: str, hour: int, ta: Optional[float], apparent: Optional[float]) -> None:
+        """한 시간 관측 반영 (이미 확정된 날짜의 관측은 무시)"""
+        if self.day is not None and date < self.day:
+            return
+
+        if date != self.day:
+            self._finalize_day()
+            self.day = date
+            self.day_max_at = None
+        if apparent is not None:
+            self.day_max_at = apparent if self.day_max_at is None else max(self.day_max_at, apparent)
+
+        if hour >= NIGHT_START_HOUR:
+            night = date
+        elif hour <= NIGHT_END_HOUR:
+            night = _prev_day(date)
+        else:
+            # 낮 시간이 오면 전날 밤은 끝남
+            if self.night is not None and self.night < date:
+                self._finalize_night()
+                self.night = None
+                self.night_min_ta = None
+            return
+
+        if self.night is not None and night < self.night:
+            return
+        if night != self.night:
+            self._finalize_night()
+            self.night = night
+            self.night_min_ta = None
+        if ta is not None:
+            self.night_min_ta = ta if self.night_min_ta is None else min(self.night_min_ta, ta)
+
+    def summary(self) -> Dict[str, Any]:
+        """확정값 + 진행 중인 오늘을 반영한 카운터"""
+        same_season = self.season == self.day[:4]
+        heat_days = self.heat_wave_days if same_season else 0
+        streak = self.streak if same_season else 0
+        max_streak = self.max_streak if same_season else 0
+        recent = self.window_heat_days
+
+        if self.day_max_at is not None and self.day_max_at >= HEAT_WAVE_APPARENT_TEMP:
+            heat_days += 1
+            consecutive = same_season and self.last_heat_day == _prev_day(self.day)
+            streak = streak + 1 if consecutive else 1
+            recent += 1
+
+        return {
+            "heat_wave_days": heat_days,
+            "heat_wave_streak": streak,
+            "max_heat_wave_streak": max(max_streak, streak),
+            "tropical_nights": self.tropical_nights if same_season else 0,
+            "recent_heat_wave_days": recent,
+        }
+
+
+class HeatWaveTracker:
+    """관측소별 폭염/열대야 상태 관리"""
+
+    def __init__(self):
+        self._stations: Dict[int, StationHeatState] = {}
+        # 시즌 전체가 반영된 카운터가 있으면 True (저장된 카운터를 이어 받았거나 시즌 채우기 완료)
+        self.ready = False
+        # 시즌 채우기 중에는 정시 관측을 바로 반영하지 않고 미뤄 둠 (관측은 시각 순서대로만 반영 가능)
+        self.backfilling = True
+        self._deferred: List[Tuple[List[Tuple[Any, ...]], datetime]] = []
+        # 카운터에 반영된 마지막 정시 (KST)
+        self.observed_until: Optional[datetime] = None
+
+    def observe(self, stn: int, tm: str, ta: Optional[float], apparent: Optional[float]) -> None:
+        """
+        시간별 관측 한 건 반영
+        - tm: YYYYMMDDHHmm
+        - apparent: 체감온도 (°C)
+        """
+        if stn not in KMA_STATION_COORDS or len(tm) < 10:
+            return
+        state = self._stations.get(stn)
+        if state is None:
+            state = self._stations[stn] = StationHeatState()
+        state.observe(tm[:8], int(tm[8:10]), ta, apparent)
+
+    def observe_columns(self, columns: Dict[str, List[Any]]) -> None:
+        """parse_kma_columns 결과 컬럼 반영 (행 dict를 만들지 않음)"""
+        apparent = columns.get("AT") or [None] * len(columns["TM"])
+        self._observe_records(zip(
+            columns["TM"], columns["STN"], columns["TA"], columns["HM"], columns["WS"], apparent
+        ))
+
+    def ingest(self, columns: Dict[str, List[Any]], until: datetime) -> None:
+        """정시 수집분 반영 (시즌 채우기 중이면 경기도 관측소 레코드만 미뤄 둠)"""
+        if not self.backfilling:
+            self.observe_columns(columns)
+            self.observed_until = until
+            return
+        apparent = columns.get("AT") or [None] * len(columns["TM"])
+        records = [
+            record for record in zip(
+                columns["TM"], columns["STN"], columns["TA"], columns["HM"], columns["WS"], apparent
+            )
+            if record[1] is not None and int(record[1]) in KMA_STATION_COORDS
+        ]
+        self._deferred.append((records, until))
+
+    def finish_backfill(self, until: datetime) -> None:
+        """시즌 채우기 완료: 미뤄 둔 정시 관측을 반영하고 ready"""
+        self.observed_until = until
+        for records, deferred_until in self._deferred:
+            self._observe_records(records)
+            self.observed_until = max(self.observed_until, deferred_until)
+        self._deferred = []
+        self.backfilling = False
+        self.ready = True
+
+    def save(self, path: str) -> None:
+        """카운터 저장 (임시 파일에 쓴 뒤 교체, 시즌 채우기 중에는 저장하지 않음)"""
+        if not path or self.backfilling or self.observed_until is None:
+            return
+        data = {
+            "version": STATE_VERSION,
+            "observed_until": self.observed_until.strftime("%Y%m%d%H00"),
+            "stations": {str(stn): state.to_dict() for stn, state in self._stations.items()},
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def load(self, path: str, season: str) -> Optional[datetime]:
+        """
+        저장된 카운터 복원 → 반영된 마지막 정시 (KST)
+        파일이 없거나 형식/시즌이 다르면 아무것도 바꾸지 않고 None
+        """
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != STATE_VERSION:
+                return None
+            until = datetime.strptime(data["observed_until"], "%Y%m%d%H%M").replace(tzinfo=KST)
+            if until.strftime("%Y") != season:
+                return None
+            stations = {int(stn): StationHeatState.from_dict(state) for stn, state in data["stations"].items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"폭염 카운터 복원 실패 ({path}): {e}")
+            return None
+        self._stations = stations
+        self.observed_until = until
+        self.ready = True
+        return until
+
+    def _observe_records(self, records: Iterable[Tuple[Any, ...]]) -> None:
+        """(TM, STN, TA, HM, WS, AT) 레코드 반영"""
+        relevant = []
+        for record in records:
+            try:
+                stn = int(record[1])
+                tm = str(int(record[0]))
+            except (TypeError, ValueError):
+                continue
+            if stn in KMA_STATION_COORDS:
+                relevant.append((tm, stn, record))
+        if not relevant:
+            return
+        relevant.sort(key=lambda r: (r[0], r[1]))
+
+        # AT 값이 없는 레코드만 모아 한 번에 계산
+        apparent = [record[5] for _, _, record in relevant]
+        pending = [i for i, value in enumerate(apparent) if value is None]
+        if pending:
+            computed = calculate_apparent_temperatures(
+                [relevant[i][2][2] for i in pending],
+                [relevant[i][2][3] for i in pending],
+                [relevant[i][2][4] for i in pending],
+            )
+            for i, value in zip(pending, computed):
+                apparent[i] = value
+
+        for (tm, stn, record), value in zip(relevant, apparent):
+            self.observe(stn, tm, record[2], value)
+
+    def region_summary(self, region: str) -> Optional[Dict[str, Any]]:
+        """시군 대표 관측소의 카운터 (시즌 채우기 전이거나 관측 이력이 없으면 None)"""
+        if not self.ready:
+            return None
+        state = self._stations.get(REGION_STATIONS.get(region))
+        if state is None or state.day is None:
+            return None
+        return state.summary()
+
+
+heatwave_tracker = HeatWaveTracker()
+track("heatwave_tracker", "kma", lambda: heatwave_tracker)
+
+
+async def backfill_season(end: datetime) -> None:
+    """
+    end(KST 정시, 포함)까지 경기도 관측소의 시간별 관측으로 카운터를 채운 뒤 ready
+    저장된 카운터가 있으면 그 다음 정시부터, 없으면 올해 1월 1일 0시부터 조회
+    관측소별로 BACKFILL_CHUNK_HOURS 단위 기간 조회를 시각 순서대로 반영하고,
+    실패한 구간은 BACKFILL_RETRY_SECONDS부터 두 배씩(BACKFILL_RETRY_MAX_SECONDS 상한) 기다려 다시 조회
+    """
+    season_start = end.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    restored = await asyncio.to_thread(heatwave_tracker.load, settings.HEATWAVE_STATE_PATH, f"{end:%Y}")
+    start = restored + timedelta(hours=1) if restored else season_start
+    if restored:
+        logger.info(f"폭염 카운터 복원 ({restored:%Y%m%d%H}까지 반영)")
+
+    delay = BACKFILL_RETRY_SECONDS
+    for stn in KMA_STATION_COORDS:
+        first = start
+        while first <= end:
+            last = min(end, first + timedelta(hours=BACKFILL_CHUNK_HOURS - 1))
+            tm1, tm2 = first.strftime("%Y%m%d%H00"), last.strftime("%Y%m%d%H00")
+            try:
+                result = await fetch_kma_period(tm1, tm2, str(stn), remember=False)
+                if result.get("stale"):
+                    raise RuntimeError("stale 응답")
+            except Exception as e:
+                logger.warning(f"폭염 시즌 채우기 실패 ({stn}, {tm1}~{tm2}, {delay}초 후 재시도): {e}")
+                await asyncio.sleep(delay)
+                delay = min(BACKFILL_RETRY_MAX_SECONDS, delay * 2)
+                continue
+            delay = BACKFILL_RETRY_SECONDS
+            heatwave_tracker.observe_columns(result["columns"])
+            first = last + timedelta(hours=1)
+    heatwave_tracker.finish_backfill(max(end, restored) if restored else end)
+    await asyncio.to_thread(heatwave_tracker.save, settings.HEATWAVE_STATE_PATH)
+    logger.info(f"폭염 시즌 채우기 완료 ({start:%Y%m%d%H}~{end:%Y%m%d%H})")
@@ -0,0 +1,155 @@
+"""
+지역별 기후 점수 이력 모듈
+스냅샷 갱신마다 점수와 입력값을 추가 전용(append-only) 배열에 기록하고
+조회 시 서버에서 LTTB로 다운샘플링해 고정 개수의 포인트만 반환
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, List
+
+from config import settings
+from memory import track
+
+# 점수와 함께 기록하는 입력값
+HISTORY_FIELDS = ("temperature", "apparent_temperature", "humidity", "pm10", "pm25")
+
+
+class RegionHistory:
+    """
+    한 지역의 이력 (열 단위 배열)
+    - timestamps: epoch 초 (오름차순)
+    - scores: 0~100 점수 (1바이트)
+    - inputs: 입력값별 float32 배열
+    """
+
+    __slots__ = ("timestamps", "scores", "inputs")
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.scores = array("B")
+        self.inputs = {field: array("f") for field in HISTORY_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, ts: float, score: int, data: Dict[str, Any]) -> None:
+        # 시각이 역순이면 무시 (bisect 조회 전제 유지)
+        if self.timestamps and ts <= self.timestamps[-1]:
+            return
+        self.timestamps.append(ts)
+        self.scores.append(max(0, min(100, int(score))))
+        for field, column in self.inputs.items():
+            value = data.get(field)
+            column.append(float(value) if value is not None else float("nan"))
+
+    def trim_before(self, ts: float) -> None:
+        """보관 기간이 지난 앞부분 삭제"""
+        idx = bisect_left(self.timestamps, ts)
+        if idx:
+            del self.timestamps[:idx]
+            del self.scores[:idx]
+            for column in self.inputs.values():
+                del column[:idx]
+
+
+def lttb_indices(xs, ys, threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링
+    첫/마지막 점을 유지하고 각 버킷에서 시각적으로 가장 중요한 점의 인덱스 반환
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    indices = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # 다음 버킷 평균점
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        # 현재 버킷에서 삼각형 넓이가 최대인 점 선택
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+
+        indices.append(best)
+        a = best
+
+    indices.append(n - 1)
+    return indices
+
+
+class ScoreHistory:
+    """전체 지역 점수 이력 저장소"""
+
+    def __init__(self, retention_days: int):
+        self.retention_seconds = retention_days * 86400
+        self._regions: Dict[str, RegionHistory] = {}
+
+    def _region(self, region: str) -> RegionHistory:
+        history = self._regions.get(region)
+        if history is None:
+            history = self._regions[region] = RegionHistory()
+        return history
+
+    def append(self, region: str, ts: float, score: int, data: Dict[str, Any]) -> None:
+        self._region(region).append(ts, score, data)
+
+    def record(self, snapshot) -> None:
+        """스냅샷 한 건을 모든 지역 이력에 추가"""
+        ts = snapshot.created_at.timestamp()
+        cutoff = ts - self.retention_seconds
+        for region, entry in snapshot.regions.items():
+            history = self._region(region)
+            history.append(ts, entry["score"], entry["data"])
+            if history.timestamps[0] < cutoff:
+                history.trim_before(cutoff)
+
+    def load(self, rows: List[Dict[str, Any]]) -> None:
+        """DB에서 읽은 이력으로 초기 적재 (recorded_at 오름차순)"""
+        for row in rows:
+            recorded_at = datetime.fromisoformat(row["recorded_at"])
+            self.append(row["region"], recorded_at.timestamp(), row["score"], row)
+
+    def query(self, region: str, start: float, end: float, points: int) -> Dict[str, Any]:
+        """
+        [start, end] 구간 이력 조회
+        구간 길이와 관계없이 최대 points개로 다운샘플링
+        """
+        history = self._regions.get(region)
+        if history is None:
+            return {"total": 0, "points": []}
+
+        lo = bisect_left(history.timestamps, start)
+        hi = bisect_right(history.timestamps, end)
+        xs = history.timestamps[lo:hi]
+        ys = history.scores[lo:hi]
+
+        result = []
+        for idx in lttb_indices(xs, ys, points):
+            point = {
+                "timestamp": datetime.fromtimestamp(xs[idx]).isoformat(),
+                "score": ys[idx],
+            }
+            for field, column in history.inputs.items():
+                value = column[lo + idx]
+                point[field] = None if value != value else round(value, 1)
+            result.append(point)
+
+        return {"total": len(xs), "points": result}
+
+
+score_history = ScoreHistory(settings.HISTORY_RETENTION_DAYS)
+track("score_history", "snapshots", lambda: score_history)
@@ -2,13 +2,27 @@
 기상청 API 프록시 모듈
 CORS 문제를 해결하기 위해 서버사이드에서 API 호출
 """
-import httpx
+import json
 import re
-from typing import List, Dict, Any
+import time
+from collections import OrderedDict
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+import httpx
+
+from circuit_breaker import guarded, upstream_timeout
+from columnar import compact_columns
+from climate_index import calculate_apparent_temperatures
+from config import settings
+from memory import track
+from metrics import CACHE_REQUESTS, PARSE_SECONDS, upstream_client
+from tracing import span
 
 # 기상청 API 설정
 KMA_AUTH_KEY = "DbUh4_ekRRi1IeP3pPUYog"
-KMA_BASE_URL = "https://apihub.kma.go.kr/api/typ01/url"
+KMA_BASE_URL = settings.KMA_BASE_URL
 
 # 기상청 API 응답 컬럼 정의
 KMA_COLUMNS = [
@@ -21,66 +35,379 @@ KMA_COLUMNS = [
     'ST_SEA', 'WH', 'BF', 'IR', 'IX'
 ]
 
+# 결측값 표기
+KMA_MISSING_VALUES = ('-9', '-99.0', '-9.0')
+
+# 경기도 ASOS 관측소 → 시군
+KMA_STATION_REGIONS = {
+    98: "동두천시",
+    99: "파주시",
+    119: "수원시",
+    202: "양평군",
+    203: "이천시",
+}
+
+# 일별 통계 계산에 쓰는 컬럼 위치 (KMA_COLUMNS 기준)
+_IDX_TM, _IDX_STN, _IDX_WS = 0, 1, 3
+_IDX_TA, _IDX_HM, _IDX_RN = 11, 13, 15
+
+# 완료된 날짜의 일별 통계 캐시: (stn, YYYYMMDD) → {"stations", "regions"}
+DAILY_CACHE_MAX_DAYS = 512
+# 일별 통계 한 번에 조회할 수 있는 최대 일수
+DAILY_MAX_DAYS = 366
+_daily_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+track("kma_daily_cache", "kma", lambda: _daily_cache)
+
+KST = timezone(timedelta(hours=9))
+
+
+_NUMBER = re.compile(r'^-?\d+\.?\d*$')
+
+
+def _kma_token(value: str) -> Any:
+    """결측값(-9, -99.0, -9.0)은 None, 숫자는 float, 그 외는 문자열"""
+    if value in KMA_MISSING_VALUES:
+        return None
+    if _NUMBER.match(value):
+        return float(value)
+    return value
+
+
+def parse_kma_columns(text: str) -> Dict[str, List[Any]]:
+    """
+    기상청 API 텍스트 응답을 컬럼 버퍼로 파싱 (KMA_COLUMNS 순서, 컬럼 → 행별 값 목록)
+    행마다 46개 키 dict를 만들지 않으므로 컬럼형 응답과 일괄 계산에 그대로 사용
+    관측 데이터의 압축 표현은 이 컬럼 버퍼이며, 별도의 행 레코드 타입은 두지 않음
+    """
+    width = len(KMA_COLUMNS)
+    padding = [None] * width
+    rows = []
+    for line in text.split('\n'):
+        if not line.strip() or line.startswith('#') or 'END7777' in line or 'START7777' in line:
+            continue
+        values = [_kma_token(value) for value in line.split()[:width]]
+        if len(values) < width:
+            values += padding[len(values):]
+        rows.append(values)
+    if not rows:
+        return {col: [] for col in KMA_COLUMNS}
+    return {col: list(values) for col, values in zip(KMA_COLUMNS, zip(*rows))}
+
+
+def kma_rows(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """컬럼 버퍼 → 기존 JSON 형태의 행 목록"""
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
 
 def parse_kma_response(text: str) -> List[Dict[str, Any]]:
     """기상청 API 텍스트 응답을 JSON으로 파싱"""
-    lines = [
-        line for line in text.split('\n')
-        if line.strip() and not line.startswith('#')
-        and 'END7777' not in line and 'START7777' not in line
-    ]
-
-    data = []
-    for line in lines:
-        values = line.strip().split()
-        record = {}
-        for idx, col in enumerate(KMA_COLUMNS):
-            if idx < len(values):
-                value = values[idx]
-                # 결측값 처리 (-9, -99.0, -9.0)
-                if value in ['-9', '-99.0', '-9.0']:
-                    record[col] = None
-                elif re.match(r'^-?\d+\.?\d*$', value):
-                    record[col] = float(value)
-                else:
-                    record[col] = value
-            else:
-                record[col] = None
-        data.append(record)
-
-    return data
+    return kma_rows(parse_kma_columns(text))
+
+
+def add_apparent_temperature(columns: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """관측 행 전체의 체감온도(AT)를 TA/HM/WS 컬럼 단위로 한 번에 계산해 컬럼으로 추가"""
+    columns['AT'] = calculate_apparent_temperatures(columns['TA'], columns['HM'], columns['WS'])
+    return columns
+
+
+# JSONResponse와 같은 직렬화 옵션
+_dumps = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode
+# JSON 직렬화 시 한 번에 만드는 행 dict 수 (메모리 상한과 호출 비용 사이의 절충)
+JSON_CHUNK_ROWS = 256
+
+
+def kma_json(result: Dict[str, Any]) -> bytes:
+    """
+    조회 결과의 컬럼 버퍼를 행 목록("data")으로 바꾼 JSON 응답 본문
+    행 dict는 JSON_CHUNK_ROWS행씩만 만들어 바로 직렬화하므로 전체 행 dict 목록이 메모리에 쌓이지 않음
+    """
+    body = {key: value for key, value in result.items() if key != "columns"}
+    columns = result["columns"]
+    names = list(columns)
+    rows = zip(*columns.values())
+    parts = []
+    while True:
+        chunk = [dict(zip(names, values)) for values in islice(rows, JSON_CHUNK_ROWS)]
+        if not chunk:
+            break
+        parts.append(_dumps(chunk)[1:-1].encode("utf-8"))
+    head = (_dumps(body)[:-1] + ("," if body else "") + '"data":[').encode("utf-8")
+    if not parts:
+        return head + b"]}"
+    # 앞뒤를 첫/마지막 조각에 붙여 전체 본문 복사를 한 번(join)으로 줄임
+    parts[0] = head + parts[0]
+    parts[-1] += b"]}"
+    return b",".join(parts)
+
+
+def kma_columnar(result: Dict[str, Any]) -> Dict[str, Any]:
+    """조회 결과의 컬럼 버퍼를 그대로 "data"(컬럼 → 값 배열)로 둔 MessagePack 응답 본문"""
+    body = {key: value for key, value in result.items() if key != "columns"}
+    body["data"] = compact_columns(result["columns"])
+    return body
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def kma_client() -> httpx.AsyncClient:
+    """
+    기상청 호출 공용 클라이언트 (요청마다 새로 연결하지 않고 keep-alive 연결 풀 재사용)
+    배치 요청의 하위 요청들도 같은 연결 풀을 공유
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = upstream_client(timeout=upstream_timeout())
+    return _client
+
+
+async def close_kma_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _fetch_text(url: str) -> str:
+    with span("fetch"):
+        response = await kma_client().get(url)
+        response.raise_for_status()
+        return response.text
 
 
 async def fetch_kma_single(tm: str, stn: str = "0") -> Dict[str, Any]:
-    """단일 시간 기상 데이터 조회"""
+    """
+    단일 시간 기상 데이터 조회 (차단 중/장애 시 마지막 정상 응답을 stale로 반환)
+    관측 값은 "columns"(컬럼 버퍼)에 담기며 응답 형식은 kma_json / kma_columnar로 변환
+    """
     url = f"{KMA_BASE_URL}/kma_sfctm2.php?tm={tm}&stn={stn}&authKey={KMA_AUTH_KEY}"
-    
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        text = response.text
-        data = parse_kma_response(text)
-        
+
+    async def fetch() -> Dict[str, Any]:
+        text = await _fetch_text(url)
+        with span("parse"), PARSE_SECONDS.time(parser="kma_sfctm2"):
+            columns = add_apparent_temperature(parse_kma_columns(text))
         return {
             "success": True,
             "datetime": tm,
-            "count": len(data),
-            "data": data
+            "count": len(columns["TM"]),
+            "columns": columns
         }
 
+    return await guarded("kma_sfctm2").call((tm, stn), fetch)
+
 
-async def fetch_kma_period(tm1: str, tm2: str, stn: str = "0") -> Dict[str, Any]:
-    """기간 기상 데이터 조회"""
+async def fetch_kma_period(tm1: str, tm2: str, stn: str = "0", remember: bool = True) -> Dict[str, Any]:
+    """
+    기간 기상 데이터 조회 (차단 중/장애 시 마지막 정상 응답을 stale로 반환)
+    remember=False면 응답을 stale 대체용으로 보관하지 않음 (한 번만 읽는 수집 작업용)
+    """
     url = f"{KMA_BASE_URL}/kma_sfctm3.php?tm1={tm1}&tm2={tm2}&stn={stn}&authKey={KMA_AUTH_KEY}"
-    
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        text = response.text
-        data = parse_kma_response(text)
-        
+
+    async def fetch() -> Dict[str, Any]:
+        text = await _fetch_text(url)
+        with span("parse"), PARSE_SECONDS.time(parser="kma_sfctm3"):
+            columns = add_apparent_temperature(parse_kma_columns(text))
         return {
             "success": True,
             "startTime": tm1,
             "endTime": tm2,
-            "count": len(data),
-            "data": data
+            "count": len(columns["TM"]),
+            "columns": columns
+        }
+
+    return await guarded("kma_sfctm3").call((tm1, tm2, stn), fetch, remember=remember)
+
+
+def _kma_value(values: List[str], idx: int) -> Optional[float]:
+    """결측이면 None, 아니면 float"""
+    if idx >= len(values):
+        return None
+    value = values[idx]
+    if value in KMA_MISSING_VALUES:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class DailyAggregator:
+    """
+    기간 응답을 한 줄씩 받아 관측소/일 단위 통계를 누적
+    행 dict를 만들지 않고 필요한 컬럼(TA, HM, WS, RN)만 읽음
+    """
+
+    # 누적값 배열 위치
+    TA_MIN, TA_MAX, TA_SUM, TA_N, RN_SUM, HM_SUM, HM_N, WS_MAX, N = range(9)
+
+    def __init__(self):
+        self._acc: Dict[Tuple[str, int], list] = {}
+
+    def add_line(self, line: str) -> None:
+        if not line or line.startswith('#') or 'END7777' in line or 'START7777' in line:
+            return
+        values = line.split()
+        if len(values) <= _IDX_RN:
+            return
+        try:
+            date = values[_IDX_TM][:8]
+            stn = int(values[_IDX_STN])
+        except ValueError:
+            return
+
+        acc = self._acc.get((date, stn))
+        if acc is None:
+            acc = self._acc[(date, stn)] = [None, None, 0.0, 0, 0.0, 0.0, 0, None, 0]
+        acc[self.N] += 1
+
+        ta = _kma_value(values, _IDX_TA)
+        if ta is not None:
+            acc[self.TA_MIN] = ta if acc[self.TA_MIN] is None else min(acc[self.TA_MIN], ta)
+            acc[self.TA_MAX] = ta if acc[self.TA_MAX] is None else max(acc[self.TA_MAX], ta)
+            acc[self.TA_SUM] += ta
+            acc[self.TA_N] += 1
+
+        rn = _kma_value(values, _IDX_RN)
+        if rn is not None and rn > 0:
+            acc[self.RN_SUM] += rn
+
+        hm = _kma_value(values, _IDX_HM)
+        if hm is not None:
+            acc[self.HM_SUM] += hm
+            acc[self.HM_N] += 1
+
+        ws = _kma_value(values, _IDX_WS)
+        if ws is not None:
+            acc[self.WS_MAX] = ws if acc[self.WS_MAX] is None else max(acc[self.WS_MAX], ws)
+
+    @classmethod
+    def _merge(cls, into: list, acc: list) -> None:
+        for idx, pick in ((cls.TA_MIN, min), (cls.TA_MAX, max), (cls.WS_MAX, max)):
+            if acc[idx] is not None:
+                into[idx] = acc[idx] if into[idx] is None else pick(into[idx], acc[idx])
+        for idx in (cls.TA_SUM, cls.TA_N, cls.RN_SUM, cls.HM_SUM, cls.HM_N, cls.N):
+            into[idx] += acc[idx]
+
+    @classmethod
+    def _finalize(cls, acc: list) -> Dict[str, Any]:
+        return {
+            "TA_MIN": acc[cls.TA_MIN],
+            "TA_MAX": acc[cls.TA_MAX],
+            "TA_AVG": round(acc[cls.TA_SUM] / acc[cls.TA_N], 1) if acc[cls.TA_N] else None,
+            "RN_DAY": round(acc[cls.RN_SUM], 1),
+            "HM_AVG": round(acc[cls.HM_SUM] / acc[cls.HM_N], 1) if acc[cls.HM_N] else None,
+            "WS_MAX": acc[cls.WS_MAX],
+            "COUNT": acc[cls.N],
         }
+
+    def days(self) -> Dict[str, Dict[str, Any]]:
+        """날짜별 {"stations": {STN: 통계}, "regions": {시군: 통계}}"""
+        result: Dict[str, Dict[str, Any]] = {}
+        region_acc: Dict[Tuple[str, str], list] = {}
+
+        for (date, stn), acc in self._acc.items():
+            day = result.setdefault(date, {"stations": {}, "regions": {}})
+            day["stations"][str(stn)] = self._finalize(acc)
+
+            region = KMA_STATION_REGIONS.get(stn)
+            if region:
+                merged = region_acc.get((date, region))
+                if merged is None:
+                    merged = region_acc[(date, region)] = [None, None, 0.0, 0, 0.0, 0.0, 0, None, 0]
+                self._merge(merged, acc)
+
+        for (date, region), acc in region_acc.items():
+            result[date]["regions"][region] = self._finalize(acc)
+
+        return result
+
+
+def daily_range(tm1: str, tm2: str) -> Tuple[str, str]:
+    """
+    일별 통계 조회 구간 (YYYYMMDD, YYYYMMDD)
+    종료일이 오늘(KST) 이후면 오늘로 자르고, 순서가 틀리거나 DAILY_MAX_DAYS일을 넘으면 ValueError
+    """
+    start, end = tm1[:8], tm2[:8]
+    first = datetime.strptime(start, "%Y%m%d")
+    last = min(datetime.strptime(end, "%Y%m%d"), datetime.strptime(datetime.now(KST).strftime("%Y%m%d"), "%Y%m%d"))
+    if first > last:
+        raise ValueError("tm1은 tm2(오늘 이후면 오늘)보다 이전이어야 합니다.")
+    if (last - first).days + 1 > DAILY_MAX_DAYS:
+        raise ValueError(f"조회 기간은 최대 {DAILY_MAX_DAYS}일입니다.")
+    return start, last.strftime("%Y%m%d")
+
+
+def _date_range(start: str, end: str) -> List[str]:
+    day = datetime.strptime(start, "%Y%m%d")
+    last = datetime.strptime(end, "%Y%m%d")
+    days = []
+    while day <= last:
+        days.append(day.strftime("%Y%m%d"))
+        day += timedelta(days=1)
+    return days
+
+
+async def fetch_kma_daily(tm1: str, tm2: str, stn: str = "0") -> Dict[str, Any]:
+    """
+    기간 데이터를 일별 통계로 집계해 반환
+    - 응답을 한 줄씩 스트리밍하며 한 번에 집계 (원본 행 목록을 만들지 않음)
+    - 완료된 날짜(KST 오늘 이전)는 캐시, 캐시에 없는 날짜 구간만 조회
+    - 조회 구간이 차단 중/장애면 같은 구간의 마지막 정상 집계를 stale로 사용 (일별 캐시에는 넣지 않음)
+    - 구간이 잘못됐거나 너무 길면 ValueError (daily_range)
+    """
+    start, end = daily_range(tm1, tm2)
+    days = _date_range(start, end)
+    today = datetime.now(KST).strftime("%Y%m%d")
+
+    missing = [d for d in days if d >= today or (stn, d) not in _daily_cache]
+    fetched: Dict[str, Dict[str, Any]] = {}
+    stale: Dict[str, Any] = {}
+    CACHE_REQUESTS.inc(len(days) - len(missing), cache="kma_daily", result="hit")
+    CACHE_REQUESTS.inc(len(missing), cache="kma_daily", result="miss")
+
+    if missing:
+        url = (
+            f"{KMA_BASE_URL}/kma_sfctm3.php?tm1={missing[0]}0000&tm2={missing[-1]}2300"
+            f"&stn={stn}&authKey={KMA_AUTH_KEY}"
+        )
+
+        async def fetch() -> Dict[str, Any]:
+            aggregator = DailyAggregator()
+            parse_seconds = 0.0
+            with span("fetch"):  # 스트리밍 집계 포함
+                async with kma_client().stream("GET", url) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        started = time.perf_counter()
+                        aggregator.add_line(line)
+                        parse_seconds += time.perf_counter() - started
+            PARSE_SECONDS.observe(parse_seconds, parser="kma_sfctm3_daily")
+            return {"days": aggregator.days()}
+
+        outcome = await guarded("kma_sfctm3_daily").call((stn, missing[0], missing[-1]), fetch)
+        fetched = outcome["days"]
+        if outcome.get("stale"):
+            stale = {"stale": True, "staleSeconds": outcome["staleSeconds"]}
+        else:
+            for d in missing:
+                if d < today:
+                    _daily_cache[(stn, d)] = fetched.get(d, {"stations": {}, "regions": {}})
+                    _daily_cache.move_to_end((stn, d))
+            while len(_daily_cache) > DAILY_CACHE_MAX_DAYS:
+                _daily_cache.popitem(last=False)
+
+    missing_set = set(missing)
+    result = []
+    for d in days:
+        entry = fetched.get(d) if d in missing_set else _daily_cache.get((stn, d))
+        result.append({"date": d, **(entry or {"stations": {}, "regions": {}})})
+
+    return {
+        "success": True,
+        "startTime": start,
+        "endTime": end,
+        "count": len(result),
+        "days": result,
+        **stale
+    }
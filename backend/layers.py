@@ -0,0 +1,183 @@
+"""
+지도 레이어 모듈
+스냅샷 점수를 렌더링 가능한 GeoJSON(FeatureCollection)으로 미리 만들어 두고 압축본과 ETag를 함께 보관
+- 줌 구간마다 시군/읍·면·동 중 표시 단위와 좌표 자릿수를 달리해 필요한 만큼만 전송
+- 점수, 위험 등급 색상/라벨은 feature 속성에 포함 (클라이언트에서 결합 불필요)
+- 시군/읍·면·동 스냅샷 버전이 바뀔 때만 다시 생성
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from climate_index import (
+    TARGET_MULTIPLIERS,
+    get_risk_color,
+    get_risk_label,
+    target_risk,
+)
+from memory import track
+from subregions import PARENTS
+
+# (최소 줌, 레이어 이름, 표시 단위, 좌표 소수 자릿수) - 줌이 클수록 촘촘한 단위와 정밀한 좌표
+ZOOM_LEVELS: Tuple[Tuple[int, str, str, int], ...] = (
+    (0, "z0", "regions", 2),
+    (9, "z9", "regions", 3),
+    (11, "z11", "subregions", 4),
+)
+GZIP_LEVEL = 6
+
+
+def zoom_level(zoom: int) -> Tuple[str, str, int]:
+    """줌 → (레이어 이름, 표시 단위, 좌표 자릿수)"""
+    chosen = ZOOM_LEVELS[0]
+    for level in ZOOM_LEVELS:
+        if zoom >= level[0]:
+            chosen = level
+    return chosen[1], chosen[2], chosen[3]
+
+
+def _feature(lat: float, lng: float, digits: int, properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(lng, digits), round(lat, digits)]},
+        "properties": properties,
+    }
+
+
+def _region_features(snapshot, digits: int, target: Optional[str]) -> List[Dict[str, Any]]:
+    features = []
+    for name, entry in snapshot.regions.items():
+        data = entry["data"]
+        adjusted, risk = target_risk(entry["score"], target)
+        features.append(_feature(data["lat"], data["lng"], digits, {
+            "id": name,
+            "name": name,
+            "score": entry["score"],
+            "adjusted_score": adjusted,
+            "risk_level": risk.value,
+            "risk_color": get_risk_color(risk),
+            "risk_label": get_risk_label(risk),
+            "temperature": data.get("temperature"),
+            "apparent_temperature": data.get("apparent_temperature"),
+        }))
+    return features
+
+
+def _subregion_features(current, registry, digits: int, target: Optional[str]) -> List[Dict[str, Any]]:
+    features = []
+    values = current.values
+    for i in range(len(registry)):
+        adjusted, risk = target_risk(current.scores[i], target)
+        features.append(_feature(registry.lat[i], registry.lng[i], digits, {
+            "id": registry.codes[i],
+            "name": registry.names[i],
+            "parent": PARENTS[registry.parent[i]],
+            "score": current.scores[i],
+            "adjusted_score": adjusted,
+            "risk_level": risk.value,
+            "risk_color": get_risk_color(risk),
+            "risk_label": get_risk_label(risk),
+            "temperature": round(values["temperature"][i], 1),
+            "apparent_temperature": round(values["apparent_temperature"][i], 1),
+            "stale": current.updated[i] != current.version,
+        }))
+    return features
+
+
+def _quality(params: List[str]) -> float:
+    """헤더 항목 파라미터의 q 값 (없으면 1, 해석할 수 없으면 0)"""
+    for param in params:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Accept-Encoding이 gzip을 허용하는지
+    gzip(x-gzip)이 명시되면 그 q 값으로, 없으면 *의 q 값으로 판단 (q=0은 거부)
+    """
+    if not accept_encoding:
+        return False
+    wildcard = None
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if coding in ("gzip", "x-gzip"):
+            return _quality(params) > 0
+        if coding == "*":
+            wildcard = _quality(params) > 0
+    return bool(wildcard)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 목록에 ETag가 있는지 (태그 단위 비교, W/ 약한 태그와 *도 일치로 봄)"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+class Layer:
+    """직렬화된 레이어 (원본/gzip 본문과 ETag)"""
+
+    __slots__ = ("key", "body", "gzipped", "etag")
+
+    def __init__(self, key: Tuple, body: bytes):
+        self.key = key
+        self.body = body
+        self.gzipped = gzip.compress(body, GZIP_LEVEL, mtime=0)
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+class LayerCache:
+    """(줌 구간, 대상) → 현재 스냅샷 버전의 레이어"""
+
+    def __init__(self):
+        self._layers: Dict[Tuple[str, Optional[str]], Layer] = {}
+
+    def __len__(self) -> int:
+        return len(self._layers)
+
+    def get(self, zoom: int, target: Optional[str], snapshot, subregions=None, registry=None) -> Layer:
+        """
+        레이어 조회 (스냅샷 버전이 바뀌었으면 다시 생성)
+        읍·면·동 스냅샷이 없으면 높은 줌에서도 시군 레이어를 사용
+        """
+        if target not in TARGET_MULTIPLIERS:
+            target = None
+        name, unit, digits = zoom_level(zoom)
+        if unit == "subregions" and subregions is None:
+            name, unit, digits = next((n, u, d) for _, n, u, d in reversed(ZOOM_LEVELS) if u == "regions")
+
+        version = (snapshot.version, subregions.version if unit == "subregions" else 0)
+        cached = self._layers.get((name, target))
+        if cached is not None and cached.key == version:
+            return cached
+
+        if unit == "subregions":
+            features = _subregion_features(subregions, registry, digits, target)
+        else:
+            features = _region_features(snapshot, digits, target)
+        collection = {
+            "type": "FeatureCollection",
+            "name": name,
+            "version": version[0],
+            "timestamp": snapshot.created_at.isoformat(),
+            "features": features,
+        }
+        body = json.dumps(collection, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        layer = self._layers[(name, target)] = Layer(version, body)
+        return layer
+
+
+layer_cache = LayerCache()
+track("map_layers", "snapshots", lambda: layer_cache)
@@ -1,29 +1,175 @@
 """
 경기 기후 체감 맵 - FastAPI 백엔드 서버
 """
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from enum import Enum
 
-from climate_api import get_mock_climate_data, get_all_mock_data, GYEONGGI_REGIONS
+from alerts import alert_feed
+from archive import (
+    AGGREGATES as ARCHIVE_AGGREGATES,
+    VALUE_COLUMNS as ARCHIVE_VALUE_COLUMNS,
+    ArchiveUnavailableError,
+    observation_archive,
+)
+from batch import NDJSON_MEDIA_TYPE, BatchRequest, BatchRunner, validate_batch
+from circuit_breaker import CircuitOpenError, breaker_states
+from climate_api import GYEONGGI_REGIONS
 from climate_index import (
-    calculate_climate_score,
+    TARGET_MULTIPLIERS,
     adjust_score_for_target,
     get_risk_color,
     get_risk_label,
-    RiskLevel,
+    risk_level_for,
     TargetGroup
 )
 from ai_service import AIClimateExplainer, get_action_guide
-from kma_proxy import fetch_kma_single, fetch_kma_period
+from columnar import MSGPACK_MEDIA_TYPE, compact_columns, packb, wants_msgpack
+from config import settings
+from kma_proxy import (
+    KST,
+    close_kma_client,
+    fetch_kma_daily,
+    fetch_kma_period,
+    fetch_kma_single,
+    kma_columnar,
+    kma_json,
+)
+from supabase_client import (
+    report_service,
+    report_stats_service,
+    score_history_service,
+    MAX_REPORT_PAGE_SIZE,
+)
+from snapshot import snapshot_store
+from layers import accepts_gzip, etag_matches, layer_cache, zoom_level
+from spatial import region_locator
+from notifications import create_sink, notification_engine
+from stream import StreamFullError, stream_hub
+from subregions import PARENTS, subregion_registry, subregion_store
+from history import score_history
+from heatwave import backfill_season, heatwave_tracker
+import memory
+from metrics import REGISTRY, CONTENT_TYPE, HTTP_REQUEST_SECONDS
+from tracing import TracedRoute, finish_trace, span, start_trace
+from profiling import (
+    PROFILE_HEADER,
+    finish_profile,
+    is_admin,
+    list_profiles,
+    profile_path,
+    profile_text,
+    start_profile,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def record_history(snapshot, previous):
+    """스냅샷 갱신마다 점수 이력 기록 (메모리 + DB 추가 전용)"""
+    score_history.record(snapshot)
+    await score_history_service.append_snapshot(snapshot)
+
+
+snapshot_store.subscribe(record_history)
+snapshot_store.subscribe(subregion_store.refresh)
+snapshot_store.subscribe(stream_hub.publish_snapshot)
+snapshot_store.subscribe(notification_engine.evaluate)
+alert_feed.subscribe(stream_hub.publish_alerts)
+
+
+# 놓친 정시를 이어 받을 때 기간 조회 한 번의 최대 시간 수
+CATCHUP_CHUNK_HOURS = 24
+
+
+def _latest_observed_hour() -> datetime:
+    """관측 자료가 반영됐을 최신 정시 (KST, 정시 20분 이후)"""
+    return (datetime.now(KST) - timedelta(minutes=20)).replace(minute=0, second=0, microsecond=0)
+
+
+async def ingest_observations():
+    """
+    정시 관측 수집 (폭염/열대야 카운터와 관측 아카이브는 이 작업으로만 갱신)
+    - 시작 시점까지의 시즌 채우기(backfill_season)는 별도 작업으로 돌리고 매시간 수집은 기다리지 않음
+      (채우기가 끝나기 전의 정시 관측은 카운터가 미뤄 두었다가 순서대로 반영)
+    - 매시간 마지막으로 받은 정시 이후를 모두 받음: 한 시간이면 단일 조회, 놓친 정시가 있으면 기간 조회
+    - 실패한 구간은 다음 시도에서 이어 받음 (성공한 구간까지만 진행)
+    """
+    last = _latest_observed_hour()
+    backfill = asyncio.create_task(backfill_season(last))
+    try:
+        while True:
+            target = _latest_observed_hour()
+            while last < target:
+                first = last + timedelta(hours=1)
+                until = min(target, first + timedelta(hours=CATCHUP_CHUNK_HOURS - 1))
+                tm1, tm2 = first.strftime("%Y%m%d%H00"), until.strftime("%Y%m%d%H00")
+                try:
+                    if first == until:
+                        result = await fetch_kma_single(tm1)
+                    else:
+                        result = await fetch_kma_period(tm1, tm2, remember=False)
+                    if result.get("stale"):
+                        raise RuntimeError("stale 응답")
+                except Exception as e:
+                    logger.warning(f"관측 수집 실패 ({tm1}~{tm2}): {e}")
+                    break
+                heatwave_tracker.ingest(result["columns"], until)
+                await observation_archive.ingest(result["columns"])
+                last = until
+            await asyncio.to_thread(heatwave_tracker.save, settings.HEATWAVE_STATE_PATH)
+            if last < target:
+                # 실패한 구간은 5분 뒤 다시 시도
+                await asyncio.sleep(300)
+            else:
+                # 다음 정시 20분(관측 자료 반영 여유)까지 대기
+                await asyncio.sleep((20 * 60 - time.time() % 3600) % 3600 or 3600)
+    finally:
+        backfill.cancel()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 재시작 후에도 추세 조회가 이어지도록 보관 기간 내 이력 적재
+    since = datetime.now() - timedelta(seconds=score_history.retention_seconds)
+    score_history.load(await score_history_service.load_since(since))
+
+    notification_engine.queue.sink = create_sink(settings.NOTIFY_SINK)
+    refresher = asyncio.create_task(snapshot_store.run())
+    observer = asyncio.create_task(ingest_observations())
+    alerter = asyncio.create_task(alert_feed.run())
+    notifier = asyncio.create_task(notification_engine.queue.run())
+    yield
+    refresher.cancel()
+    observer.cancel()
+    alerter.cancel()
+    notifier.cancel()
+    # 조회 응답에서 모아 둔 관측이 남아 있으면 기록
+    await asyncio.to_thread(observation_archive.flush)
+    await notification_engine.queue.sink.close()
+    await batch_runner.close()
+    await close_kma_client()
+
 
 app = FastAPI(
     title="경기 기후 체감 맵 API",
     description="경기도 읍·면·동 단위 기후 체감 지수 및 AI 설명 서비스",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+# 엔드포인트 실행(handler)과 응답 직렬화(serialize) 단계를 자동 기록
+app.router.route_class = TracedRoute
+# /api/batch 하위 요청을 앱 내부로 전달
+batch_runner = BatchRunner(app)
 
 # CORS 설정 (프론트엔드 연동용)
 app.add_middleware(
@@ -34,6 +180,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """
+    라우트 템플릿별 요청 처리 시간 기록 (경로 값이 아닌 템플릿으로 라벨 수 제한)
+    샘플링된 요청은 단계별 시간을 Server-Timing 헤더로 반환
+    """
+    start = time.perf_counter()
+    trace = start_trace()
+    # 운영자 헤더 또는 샘플링으로 선택된 요청만 프로파일링
+    profile = start_profile(request.headers.get(PROFILE_HEADER))
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        if trace is not None:
+            trace.close_pending()
+            response.headers["Server-Timing"] = trace.server_timing()
+            response.headers["Timing-Allow-Origin"] = "*"
+        if profile is not None:
+            route = request.scope.get("route")
+            response.headers["X-Profile-Id"] = finish_profile(
+                profile, f"{request.method} {route.path if route else request.url.path}", status
+            )
+            profile = None
+        return response
+    finally:
+        if profile is not None:
+            finish_profile(profile, f"{request.method} {request.url.path}", status)
+        route = request.scope.get("route")
+        route_path = route.path if route else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route_path,
+            status=str(status),
+        )
+        if trace is not None:
+            trace.route = f"{request.method} {route_path}"
+            finish_trace(trace)
+
+
 # AI 설명 생성기 초기화
 ai_explainer = AIClimateExplainer()
 
@@ -53,6 +241,8 @@ class ClimateData(BaseModel):
     wind_speed: Optional[float] = None
     precipitation: Optional[float] = None
     heat_wave_days: Optional[int] = None
+    heat_wave_streak: Optional[int] = None
+    tropical_nights: Optional[int] = None
 
 
 class ClimateScore(BaseModel):
@@ -67,6 +257,37 @@ class ClimateScore(BaseModel):
     climate_data: ClimateData
 
 
+class SubRegionScore(BaseModel):
+    code: str
+    name: str
+    lat: float
+    lng: float
+    score: int
+    adjusted_score: Optional[int] = None
+    risk_level: str
+    risk_label: str
+    risk_color: str
+    stale: bool = False
+    climate_data: ClimateData
+
+
+class SubRegionsResponse(BaseModel):
+    region: str
+    version: int
+    complete: bool
+    timestamp: str
+    subregions: List[SubRegionScore]
+
+
+class LocationClimateResponse(BaseModel):
+    lat: float
+    lng: float
+    distance_km: float
+    region: ClimateScore
+    subregion: Optional[SubRegionScore] = None
+    timestamp: str
+
+
 class ClimateExplanation(BaseModel):
     region: str
     score: int
@@ -82,6 +303,40 @@ class AllRegionsResponse(BaseModel):
     timestamp: str
 
 
+class HistoryPoint(BaseModel):
+    timestamp: str
+    score: int
+    temperature: Optional[float] = None
+    apparent_temperature: Optional[float] = None
+    humidity: Optional[float] = None
+    pm10: Optional[float] = None
+    pm25: Optional[float] = None
+
+
+class RegionHistoryResponse(BaseModel):
+    region: str
+    start: str
+    end: str
+    total: int
+    points: List[HistoryPoint]
+
+
+class ReportPage(BaseModel):
+    reports: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+class RegionReportCounts(BaseModel):
+    total: int
+    counts: List[int]
+
+
+class ReportStatsResponse(BaseModel):
+    hours: int
+    buckets: List[str]
+    regions: Dict[str, RegionReportCounts]
+
+
 # --- API 엔드포인트 ---
 
 @app.get("/")
@@ -92,9 +347,20 @@ async def root():
         "endpoints": {
             "all_regions": "/api/climate/all",
             "single_region": "/api/climate/{region}",
+            "at_location": "/api/climate/at?lat=&lng=",
+            "map_layer": "/api/climate/layer?zoom=",
             "explanation": "/api/climate/{region}/explain",
+            "history": "/api/climate/{region}/history",
+            "subregions": "/api/climate/{region}/subregions",
             "kma": "/api/kma",
-            "kma_period": "/api/kma-period"
+            "kma_period": "/api/kma-period",
+            "kma_daily": "/api/kma-daily",
+            "kma_alerts": "/api/kma-alerts?region=",
+            "stream": "/api/stream?region=&target=",
+            "kma_query": "/api/kma-query?tm1=&tm2=&fields=&interval=",
+            "batch": "POST /api/batch",
+            "reports": "/api/reports",
+            "report_stats": "/api/reports/stats"
         }
     }
 
@@ -104,41 +370,213 @@ async def get_regions():
     """사용 가능한 경기도 시군 목록 조회"""
     return list(GYEONGGI_REGIONS.keys())
 
+def _msgpack_response(body: Dict[str, Any]) -> Response:
+    with span("serialize"):
+        content = packb(body)
+    return Response(content, media_type=MSGPACK_MEDIA_TYPE, headers={"Vary": "Accept"})
+
+
+def _kma_response(request: Request, result: Dict[str, Any]) -> Response:
+    """Accept에 따라 컬럼 버퍼를 그대로 MessagePack으로, 아니면 기존 행 목록 JSON으로"""
+    if wants_msgpack(request.headers.get("accept")):
+        return _msgpack_response(kma_columnar(result))
+    with span("serialize"):
+        content = kma_json(result)
+    return Response(content, media_type="application/json", headers={"Vary": "Accept"})
+
+
 @app.get("/api/kma")
 async def get_kma_data(
+    request: Request,
     tm: str = Query(..., description="조회 시간 (YYYYMMDDHH00 형식)"),
     stn: str = Query("0", description="관측소 번호 (0: 전체)")
 ):
-    """기상청 API 프록시 - 단일 시간 조회"""
+    """기상청 API 프록시 - 단일 시간 조회 (Accept: application/msgpack이면 컬럼형 응답)"""
     try:
-        return await fetch_kma_single(tm, stn)
+        result = await fetch_kma_single(tm, stn)
+        if not result.get("stale"):
+            observation_archive.ingest_later(result["columns"])
+        return _kma_response(request, result)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"기상청 API 호출 실패: {str(e)}")
 
 
 @app.get("/api/kma-period")
 async def get_kma_period_data(
+    request: Request,
     tm1: str = Query(..., description="시작 시간 (YYYYMMDDHH00 형식)"),
     tm2: str = Query(..., description="종료 시간 (YYYYMMDDHH00 형식)"),
     stn: str = Query("0", description="관측소 번호 (0: 전체)")
 ):
-    """기상청 API 프록시 - 기간 조회"""
+    """기상청 API 프록시 - 기간 조회 (Accept: application/msgpack이면 컬럼형 응답)"""
+    try:
+        result = await fetch_kma_period(tm1, tm2, stn)
+        if not result.get("stale"):
+            observation_archive.ingest_later(result["columns"])
+        return _kma_response(request, result)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"기상청 API 호출 실패: {str(e)}")
+
+
+@app.get("/api/kma-query")
+async def query_kma_archive(
+    request: Request,
+    tm1: str = Query(..., pattern=r"^\d{8}(\d{4})?$", description="시작 (YYYYMMDD 또는 YYYYMMDDHH00)"),
+    tm2: str = Query(..., pattern=r"^\d{8}(\d{4})?$", description="종료 (YYYYMMDD 또는 YYYYMMDDHH00, 포함)"),
+    stn: str = Query("0", description="관측소 번호 (쉼표 구분, 0: 전체)"),
+    fields: str = Query("TA", description="집계할 컬럼 (쉼표 구분, 예: TA,HM,AT)"),
+    interval: str = Query("daily", pattern="^(hourly|daily|monthly)$", description="집계 구간"),
+    agg: str = Query("mean", description="집계 함수 (쉼표 구분: mean, min, max, sum, count)")
+):
+    """
+    수집된 시간별 관측 아카이브의 관측소·구간별 집계 (기상청을 다시 호출하지 않음)
+    범위 밖 월/관측소 파티션과 행 그룹은 읽지 않고, 요청한 컬럼만 읽음
+    """
+    start = int(tm1 if len(tm1) == 12 else tm1 + "0000")
+    end = int(tm2 if len(tm2) == 12 else tm2 + "2359")
+    if start > end:
+        raise HTTPException(status_code=400, detail="tm1은 tm2보다 이전이어야 합니다.")
+    try:
+        stations = sorted({int(s) for s in stn.split(",") if s.strip() and int(s) != 0})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="stn은 쉼표로 구분한 관측소 번호여야 합니다.")
+    field_list = list(dict.fromkeys(f.strip().upper() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in field_list if f not in ARCHIVE_VALUE_COLUMNS]
+    if not field_list or unknown:
+        raise HTTPException(status_code=400, detail=f"집계할 수 없는 컬럼: {', '.join(unknown) or '(없음)'}")
+    aggregates = list(dict.fromkeys(a.strip().lower() for a in agg.split(",") if a.strip()))
+    if not aggregates or any(a not in ARCHIVE_AGGREGATES for a in aggregates):
+        raise HTTPException(status_code=400, detail=f"agg는 {', '.join(ARCHIVE_AGGREGATES)} 중에서 선택해야 합니다.")
+
+    try:
+        result = await asyncio.to_thread(
+            observation_archive.query, stations, start, end, field_list, interval, aggregates
+        )
+    except ArchiveUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return _kma_response(request, result)
+
+
+@app.get("/api/kma-daily")
+async def get_kma_daily_data(
+    tm1: str = Query(..., pattern=r"^\d{8}(\d{4})?$", description="시작 날짜 (YYYYMMDD 또는 YYYYMMDDHH00)"),
+    tm2: str = Query(..., pattern=r"^\d{8}(\d{4})?$", description="종료 날짜 (YYYYMMDD 또는 YYYYMMDDHH00)"),
+    stn: str = Query("0", description="관측소 번호 (0: 전체)")
+):
+    """
+    기상청 기간 데이터의 관측소/시군별 일 통계 (최저·최고·평균 기온, 강수 합계, 평균 습도, 최대 풍속)
+    tm2가 오늘 이후면 오늘까지, 기간은 최대 366일
+    """
     try:
-        return await fetch_kma_period(tm1, tm2, stn)
+        return await fetch_kma_daily(tm1, tm2, stn)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"기상청 API 호출 실패: {str(e)}")
 
 
+@app.get("/api/kma-alerts")
+async def get_kma_alerts(
+    region: Optional[str] = Query(None, description="시군 이름 (없으면 경기도 전체)")
+):
+    """발효 중인 기상 특보 (주기적으로 수집한 메모리 색인에서 응답, 수준 높은 순)"""
+    if region is not None and region not in GYEONGGI_REGIONS:
+        raise HTTPException(status_code=404, detail=f"'{region}' 지역을 찾을 수 없습니다.")
+    alerts = [alert.to_dict() for alert in alert_feed.current(region)]
+    body = {
+        "success": True,
+        "region": region,
+        "alerts": alerts,
+        "version": alert_feed.version,
+        "updatedAt": alert_feed.updated_at.isoformat() if alert_feed.updated_at else None,
+    }
+    if not alerts:
+        body["message"] = "현재 발효 중인 기상 특보가 없습니다."
+    return body
+
+
+@app.get("/api/stream", response_class=StreamingResponse)
+async def stream_updates(
+    region: Optional[str] = Query(None, description="구독할 시군 (쉼표 구분, 없으면 경기도 전체)"),
+    target: Optional[str] = Query(None, description="대상 그룹 (점수 보정): elderly, child, outdoor, general"),
+    since: Optional[str] = Query(None, description="이 이벤트 id 이후부터 재전송 (Last-Event-ID와 동일)"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    스냅샷 버전/점수 변화와 특보 변경을 Server-Sent Events로 전달 (발행될 때만 전송)
+    재연결 시 마지막으로 받은 이벤트 id 이후를 재전송, 너무 오래됐거나 재시작 전 id면 resync 이벤트
+    """
+    regions = None
+    if region:
+        names = frozenset(name.strip() for name in region.split(",") if name.strip())
+        unknown = sorted(names - GYEONGGI_REGIONS.keys())
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"'{', '.join(unknown)}' 지역을 찾을 수 없습니다.")
+        regions = names
+    if target not in TARGET_MULTIPLIERS:
+        target = None
+    if since is None and last_event_id:
+        since = last_event_id
+    try:
+        stream_hub.check_capacity()
+    except StreamFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    return StreamingResponse(
+        stream_hub.stream(regions, target, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/reports", response_model=ReportPage)
+async def get_user_reports(
+    region: Optional[str] = Query(None, description="지역 필터"),
+    limit: int = Query(20, ge=1, le=MAX_REPORT_PAGE_SIZE, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    fields: Optional[str] = Query(None, description="반환 필드 (쉼표 구분, 예: id,region,emoji,created_at)")
+):
+    """
+    사용자 제보 목록 (커서 기반 페이지네이션)
+    next_cursor를 그대로 다음 요청의 cursor로 전달
+    """
+    try:
+        return await report_service.get_reports(
+            region=region,
+            limit=limit,
+            cursor=cursor,
+            fields=fields.split(',') if fields else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/reports/stats", response_model=ReportStatsResponse)
+async def get_report_stats(
+    hours: int = Query(24, ge=1, le=168, description="최근 N시간 (시간 단위 버킷)")
+):
+    """
+    31개 시군의 시간대별 제보 수
+    지도 표시용 (원본 제보 목록 대신 집계만 전달)
+    """
+    return await report_stats_service.get_region_counts(GYEONGGI_REGIONS.keys(), hours)
+
+
 @app.get("/api/climate/all", response_model=AllRegionsResponse)
 async def get_all_climate_data(
+    request: Request,
+    response: Response,
     target: Optional[str] = Query(None, description="대상 그룹: elderly, child, outdoor, general")
 ):
     """
     모든 경기도 시군의 기후 체감 점수 조회
-    지도 전체 표시용
+    지도 전체 표시용 (Accept: application/msgpack이면 컬럼형 응답)
     """
-    from datetime import datetime
-
     target_group = TargetGroup.GENERAL
     if target:
         try:
@@ -146,23 +584,20 @@ async def get_all_climate_data(
         except ValueError:
             pass
 
-    all_data = get_all_mock_data()
+    with span("snapshot"):
+        snapshot = await snapshot_store.get()
+    if wants_msgpack(request.headers.get("accept")):
+        return _msgpack_response(_all_regions_columns(snapshot, target))
+    response.headers["Vary"] = "Accept"
     results = []
 
-    for data in all_data:
-        score, risk_level = calculate_climate_score(data)
+    for entry in snapshot.regions.values():
+        data = entry["data"]
+        score = entry["score"]
         adjusted = adjust_score_for_target(score, target_group) if target else None
 
         # adjusted_score가 있으면 그에 맞는 risk_level 재계산
-        display_score = adjusted if adjusted else score
-        if display_score >= 75:
-            display_risk = RiskLevel.DANGER
-        elif display_score >= 50:
-            display_risk = RiskLevel.WARNING
-        elif display_score >= 30:
-            display_risk = RiskLevel.CAUTION
-        else:
-            display_risk = RiskLevel.SAFE
+        display_risk = risk_level_for(score, adjusted)
 
         results.append(ClimateScore(
             region=data["region"],
@@ -178,42 +613,54 @@ async def get_all_climate_data(
 
     return AllRegionsResponse(
         regions=results,
-        timestamp=datetime.now().isoformat()
+        timestamp=snapshot.created_at.isoformat()
     )
 
 
-@app.get("/api/climate/{region}", response_model=ClimateScore)
-async def get_region_climate(
-    region: str,
-    target: Optional[str] = Query(None, description="대상 그룹")
-):
-    """
-    특정 지역의 기후 체감 점수 조회
-    """
-    if region not in GYEONGGI_REGIONS:
-        raise HTTPException(status_code=404, detail=f"'{region}' 지역을 찾을 수 없습니다.")
+# 컬럼형 전체 시군 응답의 관측 컬럼 (region/lat/lng는 점수 컬럼에 포함)
+_CLIMATE_DATA_COLUMNS = tuple(name for name in ClimateData.model_fields if name not in ("region", "lat", "lng"))
 
-    target_group = TargetGroup.GENERAL
+
+def _all_regions_columns(snapshot, target: Optional[str]) -> Dict[str, Any]:
+    """스냅샷 → 컬럼형 전체 시군 응답 (행별 ClimateScore 모델을 만들지 않음)"""
+    entries = list(snapshot.regions.values())
+    scores = [entry["score"] for entry in entries]
+    adjusted = [adjust_score_for_target(s, _target_group(target)) if target else None for s in scores]
+    risks = [risk_level_for(s, a) for s, a in zip(scores, adjusted)]
+    columns = {
+        "region": [entry["data"]["region"] for entry in entries],
+        "lat": [entry["data"]["lat"] for entry in entries],
+        "lng": [entry["data"]["lng"] for entry in entries],
+        "score": scores,
+        "adjusted_score": adjusted,
+        "risk_level": [risk.value for risk in risks],
+        "risk_label": [get_risk_label(risk) for risk in risks],
+        "risk_color": [get_risk_color(risk) for risk in risks],
+    }
+    for name in _CLIMATE_DATA_COLUMNS:
+        columns[name] = [entry["data"].get(name) for entry in entries]
+    return {
+        "count": len(entries),
+        "timestamp": snapshot.created_at.isoformat(),
+        "regions": compact_columns(columns),
+    }
+
+
+def _target_group(target: Optional[str]) -> TargetGroup:
     if target:
         try:
-            target_group = TargetGroup(target)
+            return TargetGroup(target)
         except ValueError:
             pass
+    return TargetGroup.GENERAL
 
-    data = get_mock_climate_data(region)
-    score, risk_level = calculate_climate_score(data)
-    adjusted = adjust_score_for_target(score, target_group) if target else None
-
-    display_score = adjusted if adjusted else score
-    if display_score >= 75:
-        display_risk = RiskLevel.DANGER
-    elif display_score >= 50:
-        display_risk = RiskLevel.WARNING
-    elif display_score >= 30:
-        display_risk = RiskLevel.CAUTION
-    else:
-        display_risk = RiskLevel.SAFE
 
+def _region_score(entry: Dict[str, Any], target: Optional[str]) -> ClimateScore:
+    """스냅샷 항목 → 시군 점수 응답"""
+    data = entry["data"]
+    score = entry["score"]
+    adjusted = adjust_score_for_target(score, _target_group(target)) if target else None
+    display_risk = risk_level_for(score, adjusted)
     return ClimateScore(
         region=data["region"],
         lat=data["lat"],
@@ -227,6 +674,194 @@ async def get_region_climate(
     )
 
 
+def _subregion_score(current, i: int, target: Optional[str]) -> SubRegionScore:
+    """읍·면·동 스냅샷의 i번째 단위 → 점수 응답 (폭염 일수 등은 상위 시군 값)"""
+    registry = subregion_store.registry
+    parent = current.source.regions[PARENTS[registry.parent[i]]]["data"]
+    values = current.values
+    score = current.scores[i]
+    adjusted = adjust_score_for_target(score, _target_group(target)) if target else None
+    display_risk = risk_level_for(score, adjusted)
+    lat, lng = registry.lat[i], registry.lng[i]
+    return SubRegionScore(
+        code=registry.codes[i],
+        name=registry.names[i],
+        lat=lat,
+        lng=lng,
+        score=score,
+        adjusted_score=adjusted,
+        risk_level=display_risk.value,
+        risk_label=get_risk_label(display_risk),
+        risk_color=get_risk_color(display_risk),
+        stale=current.updated[i] != current.version,
+        climate_data=ClimateData(
+            region=registry.names[i],
+            lat=lat,
+            lng=lng,
+            temperature=round(values["temperature"][i], 1),
+            apparent_temperature=round(values["apparent_temperature"][i], 1),
+            humidity=round(values["humidity"][i], 1),
+            pm10=round(values["pm10"][i]),
+            pm25=round(values["pm25"][i]),
+            uv_index=round(values["uv_index"][i], 1),
+            surface_temperature=round(values["surface_temperature"][i], 1),
+            wind_speed=round(values["wind_speed"][i], 1),
+            precipitation=round(values["precipitation"][i], 1),
+            heat_wave_days=parent.get("heat_wave_days"),
+            heat_wave_streak=parent.get("heat_wave_streak"),
+            tropical_nights=parent.get("tropical_nights")
+        )
+    )
+
+
+@app.get("/api/climate/at", response_model=LocationClimateResponse)
+async def get_climate_at(
+    lat: float = Query(..., ge=-90, le=90, description="위도"),
+    lng: float = Query(..., ge=-180, le=180, description="경도"),
+    target: Optional[str] = Query(None, description="대상 그룹")
+):
+    """
+    좌표가 속한 시군(읍·면·동 등록부가 있으면 읍·면·동까지)과 미리 계산된 점수를 한 번에 조회
+    가장 가까운 중심점 기준이며 경기도에서 50km 이상 떨어진 좌표는 404
+    """
+    found = region_locator.locate(lat, lng)
+    if found is None:
+        raise HTTPException(status_code=404, detail="경기도 범위 밖의 좌표입니다.")
+    region, sub_index, distance = found
+
+    with span("snapshot"):
+        snapshot = await snapshot_store.get()
+        current = await subregion_store.get(snapshot) if sub_index is not None else None
+
+    return LocationClimateResponse(
+        lat=lat,
+        lng=lng,
+        distance_km=round(distance, 2),
+        region=_region_score(snapshot.regions[region], target),
+        subregion=_subregion_score(current, sub_index, target) if current is not None else None,
+        timestamp=snapshot.created_at.isoformat()
+    )
+
+
+@app.get("/api/climate/layer", response_class=Response)
+async def get_climate_layer(
+    request: Request,
+    zoom: int = Query(9, ge=0, le=22, description="지도 줌 레벨"),
+    target: Optional[str] = Query(None, description="대상 그룹")
+):
+    """
+    지도 렌더링용 GeoJSON 레이어 (점수, 위험 등급 색상/라벨이 속성에 포함)
+    줌 11 이상은 읍·면·동 단위 (등록부가 없으면 시군), 스냅샷이 바뀔 때만 다시 생성
+    If-None-Match에 같은 ETag가 있으면 304, Accept-Encoding이 gzip을 허용하면(q>0) 미리 압축한 본문을 그대로 전송
+    """
+    with span("snapshot"):
+        snapshot = await snapshot_store.get()
+        current = await subregion_store.get(snapshot) if zoom_level(zoom)[1] == "subregions" else None
+    layer = layer_cache.get(zoom, target, snapshot, current, subregion_store.registry)
+
+    headers = {
+        "ETag": layer.etag,
+        # 스냅샷 갱신 시점을 알 수 없으므로 매번 ETag로 재검증 (변경 없으면 304)
+        "Cache-Control": "public, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), layer.etag):
+        return Response(status_code=304, headers=headers)
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(layer.gzipped, media_type="application/geo+json", headers=headers)
+    return Response(layer.body, media_type="application/geo+json", headers=headers)
+
+
+@app.get("/api/climate/{region}", response_model=ClimateScore)
+async def get_region_climate(
+    region: str,
+    target: Optional[str] = Query(None, description="대상 그룹")
+):
+    """
+    특정 지역의 기후 체감 점수 조회
+    """
+    if region not in GYEONGGI_REGIONS:
+        raise HTTPException(status_code=404, detail=f"'{region}' 지역을 찾을 수 없습니다.")
+
+    with span("snapshot"):
+        entry = (await snapshot_store.get()).regions[region]
+    return _region_score(entry, target)
+
+
+@app.get("/api/climate/{region}/subregions", response_model=SubRegionsResponse)
+async def get_subregion_climate(
+    region: str,
+    target: Optional[str] = Query(None, description="대상 그룹")
+):
+    """
+    시군에 속한 읍·면·동별 기후 체감 점수
+    시군 관측값을 역거리 가중 보간해 계산 (stale: 갱신 예산 초과로 이전 갱신 값을 유지한 단위)
+    """
+    if region not in GYEONGGI_REGIONS:
+        raise HTTPException(status_code=404, detail=f"'{region}' 지역을 찾을 수 없습니다.")
+    if len(subregion_registry) == 0:
+        raise HTTPException(status_code=503, detail="읍·면·동 등록부가 설정되지 않았습니다 (SUBREGION_CSV).")
+
+    with span("snapshot"):
+        current = await subregion_store.get(await snapshot_store.get())
+
+    start, end = subregion_registry.ranges.get(region, (0, 0))
+    return SubRegionsResponse(
+        region=region,
+        version=current.version,
+        complete=current.complete,
+        timestamp=current.created_at.isoformat(),
+        subregions=[_subregion_score(current, i, target) for i in range(start, end)]
+    )
+
+
+def _local_time(value: Optional[str], name: str) -> Optional[datetime]:
+    """
+    ISO 8601 시각 → 서버 로컬 naive 시각 (점수 이력과 같은 기준)
+    시간대가 있으면 로컬 시각으로 바꾸고, 없으면 로컬 시각으로 간주. 형식이 잘못되면 400
+    """
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name}은 ISO 8601 시각이어야 합니다: {value}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+@app.get("/api/climate/{region}/history", response_model=RegionHistoryResponse)
+async def get_region_history(
+    region: str,
+    start: Optional[str] = Query(None, alias="from", description="시작 시각 (ISO 8601, 기본: 7일 전)"),
+    end: Optional[str] = Query(None, alias="to", description="종료 시각 (ISO 8601, 기본: 현재)"),
+    points: int = Query(200, ge=3, le=2000, description="최대 반환 포인트 수 (LTTB 다운샘플링)")
+):
+    """
+    지역별 기후 점수 추세
+    조회 구간 길이와 관계없이 최대 points개로 서버에서 다운샘플링
+    from/to는 시간대가 있으면 서버 로컬 시각으로 바꿔 비교 (시간대 유무가 섞여도 됨)
+    """
+    if region not in GYEONGGI_REGIONS:
+        raise HTTPException(status_code=404, detail=f"'{region}' 지역을 찾을 수 없습니다.")
+
+    end = _local_time(end, "to") or datetime.now()
+    start = _local_time(start, "from") or end - timedelta(days=7)
+    if start > end:
+        raise HTTPException(status_code=400, detail="from은 to보다 이전이어야 합니다.")
+
+    result = score_history.query(region, start.timestamp(), end.timestamp(), points)
+    return RegionHistoryResponse(
+        region=region,
+        start=start.isoformat(),
+        end=end.isoformat(),
+        total=result["total"],
+        points=result["points"]
+    )
+
+
 @app.get("/api/climate/{region}/explain", response_model=ClimateExplanation)
 async def get_climate_explanation(
     region: str,
@@ -245,28 +880,24 @@ async def get_climate_explanation(
     except ValueError:
         pass
 
-    data = get_mock_climate_data(region)
-    score, risk_level = calculate_climate_score(data)
+    with span("snapshot"):
+        entry = (await snapshot_store.get()).regions[region]
+    data = entry["data"]
+    score = entry["score"]
     adjusted = adjust_score_for_target(score, target_group)
 
     # 조정된 점수에 따른 위험 등급
-    if adjusted >= 75:
-        display_risk = RiskLevel.DANGER
-    elif adjusted >= 50:
-        display_risk = RiskLevel.WARNING
-    elif adjusted >= 30:
-        display_risk = RiskLevel.CAUTION
-    else:
-        display_risk = RiskLevel.SAFE
+    display_risk = risk_level_for(score, adjusted)
 
     # AI 설명 생성
-    explanation = await ai_explainer.generate_explanation(
-        region=region,
-        climate_data=data,
-        score=adjusted,
-        risk_level=display_risk,
-        target=target_group
-    )
+    with span("explain"):
+        explanation = await ai_explainer.generate_explanation(
+            region=region,
+            climate_data=data,
+            score=adjusted,
+            risk_level=display_risk,
+            target=target_group
+        )
 
     # 행동 가이드
     guides = get_action_guide(display_risk, target_group)
@@ -289,6 +920,129 @@ async def get_climate_explanation(
     )
 
 
+@app.post("/api/batch", response_class=Response)
+async def run_batch(
+    request: Request,
+    batch: BatchRequest,
+    stream: bool = Query(False, description="완료되는 순서대로 NDJSON 한 줄씩 반환")
+):
+    """
+    여러 GET 하위 요청을 동시에 실행해 한 응답으로 반환 (같은 경로는 한 번만 실행)
+    stream=true 또는 Accept: application/x-ndjson이면 결과를 완료 순서대로 스트리밍
+    """
+    try:
+        validate_batch(batch.requests, settings.BATCH_MAX_REQUESTS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(batch_runner.stream(batch.requests), media_type=NDJSON_MEDIA_TYPE)
+    return Response(content=await batch_runner.run(batch.requests), media_type="application/json")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """운영자 토큰 확인 (ADMIN_TOKEN 미설정 시 항상 거부)"""
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 필요합니다.")
+
+
+@app.get("/admin/profiles", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def get_profiles():
+    """저장된 요청 프로파일 목록 (최신순)"""
+    return {"profiles": list_profiles()}
+
+
+@app.get("/admin/profiles/{profile_id}", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$", description="text: 요약, pstats: 원본 파일"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+):
+    """
+    요청 프로파일 조회
+    pstats 파일은 `python -m pstats <파일>` 또는 snakeviz 등으로 분석
+    """
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    if format == "pstats":
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+    return PlainTextResponse(profile_text(path, sort))
+
+
+@app.get("/admin/upstreams", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def get_upstream_states():
+    """기상청 엔드포인트별 회로 차단 상태"""
+    return {"upstreams": breaker_states()}
+
+
+@app.get("/admin/notifications", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def get_notification_status():
+    """위험 알림 엔진 상태 (구독 색인 크기, 전달 큐, 전송 결과 집계)"""
+    return notification_engine.status()
+
+
+@app.get("/admin/memory", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def get_memory_report():
+    """캐시/메모리 상주 구조별 크기와 프로세스 메모리"""
+    return {
+        "process": memory.process_memory(),
+        "structures": memory.structure_sizes(),
+        "tracemalloc": {
+            "tracing": memory.allocation_snapshots.tracing,
+            "snapshots": memory.allocation_snapshots.list(),
+        },
+    }
+
+
+@app.post("/admin/memory/tracemalloc/start", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def start_tracemalloc(frames: int = Query(memory.DEFAULT_TRACE_FRAMES, ge=1, le=50)):
+    """할당 추적 시작 (추적 중에는 메모리/CPU 부담이 커짐)"""
+    memory.allocation_snapshots.start(frames)
+    return {"tracing": True}
+
+
+@app.post("/admin/memory/tracemalloc/stop", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def stop_tracemalloc():
+    memory.allocation_snapshots.stop()
+    return {"tracing": False}
+
+
+@app.post("/admin/memory/snapshots", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def take_memory_snapshot(limit: int = Query(20, ge=1, le=200)):
+    """tracemalloc 스냅샷 생성 후 서브시스템별 요약 반환"""
+    try:
+        snapshot_id = memory.allocation_snapshots.take()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return memory.allocation_snapshots.summarize(snapshot_id, limit)
+
+
+@app.get("/admin/memory/snapshots/{snapshot_id}", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def get_memory_snapshot(snapshot_id: str, limit: int = Query(20, ge=1, le=200)):
+    summary = memory.allocation_snapshots.summarize(snapshot_id, limit)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="스냅샷을 찾을 수 없습니다.")
+    return summary
+
+
+@app.get(
+    "/admin/memory/snapshots/{snapshot_id}/diff/{base_id}",
+    include_in_schema=False, dependencies=[Depends(require_admin)],
+)
+async def diff_memory_snapshots(snapshot_id: str, base_id: str, limit: int = Query(20, ge=1, le=200)):
+    """base_id 이후 증가한 할당 (누수 추적용)"""
+    result = memory.allocation_snapshots.diff(snapshot_id, base_id, limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail="스냅샷을 찾을 수 없습니다.")
+    return result
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 스크레이프용 메트릭"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health_check():
     """서버 상태 확인"""
@@ -0,0 +1,267 @@
+"""
+메모리 사용량 점검 모듈
+- 캐시/스냅샷 등 메모리 상주 구조를 등록해 두고 깊은 크기(deep size)를 계산
+- tracemalloc 스냅샷을 찍어 할당 위치를 서브시스템별로 묶어 보고, 두 스냅샷의 차이로 누수 추적
+
+다른 모듈이 import 시점에 track()으로 등록하므로 이 모듈은 표준 라이브러리만 사용
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict, deque
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 깊은 크기 계산 시 방문할 최대 객체 수 (큰 구조에서도 응답 시간 제한)
+MAX_VISITED_OBJECTS = 2_000_000
+# 보관할 tracemalloc 스냅샷 수
+MAX_SNAPSHOTS = 5
+DEFAULT_TRACE_FRAMES = 10
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 할당 위치(파일 경로 일부) → 서브시스템
+SUBSYSTEM_PATTERNS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("kma", ("kma_proxy.py", "heatwave.py", "archive.py", "alerts.py", "/pyarrow/")),
+    ("explanations", ("ai_service.py", "/openai/")),
+    ("snapshots", ("snapshot.py", "history.py", "climate_api.py", "climate_index.py")),
+    ("notifications", ("notifications.py",)),
+    ("db", ("supabase_client.py", "/supabase/", "/postgrest/", "/gotrue/")),
+    ("observability", ("metrics.py", "tracing.py", "profiling.py", "memory.py")),
+    ("http", ("/httpx/", "/httpcore/", "/h11/", "/anyio/", "/starlette/", "/fastapi/", "/uvicorn/", "/pydantic")),
+)
+
+_SKIP_TYPES = (type, ModuleType, FunctionType)
+
+
+class TrackedStructure:
+    __slots__ = ("name", "subsystem", "getter")
+
+    def __init__(self, name: str, subsystem: str, getter: Callable[[], Any]):
+        self.name = name
+        self.subsystem = subsystem
+        self.getter = getter
+
+
+_tracked: "OrderedDict[str, TrackedStructure]" = OrderedDict()
+
+
+def track(name: str, subsystem: str, getter: Callable[[], Any]) -> None:
+    """메모리 상주 구조 등록 (getter는 현재 객체를 반환)"""
+    _tracked[name] = TrackedStructure(name, subsystem, getter)
+
+
+def deep_sizeof(obj: Any) -> Tuple[int, int]:
+    """
+    객체와 참조하는 컨테이너/인스턴스의 총 크기 (바이트, 객체 수)
+    공유 객체는 한 번만 계산하고 모듈/함수/클래스는 따라가지 않음
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < MAX_VISITED_OBJECTS:
+        current = stack.pop()
+        oid = id(current)
+        if oid in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(oid)
+        total += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, bytearray, int, float, bool)) or current is None:
+            continue
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(current.__dict__)
+            for cls in type(current).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if slot not in ("__dict__", "__weakref__") and hasattr(current, slot):
+                        stack.append(getattr(current, slot))
+    return total, len(seen)
+
+
+def structure_sizes() -> List[Dict[str, Any]]:
+    """등록된 구조별 크기"""
+    result = []
+    for entry in _tracked.values():
+        started = time.perf_counter()
+        obj = entry.getter()
+        size, objects = deep_sizeof(obj)
+        try:
+            items = len(obj)
+        except TypeError:
+            items = None
+        result.append({
+            "name": entry.name,
+            "subsystem": entry.subsystem,
+            "bytes": size,
+            "objects": objects,
+            "items": items,
+            "measure_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+    return result
+
+
+def process_memory() -> Dict[str, Any]:
+    """프로세스 RSS (Linux /proc 기준, 그 외는 None) 및 GC 상태"""
+    rss = peak = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return {
+        "pid": os.getpid(),
+        "rss_bytes": rss,
+        "rss_peak_bytes": peak,
+        "gc_counts": gc.get_count(),
+        "gc_objects": len(gc.get_objects()),
+    }
+
+
+def subsystem_of(filename: str) -> Optional[str]:
+    for subsystem, patterns in SUBSYSTEM_PATTERNS:
+        if any(pattern in filename for pattern in patterns):
+            return subsystem
+    return None
+
+
+class AllocationSnapshots:
+    """tracemalloc 시작/중지 및 스냅샷 보관"""
+
+    def __init__(self, limit: int = MAX_SNAPSHOTS):
+        self.limit = limit
+        self._snapshots: "OrderedDict[str, Tuple[float, tracemalloc.Snapshot]]" = OrderedDict()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = DEFAULT_TRACE_FRAMES) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """추적 중지 (보관된 스냅샷은 유지)"""
+        tracemalloc.stop()
+
+    def take(self) -> str:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc이 실행 중이 아닙니다.")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        snapshot_id = uuid.uuid4().hex[:12]
+        self._snapshots[snapshot_id] = (time.time(), snapshot)
+        while len(self._snapshots) > self.limit:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            {"id": snapshot_id, "taken_at": taken_at, "traceback_limit": snapshot.traceback_limit}
+            for snapshot_id, (taken_at, snapshot) in self._snapshots.items()
+        ]
+
+    def get(self, snapshot_id: str) -> Optional[tracemalloc.Snapshot]:
+        entry = self._snapshots.get(snapshot_id)
+        return entry[1] if entry else None
+
+    @staticmethod
+    def _attribute(traceback: tracemalloc.Traceback) -> Tuple[str, str]:
+        """
+        할당 스택 → (서브시스템, 위치)
+        가장 안쪽 프레임부터 보며 앱 서브시스템을 우선하고, 없으면 HTTP 계층, 그래도 없으면 other
+        """
+        fallback = None
+        for frame in reversed(traceback):
+            subsystem = subsystem_of(frame.filename)
+            if subsystem is None:
+                continue
+            if subsystem != "http":
+                return subsystem, f"{_short_path(frame.filename)}:{frame.lineno}"
+            if fallback is None:
+                fallback = (subsystem, f"{_short_path(frame.filename)}:{frame.lineno}")
+        if fallback is not None:
+            return fallback
+        frame = traceback[-1]
+        return "other", f"{_short_path(frame.filename)}:{frame.lineno}"
+
+    def summarize(self, snapshot_id: str, limit: int = 20) -> Optional[Dict[str, Any]]:
+        """서브시스템별 합계와 상위 할당 위치"""
+        snapshot = self.get(snapshot_id)
+        if snapshot is None:
+            return None
+        subsystems: Dict[str, Dict[str, int]] = {}
+        sites: Dict[Tuple[str, str], Dict[str, int]] = {}
+        for stat in snapshot.statistics("traceback"):
+            subsystem, site = self._attribute(stat.traceback)
+            total = subsystems.setdefault(subsystem, {"bytes": 0, "blocks": 0})
+            total["bytes"] += stat.size
+            total["blocks"] += stat.count
+            entry = sites.setdefault((subsystem, site), {"bytes": 0, "blocks": 0})
+            entry["bytes"] += stat.size
+            entry["blocks"] += stat.count
+
+        top = sorted(sites.items(), key=lambda item: item[1]["bytes"], reverse=True)[:limit]
+        return {
+            "id": snapshot_id,
+            "total_bytes": sum(s["bytes"] for s in subsystems.values()),
+            "subsystems": dict(sorted(subsystems.items(), key=lambda item: item[1]["bytes"], reverse=True)),
+            "top_sites": [{"subsystem": sub, "site": site, **size} for (sub, site), size in top],
+        }
+
+    def diff(self, snapshot_id: str, base_id: str, limit: int = 20) -> Optional[Dict[str, Any]]:
+        """base 대비 증감 (서브시스템별, 위치별)"""
+        snapshot, base = self.get(snapshot_id), self.get(base_id)
+        if snapshot is None or base is None:
+            return None
+        subsystems: Dict[str, Dict[str, int]] = {}
+        sites = []
+        for stat in snapshot.compare_to(base, "traceback"):
+            if not stat.size_diff and not stat.count_diff:
+                continue
+            subsystem, site = self._attribute(stat.traceback)
+            total = subsystems.setdefault(subsystem, {"bytes_diff": 0, "blocks_diff": 0})
+            total["bytes_diff"] += stat.size_diff
+            total["blocks_diff"] += stat.count_diff
+            sites.append({
+                "subsystem": subsystem,
+                "site": site,
+                "bytes_diff": stat.size_diff,
+                "blocks_diff": stat.count_diff,
+                "bytes": stat.size,
+            })
+        sites.sort(key=lambda s: abs(s["bytes_diff"]), reverse=True)
+        return {
+            "id": snapshot_id,
+            "base_id": base_id,
+            "total_bytes_diff": sum(s["bytes_diff"] for s in subsystems.values()),
+            "subsystems": dict(sorted(subsystems.items(), key=lambda item: item[1]["bytes_diff"], reverse=True)),
+            "top_sites": sites[:limit],
+        }
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(BACKEND_DIR):
+        return os.path.relpath(filename, BACKEND_DIR)
+    marker = "site-packages" + os.sep
+    idx = filename.find(marker)
+    return filename[idx + len(marker):] if idx >= 0 else filename
+
+
+allocation_snapshots = AllocationSnapshots()
@@ -0,0 +1,223 @@
+"""
+Prometheus 형식 메트릭 모듈
+외부 의존성 없이 카운터/히스토그램을 메모리에 누적하고 /metrics에서 텍스트 형식으로 노출
+
+- 갱신은 이벤트 루프 스레드에서만 일어나므로 잠금 없이 dict/list 연산만 수행
+- 라벨은 라우트 템플릿, 호스트, 테이블 등 개수가 제한된 값만 사용 (요청 경로/지역명 금지)
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+import httpx
+
+from memory import track
+
+# 기본 지연 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 파싱 등 프로세스 내부 작업용 버킷 (초)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """
+    고정 버킷 히스토그램
+    버킷별 개수는 비누적으로 저장하고 출력할 때만 누적 합산
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 → [버킷별 개수..., +Inf 개수, 합계]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return int(sum(entry[:-1])) if entry else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, entry in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """메트릭 등록 및 텍스트 형식 출력"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"중복 메트릭 이름: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+track("metrics_registry", "observability", lambda: REGISTRY)
+
+# Prometheus 텍스트 형식 Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "API 요청 처리 시간 (응답 헤더까지)",
+    ("method", "route", "status"),
+))
+UPSTREAM_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "upstream_request_duration_seconds", "외부 API 호출 시간 (응답 헤더까지)",
+    ("host", "status"),
+))
+PARSE_SECONDS = REGISTRY.register(Histogram(
+    "parse_duration_seconds", "외부 응답 파싱 시간",
+    ("parser",), buckets=FAST_BUCKETS,
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "캐시 조회 횟수 (result=hit|miss)",
+    ("cache", "result"),
+))
+LLM_REQUESTS = REGISTRY.register(Counter(
+    "llm_requests_total", "LLM 호출 횟수",
+    ("model", "status"),
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "LLM 사용 토큰 수",
+    ("model", "kind"),
+))
+UPSTREAM_CIRCUIT_EVENTS = REGISTRY.register(Counter(
+    "upstream_circuit_events_total", "외부 API 회로 차단기 이벤트 (opened|short_circuit|retry|stale)",
+    ("endpoint", "event"),
+))
+SUPABASE_QUERY_SECONDS = REGISTRY.register(Histogram(
+    "supabase_query_duration_seconds", "Supabase 쿼리 시간",
+    ("table", "operation", "status"),
+))
+NOTIFICATION_DELIVERIES = REGISTRY.register(Counter(
+    "notification_deliveries_total", "위험 알림 전달 결과 (sent|retry|failed|deduped|dropped)",
+    ("result",),
+))
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+class UpstreamTransport(httpx.AsyncBaseTransport):
+    """호스트/상태 코드별 외부 호출 시간을 기록하는 httpx 전송 계층"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        except httpx.TimeoutException:
+            status = "timeout"
+            raise
+        finally:
+            UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, host=request.url.host, status=status)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def upstream_client(**kwargs) -> httpx.AsyncClient:
+    """외부 호출 계측이 붙은 httpx.AsyncClient"""
+    return httpx.AsyncClient(transport=UpstreamTransport(), **kwargs)
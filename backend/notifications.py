@@ -0,0 +1,434 @@
+"""
+위험 알림 엔진
+스냅샷이 갱신될 때마다 활성 알림 구독(notification_subscriptions) 전체를 한 번에 평가해 알릴 대상을 결정
+- 구독은 주기적으로 한 번에 적재하고 (시군, 대상)별 임계값 오름차순 목록으로 색인
+  시군 점수가 바뀌면 bisect로 해당 구간의 구독만 잘라 냄 (사용자별 조회·전체 순회 없음)
+- 알림 조건: 점수가 임계값을 새로 넘었거나(이전 < 임계값 ≤ 현재), 임계값 이상에서 위험 등급이 올라감
+  (시작 후 첫 스냅샷은 기준으로만 사용, 재시작마다 알림이 몰리지 않도록)
+- 알림마다 원인 유형(notify_types 키: 고온/저온/미세먼지/자외선)을 붙이고, 구독자가 끈 유형뿐이면 큐에 넣지 않음
+- 전달은 큐에서: 초당 전송 수 제한, 실패 시 지수 백오프 재시도, 같은 (구독, 시군, 위험 등급)은 중복 창 안에서 한 번만
+- 전송 채널(sink)은 교체 가능: local(메모리 + JSONL 파일, 개발/테스트용), webhook(외부 발송 서버로 POST)
+"""
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from climate_index import TARGET_MULTIPLIERS, RiskLevel, target_risk
+from config import settings
+from memory import track
+from metrics import NOTIFICATION_DELIVERIES, upstream_client
+from supabase_client import notification_subscription_service
+
+logger = logging.getLogger(__name__)
+
+RISK_RANK = {RiskLevel.SAFE: 0, RiskLevel.CAUTION: 1, RiskLevel.WARNING: 2, RiskLevel.DANGER: 3}
+# 프론트엔드 알림과 같은 표기 (NotificationManager.jsx)
+RISK_LABELS = {RiskLevel.DANGER: "위험", RiskLevel.WARNING: "경고", RiskLevel.CAUTION: "주의", RiskLevel.SAFE: "안전"}
+# 알림 유형 (NotificationManager.jsx의 notifyTypes 키)
+NOTIFY_TYPES = ("highTemp", "lowTemp", "dust", "uv")
+# 유형별 원인 판단 기준 (체감온도 ℃, 미세먼지 '나쁨' 하한 µg/m³, 자외선 '높음' 하한)
+HIGH_TEMP_APPARENT = 31
+LOW_TEMP_APPARENT = -10
+DUST_PM10 = 81
+DUST_PM25 = 36
+UV_HIGH = 6
+
+
+def alert_types(data: Dict[str, Any]) -> List[str]:
+    """시군 기후 데이터에서 알림 원인 유형 (습도·지표면온도처럼 유형이 없는 원인만이면 빈 목록)"""
+    types = []
+    apparent = data.get("apparent_temperature", data.get("temperature"))
+    if (apparent is not None and apparent >= HIGH_TEMP_APPARENT) or data.get("heat_wave_streak"):
+        types.append("highTemp")
+    if apparent is not None and apparent <= LOW_TEMP_APPARENT:
+        types.append("lowTemp")
+    if (data.get("pm10") or 0) >= DUST_PM10 or (data.get("pm25") or 0) >= DUST_PM25:
+        types.append("dust")
+    if (data.get("uv_index") or 0) >= UV_HIGH:
+        types.append("uv")
+    return types
+
+
+class Subscription:
+    """활성 구독 하나 (notification_subscriptions 행)"""
+
+    __slots__ = ("id", "user_id", "regions", "threshold", "target", "notify_types", "push_subscription")
+
+    def __init__(self, id: int, user_id: str, regions: List[str], threshold: int, target: str,
+                 notify_types: Dict[str, bool], push_subscription: Optional[Dict[str, Any]]):
+        self.id = id
+        self.user_id = user_id
+        self.regions = regions
+        self.threshold = threshold
+        self.target = target
+        self.notify_types = notify_types
+        self.push_subscription = push_subscription
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Subscription":
+        target = row.get("target") or "general"
+        return cls(
+            id=row["id"],
+            user_id=row.get("user_id"),
+            regions=list(row.get("regions") or []),
+            threshold=int(row["threshold"] if row.get("threshold") is not None else 50),
+            target=target if target in TARGET_MULTIPLIERS else "general",
+            notify_types=row.get("notify_types") or {},
+            push_subscription=row.get("push_subscription"),
+        )
+
+    def wants(self, types: List[str]) -> bool:
+        """
+        알림 유형 중 하나라도 켜져 있는지 (저장되지 않은 유형은 켜진 것으로 봄)
+        유형이 없는 알림은 모든 유형을 끈 구독에만 보내지 않음
+        """
+        return any(self.notify_types.get(t, True) for t in (types or NOTIFY_TYPES))
+
+
+class SubscriptionIndex:
+    """(시군, 대상) → 임계값 오름차순 (임계값 목록, 구독 목록)"""
+
+    def __init__(self, subscriptions: Iterable[Subscription]):
+        groups: Dict[Tuple[str, str], List[Subscription]] = {}
+        count = 0
+        for subscription in subscriptions:
+            count += 1
+            for region in set(subscription.regions):
+                groups.setdefault((region, subscription.target), []).append(subscription)
+
+        self._thresholds: Dict[Tuple[str, str], List[int]] = {}
+        self._subscriptions: Dict[Tuple[str, str], List[Subscription]] = {}
+        self._targets: Dict[str, List[str]] = {}
+        for key, members in groups.items():
+            members.sort(key=lambda s: s.threshold)
+            self._thresholds[key] = [s.threshold for s in members]
+            self._subscriptions[key] = members
+            self._targets.setdefault(key[0], []).append(key[1])
+        self.subscription_count = count
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def targets(self, region: str) -> List[str]:
+        """시군을 구독한 대상 목록"""
+        return self._targets.get(region, [])
+
+    def between(self, region: str, target: str, low: float, high: float) -> List[Subscription]:
+        """low < 임계값 ≤ high 인 구독"""
+        key = (region, target)
+        thresholds = self._thresholds.get(key)
+        if not thresholds:
+            return []
+        return self._subscriptions[key][bisect_right(thresholds, low):bisect_right(thresholds, high)]
+
+
+class Delivery:
+    """전달할 알림 하나"""
+
+    __slots__ = ("key", "payload", "attempts")
+
+    def __init__(self, key: Tuple[int, str, str], payload: Dict[str, Any]):
+        self.key = key
+        self.payload = payload
+        self.attempts = 0
+
+
+class NotificationSink(ABC):
+    """전송 채널 (실패하면 예외를 던져 재시도)"""
+
+    name = "base"
+
+    @abstractmethod
+    async def send(self, payload: Dict[str, Any]) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalSink(NotificationSink):
+    """로컬 대역: 최근 전송분을 메모리에 보관하고, 경로가 있으면 JSONL로 추가 기록"""
+
+    name = "local"
+
+    def __init__(self, path: Optional[str] = None, keep: int = 200):
+        self.path = path
+        self.sent: "deque[Dict[str, Any]]" = deque(maxlen=keep)
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        self.sent.append(payload)
+        if self.path:
+            # 파일 쓰기가 이벤트 루프를 막지 않도록 스레드에서 (한 줄을 한 번에 기록)
+            await asyncio.to_thread(self._append, json.dumps(payload, ensure_ascii=False) + "\n")
+
+    def _append(self, line: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class WebhookSink(NotificationSink):
+    """외부 발송 서버(웹 푸시/메신저 연동)로 알림 JSON POST (2xx가 아니면 실패)"""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self._client = upstream_client(timeout=timeout)
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        response = await self._client.post(self.url, json=payload)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_sink(kind: str) -> NotificationSink:
+    """
+    NOTIFY_SINK에 맞는 전송 채널 (서버 시작 시 lifespan에서 호출)
+    설정이 잘못되면 서버를 멈추지 않고 오류를 기록한 뒤 local 채널로 대체
+    """
+    if kind == "webhook":
+        if settings.NOTIFY_WEBHOOK_URL:
+            return WebhookSink(settings.NOTIFY_WEBHOOK_URL)
+        logger.error("NOTIFY_SINK=webhook이지만 NOTIFY_WEBHOOK_URL이 설정되지 않아 local 채널로 대체합니다.")
+    elif kind != "local":
+        logger.error(f"알 수 없는 NOTIFY_SINK({kind}) - local 채널로 대체합니다.")
+    return LocalSink(settings.NOTIFY_LOCAL_PATH or None)
+
+
+class DeliveryQueue:
+    """전송 속도 제한(토큰 버킷) + 재시도(지수 백오프) + 중복 창"""
+
+    def __init__(self, sink: NotificationSink, rate_per_second: float, max_attempts: int,
+                 retry_seconds: float, dedup_seconds: int, max_pending: int = 10000):
+        self.sink = sink
+        self.rate = rate_per_second
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.dedup_seconds = dedup_seconds
+        self.max_pending = max_pending
+        self._pending: "deque[Delivery]" = deque()
+        self._retries: List[Tuple[float, int, Delivery]] = []
+        self._seq = itertools.count()
+        # 키 → 접수 시각 (접수 순서 = 만료 순서)
+        self._recent: "OrderedDict[Tuple[int, str, str], float]" = OrderedDict()
+        self._tokens = max(1.0, rate_per_second)
+        self._filled_at = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self.stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "deduped": 0, "dropped": 0}
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._retries)
+
+    def _prune(self, now: float) -> None:
+        while self._recent:
+            key, at = next(iter(self._recent.items()))
+            if now - at < self.dedup_seconds:
+                break
+            self._recent.popitem(last=False)
+
+    def enqueue(self, delivery: Delivery) -> bool:
+        """접수 (중복 창 안의 같은 키나 큐가 가득 찬 경우 False)"""
+        now = time.monotonic()
+        self._prune(now)
+        if delivery.key in self._recent:
+            self.stats["deduped"] += 1
+            NOTIFICATION_DELIVERIES.inc(result="deduped")
+            return False
+        if len(self) >= self.max_pending:
+            self.stats["dropped"] += 1
+            NOTIFICATION_DELIVERIES.inc(result="dropped")
+            return False
+        self._recent[delivery.key] = now
+        self._pending.append(delivery)
+        self.stats["queued"] += 1
+        self._wakeup.set()
+        return True
+
+    def _next(self, now: float) -> Tuple[Optional[Delivery], Optional[float]]:
+        """보낼 알림 (재시도 시각이 된 것 우선), 없으면 다음 재시도까지 남은 시간"""
+        if self._retries and self._retries[0][0] <= now:
+            return heapq.heappop(self._retries)[2], None
+        if self._pending:
+            return self._pending.popleft(), None
+        return None, (self._retries[0][0] - now if self._retries else None)
+
+    async def _take_token(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._filled_at) * self.rate)
+            self._filled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def _deliver(self, delivery: Delivery) -> None:
+        delivery.attempts += 1
+        try:
+            await self.sink.send(delivery.payload)
+        except Exception as e:
+            if delivery.attempts >= self.max_attempts:
+                self.stats["failed"] += 1
+                NOTIFICATION_DELIVERIES.inc(result="failed")
+                logger.warning(f"알림 전송 포기 ({delivery.key}, {delivery.attempts}회): {e}")
+                return
+            due = time.monotonic() + self.retry_seconds * 2 ** (delivery.attempts - 1)
+            heapq.heappush(self._retries, (due, next(self._seq), delivery))
+            self.stats["retried"] += 1
+            NOTIFICATION_DELIVERIES.inc(result="retry")
+            return
+        self.stats["sent"] += 1
+        NOTIFICATION_DELIVERIES.inc(result="sent")
+
+    async def drain(self) -> None:
+        """지금 보낼 수 있는 알림을 모두 전송 (재시도 대기분은 남김)"""
+        while True:
+            delivery, _ = self._next(time.monotonic())
+            if delivery is None:
+                return
+            await self._take_token()
+            await self._deliver(delivery)
+
+    async def run(self) -> None:
+        """전송 루프"""
+        while True:
+            delivery, wait = self._next(time.monotonic())
+            if delivery is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._take_token()
+            await self._deliver(delivery)
+
+
+class NotificationEngine:
+    """스냅샷 리스너: 구독 색인으로 알릴 대상을 골라 전달 큐에 넣음"""
+
+    def __init__(self, queue: DeliveryQueue, reload_seconds: int,
+                 loader: Callable[[], Awaitable[Optional[List[Dict[str, Any]]]]]):
+        self.queue = queue
+        self.reload_seconds = reload_seconds
+        self._loader = loader
+        self.index = SubscriptionIndex([])
+        self._loaded_at: Optional[float] = None
+        self.evaluated_at: Optional[datetime] = None
+        self.last_matched = 0
+        self.last_filtered = 0
+
+    async def reload(self) -> None:
+        """활성 구독 전체를 한 번에 적재해 색인 재구성 (적재 실패 시 이전 색인 유지, 다음 평가 때 재시도)"""
+        rows = await self._loader()
+        if rows is None:
+            logger.warning(f"알림 구독 적재 실패 - 이전 색인 유지 ({len(self.index)}건)")
+            return
+        subscriptions = []
+        for row in rows:
+            try:
+                subscriptions.append(Subscription.from_row(row))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"알림 구독 행 무시 ({row.get('id')}): {e}")
+        self.index = SubscriptionIndex(subscriptions)
+        self._loaded_at = time.monotonic()
+
+    def matches(self, snapshot, previous) -> List[Tuple[Subscription, Dict[str, Any]]]:
+        """(구독, 알림 내용) 목록: 임계값을 새로 넘었거나 임계값 이상에서 위험 등급이 오른 경우"""
+        results = []
+        for region, entry in snapshot.regions.items():
+            targets = self.index.targets(region)
+            before = previous.regions.get(region) if previous else None
+            if not targets or before is None:
+                continue
+            for target in targets:
+                adjusted, risk = target_risk(entry["score"], target)
+                prev_adjusted, prev_risk = target_risk(before["score"], target)
+                score = adjusted or entry["score"]
+                prev_score = prev_adjusted or before["score"]
+                if RISK_RANK[risk] > RISK_RANK[prev_risk]:
+                    low = float("-inf")
+                elif score > prev_score:
+                    low = prev_score
+                else:
+                    continue
+                candidates = self.index.between(region, target, low, score)
+                if not candidates:
+                    continue
+                content = {
+                    "region": region,
+                    "target": target,
+                    "score": entry["score"],
+                    "adjusted_score": adjusted,
+                    "previous_score": before["score"],
+                    "risk_level": risk.value,
+                    "types": alert_types(entry["data"]),
+                    "title": f"{RISK_LABELS[risk]}: {region}",
+                    "body": f"현재 기후 위험도 {score}점",
+                    "snapshot_version": snapshot.version,
+                    "timestamp": snapshot.created_at.isoformat(),
+                }
+                results.extend((subscription, content) for subscription in candidates)
+        return results
+
+    async def evaluate(self, snapshot, previous) -> int:
+        """스냅샷 리스너 → 접수된 알림 수"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_seconds:
+            await self.reload()
+        self.evaluated_at = datetime.now()
+        matched = self.matches(snapshot, previous)
+        self.last_matched = len(matched)
+        self.last_filtered = 0
+        queued = 0
+        for subscription, content in matched:
+            if not subscription.wants(content["types"]):
+                self.last_filtered += 1
+                continue
+            payload = {
+                **content,
+                "subscription_id": subscription.id,
+                "user_id": subscription.user_id,
+                "threshold": subscription.threshold,
+                "notify_types": subscription.notify_types,
+                "push_subscription": subscription.push_subscription,
+            }
+            if self.queue.enqueue(Delivery((subscription.id, content["region"], content["risk_level"]), payload)):
+                queued += 1
+        return queued
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "sink": self.queue.sink.name,
+            "subscriptions": self.index.subscription_count,
+            "index_keys": len(self.index),
+            "evaluated_at": self.evaluated_at.isoformat() if self.evaluated_at else None,
+            "last_matched": self.last_matched,
+            "last_filtered": self.last_filtered,
+            "pending": len(self.queue),
+            "stats": dict(self.queue.stats),
+        }
+
+
+# 전송 채널은 lifespan에서 create_sink로 교체 (그 전까지는 local)
+notification_engine = NotificationEngine(
+    DeliveryQueue(
+        LocalSink(settings.NOTIFY_LOCAL_PATH or None),
+        settings.NOTIFY_RATE_PER_SECOND,
+        settings.NOTIFY_MAX_ATTEMPTS,
+        settings.NOTIFY_RETRY_SECONDS,
+        settings.NOTIFY_DEDUP_SECONDS,
+    ),
+    settings.NOTIFY_RELOAD_SECONDS,
+    notification_subscription_service.load_active,
+)
+track("notification_subscriptions", "notifications", lambda: notification_engine.index)
@@ -0,0 +1,139 @@
+"""
+요청 프로파일링 모듈
+운영자 헤더(X-Profile: ADMIN_TOKEN) 또는 PROFILE_SAMPLE_RATE 샘플링으로 선택된 요청만 cProfile로 측정하고
+결과를 PROFILE_DIR에 pstats 파일로 저장 (X-Profile-Id 응답 헤더로 조회 ID 반환)
+
+- 선택되지 않은 요청은 헤더 확인과 난수 비교만 수행
+- cProfile은 스레드당 하나만 켤 수 있어 동시에 한 요청만 프로파일링 (나머지는 건너뜀)
+- 이벤트 루프에서 같은 시간에 실행된 다른 코루틴도 함께 기록됨
+"""
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+# 텍스트 요약에 포함할 함수 수
+PROFILE_TEXT_LIMIT = 60
+
+_active = False
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """운영자 토큰 확인 (토큰 미설정 시 항상 거부)"""
+    return bool(settings.ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, settings.ADMIN_TOKEN)
+
+
+class RequestProfile:
+    """한 요청의 프로파일 세션"""
+
+    __slots__ = ("profile_id", "profiler", "started_at", "start", "reason")
+
+    def __init__(self, reason: str):
+        self.profile_id = uuid.uuid4().hex[:16]
+        self.profiler = cProfile.Profile()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.reason = reason
+
+
+def start_profile(header_token: Optional[str]) -> Optional[RequestProfile]:
+    """프로파일링 대상이면 세션 시작 (아니면 None)"""
+    global _active
+    if header_token is not None and is_admin(header_token):
+        reason = "header"
+    elif settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+        reason = "sampled"
+    else:
+        return None
+
+    if _active:
+        return None
+    session = RequestProfile(reason)
+    try:
+        session.profiler.enable()
+    except ValueError:
+        # 다른 프로파일러가 이미 켜져 있음
+        return None
+    _active = True
+    return session
+
+
+def finish_profile(session: RequestProfile, route: str, status: int) -> str:
+    """세션 종료 후 pstats 파일과 메타데이터 저장, 프로파일 ID 반환"""
+    global _active
+    session.profiler.disable()
+    _active = False
+    duration_ms = round((time.perf_counter() - session.start) * 1000, 2)
+
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    base = os.path.join(settings.PROFILE_DIR, session.profile_id)
+    session.profiler.dump_stats(base + ".prof")
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump({
+            "id": session.profile_id,
+            "route": route,
+            "status": status,
+            "reason": session.reason,
+            "created_at": session.started_at,
+            "duration_ms": duration_ms,
+        }, f, ensure_ascii=False)
+
+    _prune()
+    return session.profile_id
+
+
+def _prune() -> None:
+    """보관 개수를 넘는 오래된 프로파일 삭제"""
+    files = sorted(
+        (entry for entry in os.scandir(settings.PROFILE_DIR) if entry.name.endswith(".prof")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in files[:max(0, len(files) - settings.PROFILE_MAX_FILES)]:
+        for suffix in (".prof", ".json"):
+            try:
+                os.remove(entry.path[:-len(".prof")] + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """저장된 프로파일 메타데이터 (최신순)"""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    result = []
+    for entry in os.scandir(settings.PROFILE_DIR):
+        if entry.name.endswith(".json"):
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    result.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sorted(result, key=lambda meta: meta.get("created_at", 0), reverse=True)
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """pstats 파일 경로 (ID 형식이 틀리거나 없으면 None)"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, profile_id + ".prof")
+    return path if os.path.exists(path) else None
+
+
+def profile_text(path: str, sort: str = "cumulative", limit: int = PROFILE_TEXT_LIMIT) -> str:
+    """pstats 텍스트 요약"""
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,115 @@
+"""
+기후 점수 스냅샷 모듈
+전체 시군 데이터를 한 번에 계산해 버전을 붙여 보관 (요청마다 재계산하지 않음)
+"""
+import asyncio
+import inspect
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from climate_api import get_all_mock_data
+from climate_index import calculate_climate_score
+from config import settings
+from heatwave import heatwave_tracker
+from memory import track
+from metrics import record_cache
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class ClimateSnapshot:
+    """
+    한 번의 갱신 결과 (갱신 후 변경하지 않음)
+    regions: {지역: {"data": 기후 데이터, "score": 점수, "risk_level": RiskLevel}}
+    """
+
+    __slots__ = ("version", "created_at", "regions")
+
+    def __init__(self, version: int, created_at: datetime, regions: Dict[str, Dict[str, Any]]):
+        self.version = version
+        self.created_at = created_at
+        self.regions = regions
+
+
+# 갱신 리스너: (새 스냅샷, 이전 스냅샷) → None 또는 코루틴
+SnapshotListener = Callable[[ClimateSnapshot, Optional[ClimateSnapshot]], Any]
+
+
+class SnapshotStore:
+    """현재 스냅샷 보관 및 주기적 갱신"""
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._current: Optional[ClimateSnapshot] = None
+        self._refreshed_at = 0.0
+        self._listeners: List[SnapshotListener] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def current(self) -> Optional[ClimateSnapshot]:
+        return self._current
+
+    def subscribe(self, listener: SnapshotListener) -> None:
+        """갱신 시 호출될 리스너 등록 (이력 기록 등)"""
+        self._listeners.append(listener)
+
+    def _is_stale(self) -> bool:
+        return self._current is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds
+
+    async def refresh(self) -> ClimateSnapshot:
+        """전체 시군 데이터 재계산 후 리스너 호출"""
+        async with self._lock:
+            previous = self._current
+            regions = {}
+            with span("fetch"):
+                rows = get_all_mock_data()
+            with span("score"):
+                for data in rows:
+                    # 폭염/열대야 카운터는 관측 기반 값만 사용 (시즌 채우기 전이면 null)
+                    heat = heatwave_tracker.region_summary(data["region"]) or {}
+                    data["heat_wave_days"] = heat.get("heat_wave_days")
+                    data["heat_wave_streak"] = heat.get("heat_wave_streak")
+                    data["tropical_nights"] = heat.get("tropical_nights")
+                    score, risk_level = calculate_climate_score(data)
+                    regions[data["region"]] = {"data": data, "score": score, "risk_level": risk_level}
+
+            snapshot = ClimateSnapshot(
+                version=previous.version + 1 if previous else 1,
+                created_at=datetime.now(),
+                regions=regions,
+            )
+            self._current = snapshot
+            self._refreshed_at = time.monotonic()
+
+        for listener in self._listeners:
+            try:
+                result = listener(snapshot, previous)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"스냅샷 리스너 오류: {e}")
+
+        return snapshot
+
+    async def get(self) -> ClimateSnapshot:
+        """현재 스냅샷 (갱신 주기가 지났으면 먼저 갱신)"""
+        if self._is_stale():
+            record_cache("snapshot", False)
+            return await self.refresh()
+        record_cache("snapshot", True)
+        return self._current
+
+    async def run(self) -> None:
+        """백그라운드 갱신 루프 (요청이 없어도 주기마다 갱신)"""
+        while True:
+            if self._is_stale():
+                await self.refresh()
+            remaining = self.refresh_seconds - (time.monotonic() - self._refreshed_at)
+            await asyncio.sleep(max(1.0, remaining))
+
+
+snapshot_store = SnapshotStore(settings.SNAPSHOT_REFRESH_SECONDS)
+track("climate_snapshot", "snapshots", lambda: snapshot_store)
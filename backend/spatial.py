@@ -0,0 +1,121 @@
+"""
+좌표 → 지역 조회 모듈
+경계 폴리곤이 없으므로 가장 가까운 중심점(보로노이 근사)으로 지역을 정함
+- 좌표를 경기도 중심 위도 기준 평면(km)으로 투영해 격자 버킷에 저장
+- 조회는 좌표가 속한 칸의 최근접 후보만 비교 (수 µs)
+"""
+import math
+from array import array
+from typing import Dict, Optional, Sequence, Tuple
+
+from climate_api import GYEONGGI_REGIONS
+from subregions import PARENTS, SubRegionRegistry, subregion_registry
+
+KM_PER_DEGREE = 111.195
+# 투영 기준 위도 (경기도 중앙)
+REFERENCE_LAT = 37.5
+_LNG_SCALE = KM_PER_DEGREE * math.cos(math.radians(REFERENCE_LAT))
+# 격자 칸 크기 (km)
+GRID_CELL_KM = 2.0
+# 이보다 먼 좌표는 경기도 밖으로 보고 조회하지 않음 (프론트엔드 위치 감지 기준과 동일)
+MAX_LOCATE_KM = 50.0
+
+
+def project(lat: float, lng: float) -> Tuple[float, float]:
+    return lng * _LNG_SCALE, lat * KM_PER_DEGREE
+
+
+class GridIndex:
+    """
+    중심점 격자 인덱스 (최근접점 조회 전용)
+    칸마다 그 칸 안의 어떤 좌표에서든 최근접이 될 수 있는 후보만 모아 두므로
+    조회는 dict 한 번과 후보 몇 개의 거리 비교로 끝남 (후보 목록은 처음 조회한 칸만 계산해 보관)
+    """
+
+    def __init__(self, lats: Sequence[float], lngs: Sequence[float], cell_km: float = GRID_CELL_KM,
+                 max_km: float = MAX_LOCATE_KM):
+        self.cell_km = cell_km
+        self.max_km = max_km
+        self.x = array("d")
+        self.y = array("d")
+        for lat, lng in zip(lats, lngs):
+            x, y = project(lat, lng)
+            self.x.append(x)
+            self.y.append(y)
+        self._bounds = (min(self.x), min(self.y), max(self.x), max(self.y)) if self.x else None
+        self._candidates: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def _cell_candidates(self, key: Tuple[int, int]) -> Tuple[int, ...]:
+        """
+        칸 중심에서 최근접점까지 거리가 d일 때, 칸 안 좌표의 최근접은 칸 중심에서 d + 칸 대각선 이내에 있음
+        칸 전체가 max_km 밖이면 빈 목록
+        """
+        cx = (key[0] + 0.5) * self.cell_km
+        cy = (key[1] + 0.5) * self.cell_km
+        half_diagonal = self.cell_km * math.sqrt(2) / 2
+        distances = [math.hypot(x - cx, y - cy) for x, y in zip(self.x, self.y)]
+        nearest = min(distances)
+        if nearest - half_diagonal > self.max_km:
+            return ()
+        limit = nearest + 2 * half_diagonal
+        return tuple(i for i, d in enumerate(distances) if d <= limit)
+
+    def nearest(self, lat: float, lng: float) -> Optional[Tuple[int, float]]:
+        """최근접 중심점 (인덱스, 거리 km), max_km 안에 없으면 None"""
+        if self._bounds is None:
+            return None
+        x, y = project(lat, lng)
+        # 중심점 범위에서 max_km보다 먼 좌표는 칸을 만들지 않고 종료 (후보 캐시 크기 제한)
+        min_x, min_y, max_x, max_y = self._bounds
+        dx = max(min_x - x, 0.0, x - max_x)
+        dy = max(min_y - y, 0.0, y - max_y)
+        if dx * dx + dy * dy > self.max_km ** 2:
+            return None
+        key = (int(x // self.cell_km), int(y // self.cell_km))
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = self._candidates[key] = self._cell_candidates(key)
+        xs, ys = self.x, self.y
+        best, best_d2 = -1, math.inf
+        for i in candidates:
+            d2 = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+            if d2 < best_d2:
+                best, best_d2 = i, d2
+        if best < 0 or best_d2 > self.max_km ** 2:
+            return None
+        return best, math.sqrt(best_d2)
+
+
+class RegionLocator:
+    """좌표 → (시군, 읍·면·동 인덱스, 거리)"""
+
+    def __init__(self, registry: SubRegionRegistry):
+        self.registry = registry
+        self.regions = GridIndex(
+            [GYEONGGI_REGIONS[name]["lat"] for name in PARENTS],
+            [GYEONGGI_REGIONS[name]["lng"] for name in PARENTS],
+        )
+        self.subregions = GridIndex(registry.lat, registry.lng) if len(registry) else None
+
+    def locate(self, lat: float, lng: float) -> Optional[Tuple[str, Optional[int], float]]:
+        """
+        읍·면·동 등록부가 있으면 최근접 읍·면·동과 그 상위 시군, 없으면 최근접 시군
+        (더 촘촘한 중심점이 시군 경계를 더 잘 근사)
+        """
+        if self.subregions is not None:
+            found = self.subregions.nearest(lat, lng)
+            if found is None:
+                return None
+            i, distance = found
+            return PARENTS[self.registry.parent[i]], i, distance
+        found = self.regions.nearest(lat, lng)
+        if found is None:
+            return None
+        i, distance = found
+        return PARENTS[i], None, distance
+
+
+region_locator = RegionLocator(subregion_registry)
@@ -0,0 +1,229 @@
+"""
+실시간 갱신 스트림 모듈 (Server-Sent Events)
+수집 파이프라인이 발행한 변경만 구독자에게 전달 (열린 탭마다 주기적으로 폴링하지 않도록)
+- snapshot: 스냅샷 버전과 구독 시군의 점수 변화 (대상 보정 점수/위험 등급 포함)
+- alerts: 구독 시군의 특보 발표/변경/해제
+
+이벤트 id는 "프로세스 epoch-허브 순번". 재연결 시 Last-Event-ID(또는 since) 이후 이벤트를 최근 기록에서 재전송하고,
+다른 프로세스(재시작 전)의 id이거나 기록보다 오래됐거나 송신 버퍼가 넘친 연결에는 resync 이벤트로 전체 재조회를 알림
+같은 (시군 필터, 대상) 구독자는 이벤트마다 한 번 직렬화한 바이트를 공유
+"""
+import asyncio
+import json
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from alerts import alert_feed
+from climate_index import target_risk
+from config import settings
+from memory import track
+
+HEARTBEAT = b": heartbeat\n\n"
+# 송신 버퍼 최소 크기 (넘칠 때 resync와 새 이벤트가 함께 들어가야 함)
+MIN_BUFFER_EVENTS = 2
+
+
+class StreamFullError(Exception):
+    """동시 연결 수 상한 초과"""
+
+
+def _frame(kind: str, data: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+class StreamEvent:
+    """
+    발행된 이벤트 하나 (발행 후 변경하지 않음)
+    snapshot: {"version", "timestamp", "changes": [{"region", "score", "previous_score"}]}
+    alerts: {"version", "issued": [...], "updated": [...], "cleared": [...]} (특보 응답 형식)
+    """
+
+    __slots__ = ("event_id", "wire_id", "kind", "data", "_frames")
+
+    def __init__(self, epoch: str, event_id: int, kind: str, data: Dict[str, Any]):
+        self.event_id = event_id
+        self.wire_id = f"{epoch}-{event_id}"
+        self.kind = kind
+        self.data = data
+        self._frames: Dict[Tuple[Optional[FrozenSet[str]], Optional[str]], Optional[bytes]] = {}
+
+    def frame(self, regions: Optional[FrozenSet[str]], target: Optional[str]) -> Optional[bytes]:
+        """구독 조건에 맞춘 SSE 프레임 (해당 내용이 없으면 None, 조건별로 한 번만 직렬화)"""
+        key = (regions, target)
+        if key not in self._frames:
+            self._frames[key] = self._render(regions, target)
+        return self._frames[key]
+
+    def _render(self, regions: Optional[FrozenSet[str]], target: Optional[str]) -> Optional[bytes]:
+        if self.kind == "snapshot":
+            changes = []
+            for change in self.data["changes"]:
+                if regions is not None and change["region"] not in regions:
+                    continue
+                adjusted, risk = target_risk(change["score"], target)
+                changes.append({**change, "adjusted_score": adjusted, "risk_level": risk.value})
+            # 버전 변경은 구독 시군에 점수 변화가 없어도 전달
+            return _frame("snapshot", {**self.data, "changes": changes}, self.wire_id)
+
+        data = {"version": self.data["version"]}
+        for group in ("issued", "updated", "cleared"):
+            data[group] = [a for a in self.data[group] if regions is None or a["region"] in regions]
+        if not (data["issued"] or data["updated"] or data["cleared"]):
+            return None
+        return _frame("alerts", data, self.wire_id)
+
+
+class Subscriber:
+    """연결 하나의 구독 조건과 제한된 송신 버퍼"""
+
+    __slots__ = ("regions", "target", "queue", "overflows")
+
+    def __init__(self, regions: Optional[FrozenSet[str]], target: Optional[str], buffer: int):
+        self.regions = regions
+        self.target = target
+        self.queue: "asyncio.Queue[Tuple[int, bytes]]" = asyncio.Queue(maxsize=max(MIN_BUFFER_EVENTS, buffer))
+        self.overflows = 0
+
+    def offer(self, event: StreamEvent, resync: Callable[[], bytes]) -> None:
+        frame = event.frame(self.regions, self.target)
+        if frame is None:
+            return
+        if self.queue.full():
+            # 느린 연결: 쌓인 이벤트를 버리고 전체 재조회 안내 후 이어서 전달
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((0, resync()))
+            self.overflows += 1
+        self.queue.put_nowait((event.event_id, frame))
+
+
+class StreamHub:
+    """이벤트 발행, 최근 이벤트 기록(재개용), 구독자 관리"""
+
+    def __init__(self, replay_events: int, buffer_events: int, heartbeat_seconds: float, max_connections: int):
+        self.buffer_events = buffer_events
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_connections = max_connections
+        self._events: "deque[StreamEvent]" = deque(maxlen=replay_events)
+        # 프로세스마다 다른 값 (재시작 후 순번이 1부터 다시 시작해도 이전 id와 구분)
+        self.epoch = uuid.uuid4().hex[:8]
+        self._last_id = 0
+        self._subscribers: Set[Subscriber] = set()
+        self.snapshot_version = 0
+        self.alert_version = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def _resync(self, reason: str) -> bytes:
+        return _frame("resync", {
+            "reason": reason,
+            "snapshot_version": self.snapshot_version,
+            "alert_version": self.alert_version,
+        })
+
+    def publish(self, kind: str, data: Dict[str, Any]) -> StreamEvent:
+        self._last_id += 1
+        event = StreamEvent(self.epoch, self._last_id, kind, data)
+        self._events.append(event)
+        for subscriber in self._subscribers:
+            subscriber.offer(event, lambda: self._resync("buffer_overflow"))
+        return event
+
+    def publish_snapshot(self, snapshot, previous) -> None:
+        """스냅샷 리스너: 버전과 점수가 바뀐 시군 발행"""
+        changes = []
+        for region, entry in snapshot.regions.items():
+            before = previous.regions.get(region) if previous else None
+            if before is None or before["score"] != entry["score"]:
+                changes.append({
+                    "region": region,
+                    "score": entry["score"],
+                    "previous_score": before["score"] if before else None,
+                })
+        self.snapshot_version = snapshot.version
+        self.publish("snapshot", {
+            "version": snapshot.version,
+            "timestamp": snapshot.created_at.isoformat(),
+            "changes": changes,
+        })
+
+    def publish_alerts(self, changes: Dict[str, List[Any]]) -> None:
+        """특보 리스너: 발표/변경/해제된 특보 발행"""
+        self.alert_version = alert_feed.version
+        self.publish("alerts", {
+            "version": alert_feed.version,
+            "issued": [alert.to_dict() for alert in changes["issued"]],
+            "updated": [alert.to_dict() for alert in changes["updated"]],
+            "cleared": [alert.to_dict() for alert in changes["cleared"]],
+        })
+
+    def check_capacity(self) -> None:
+        if len(self._subscribers) >= self.max_connections:
+            raise StreamFullError("동시 연결 수 상한을 초과했습니다.")
+
+    def _since(self, event_id: str) -> Optional[int]:
+        """이 프로세스가 발행한 이벤트 id의 순번 (다른 epoch이거나 형식이 맞지 않으면 None)"""
+        epoch, _, seq = event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _replay(self, since: int) -> Optional[List[StreamEvent]]:
+        """since 이후 이벤트 (기록에서 이미 밀려났거나 아직 발행되지 않은 순번이면 None)"""
+        if since == self._last_id:
+            return []
+        if since > self._last_id:
+            return None
+        if not self._events or since < self._events[0].event_id - 1:
+            return None
+        return [event for event in self._events if event.event_id > since]
+
+    async def stream(self, regions: Optional[FrozenSet[str]], target: Optional[str],
+                     since: Optional[str]) -> AsyncIterator[bytes]:
+        """연결 하나의 SSE 본문 (hello → 재전송 → 실시간 이벤트/heartbeat), 연결이 끊기면 구독 해제"""
+        subscriber = Subscriber(regions, target, self.buffer_events)
+        self._subscribers.add(subscriber)
+        try:
+            yield _frame("hello", {
+                "snapshot_version": self.snapshot_version,
+                "alert_version": self.alert_version,
+                "last_event_id": f"{self.epoch}-{self._last_id}",
+                "timestamp": datetime.now().isoformat(),
+            })
+            sent = 0
+            if since is not None:
+                sent = self._since(since)
+                events = None if sent is None else self._replay(sent)
+                if events is None:
+                    yield self._resync("too_old" if sent is not None else "restarted")
+                    events, sent = [], 0
+                for event in events:
+                    frame = event.frame(subscriber.regions, subscriber.target)
+                    if frame is not None:
+                        yield frame
+                    sent = event.event_id
+            while True:
+                try:
+                    event_id, frame = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                # 재전송과 겹치는 이벤트는 건너뜀 (resync는 id 0)
+                if event_id and event_id <= sent:
+                    continue
+                yield frame
+        finally:
+            self._subscribers.discard(subscriber)
+
+
+stream_hub = StreamHub(
+    settings.STREAM_REPLAY_EVENTS,
+    settings.STREAM_BUFFER_EVENTS,
+    settings.STREAM_HEARTBEAT_SECONDS,
+    settings.STREAM_MAX_CONNECTIONS,
+)
+track("stream_hub", "snapshots", lambda: stream_hub)
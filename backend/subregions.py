@@ -0,0 +1,263 @@
+"""
+읍·면·동 단위 기후 점수 모듈
+- 등록부(행정동 코드, 이름, 상위 시군, 중심 좌표)를 CSV에서 읽어 배열 형태로 보관
+- 시군 스냅샷이 갱신될 때마다 가까운 시군 값을 역거리 가중(IDW)으로 보간해 점수 계산
+- 한 번의 갱신은 SUBREGION_BUDGET_SECONDS 안에서 끝내고, 남은 단위는 다음 갱신에서 이어서 계산
+  (그동안은 이전 값을 stale로 제공)
+"""
+import asyncio
+import csv
+import logging
+import math
+import os
+import time
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from climate_api import GYEONGGI_REGIONS
+from climate_index import RiskLevel, calculate_apparent_temperatures, calculate_climate_score
+from config import settings
+from memory import track
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# 보간할 관측 항목 (체감온도는 보간한 기온/습도/풍속으로 다시 계산)
+INTERPOLATED_FIELDS = (
+    "temperature", "humidity", "pm10", "pm25", "uv_index",
+    "surface_temperature", "wind_speed", "precipitation",
+)
+# 보간에 사용할 가까운 시군 수와 거리 지수
+IDW_NEIGHBORS = 4
+IDW_POWER = 2.0
+# 예산 확인 및 이벤트 루프 양보 단위
+REFRESH_CHUNK = 64
+
+PARENTS: Tuple[str, ...] = tuple(GYEONGGI_REGIONS)
+RISK_ORDER: Tuple[RiskLevel, ...] = (RiskLevel.SAFE, RiskLevel.CAUTION, RiskLevel.WARNING, RiskLevel.DANGER)
+_RISK_INDEX = {level: i for i, level in enumerate(RISK_ORDER)}
+# 행정동 코드 앞 4자리 → 시군 (구가 있는 시도 앞 4자리는 시 코드와 같음)
+_PARENT_BY_PREFIX = {info["code"][:4]: name for name, info in GYEONGGI_REGIONS.items()}
+
+
+def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """등장방형 근사 거리 (경기도 범위에서는 하버사인과 차이 미미)"""
+    x = (lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = lat2 - lat1
+    return math.hypot(x, y) * 111.195
+
+
+class SubRegionRegistry:
+    """
+    읍·면·동 등록부
+    상위 시군 순서로 정렬해 같은 시군의 단위가 연속 구간이 되도록 하고,
+    좌표/상위 시군/보간 이웃은 항목별 dict 대신 평평한 배열에 저장
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str, float, float]]):
+        ordered = sorted(rows, key=lambda row: (PARENTS.index(row[2]), row[0]))
+        self.codes: List[str] = [row[0] for row in ordered]
+        self.names: List[str] = [row[1] for row in ordered]
+        self.parent = array("B", (PARENTS.index(row[2]) for row in ordered))
+        self.lat = array("d", (row[3] for row in ordered))
+        self.lng = array("d", (row[4] for row in ordered))
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+
+        # 시군 → [시작, 끝) 구간
+        self.ranges: Dict[str, Tuple[int, int]] = {}
+        for i, p in enumerate(self.parent):
+            start, _ = self.ranges.get(PARENTS[p], (i, i))
+            self.ranges[PARENTS[p]] = (start, i + 1)
+
+        self.neighbors, self.weights = self._idw_weights()
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _idw_weights(self) -> Tuple[array, array]:
+        """단위별 가까운 시군 IDW_NEIGHBORS개와 정규화 가중치 (등록부 로드 시 한 번 계산)"""
+        centroids = [(GYEONGGI_REGIONS[name]["lat"], GYEONGGI_REGIONS[name]["lng"]) for name in PARENTS]
+        k = min(IDW_NEIGHBORS, len(centroids))
+        neighbors = array("B")
+        weights = array("d")
+        for lat, lng in zip(self.lat, self.lng):
+            nearest = sorted(
+                (_distance_km(lat, lng, c_lat, c_lng), j) for j, (c_lat, c_lng) in enumerate(centroids)
+            )[:k]
+            if nearest[0][0] < 1e-6:
+                raw = [1.0] + [0.0] * (k - 1)
+            else:
+                raw = [1.0 / d ** IDW_POWER for d, _ in nearest]
+            total = sum(raw)
+            neighbors.extend(j for _, j in nearest)
+            weights.extend(w / total for w in raw)
+        return neighbors, weights
+
+    @classmethod
+    def from_csv(cls, path: str) -> "SubRegionRegistry":
+        """
+        CSV 열: code, name, lat, lng, parent(선택)
+        parent가 없으면 행정동 코드 앞 4자리로 시군을 찾음
+        """
+        rows = []
+        skipped = 0
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for record in csv.DictReader(f):
+                code = record["code"].strip()
+                parent = (record.get("parent") or "").strip() or _PARENT_BY_PREFIX.get(code[:4])
+                if parent not in GYEONGGI_REGIONS:
+                    skipped += 1
+                    continue
+                rows.append((code, record["name"].strip(), parent, float(record["lat"]), float(record["lng"])))
+        if skipped:
+            logger.warning(f"읍·면·동 등록부: 상위 시군을 알 수 없는 {skipped}행 제외")
+        return cls(rows)
+
+
+class SubRegionSnapshot:
+    """
+    한 번의 읍·면·동 갱신 결과 (갱신 후 변경하지 않음)
+    values: 항목 → 단위별 값 배열, updated: 단위별 마지막 계산 버전 (0이면 미계산)
+    """
+
+    __slots__ = ("version", "created_at", "source", "values", "scores", "risk", "updated", "complete")
+
+    def __init__(self, version: int, created_at: datetime, source: Any, values: Dict[str, array],
+                 scores: array, risk: array, updated: array, complete: bool):
+        self.version = version
+        self.created_at = created_at
+        self.source = source
+        self.values = values
+        self.scores = scores
+        self.risk = risk
+        self.updated = updated
+        self.complete = complete
+
+    def risk_level(self, i: int) -> RiskLevel:
+        return RISK_ORDER[self.risk[i]]
+
+
+class SubRegionStore:
+    """시군 스냅샷 갱신 리스너로 등록해 읍·면·동 스냅샷을 이어서 계산"""
+
+    def __init__(self, registry: SubRegionRegistry, budget_seconds: float):
+        self.registry = registry
+        self.budget_seconds = budget_seconds
+        self._current: Optional[SubRegionSnapshot] = None
+        self._cursor = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def current(self) -> Optional[SubRegionSnapshot]:
+        return self._current
+
+    def _parent_values(self, snapshot) -> Dict[str, List[float]]:
+        """시군별 항목 값 (결측은 해당 항목의 시군 평균으로 대체)"""
+        result = {}
+        for field in INTERPOLATED_FIELDS:
+            raw = [snapshot.regions[name]["data"].get(field) if name in snapshot.regions else None for name in PARENTS]
+            present = [v for v in raw if v is not None]
+            fill = sum(present) / len(present) if present else 0.0
+            result[field] = [fill if v is None else v for v in raw]
+        return result
+
+    def _compute(self, indices: List[int], parent_values: Dict[str, List[float]],
+                 values: Dict[str, array], scores: array, risk: array) -> None:
+        registry = self.registry
+        neighbors, weights = registry.neighbors, registry.weights
+        k = len(neighbors) // len(registry)
+        for field, source in parent_values.items():
+            target = values[field]
+            for i in indices:
+                base = i * k
+                target[i] = sum(source[neighbors[base + j]] * weights[base + j] for j in range(k))
+
+        apparent = calculate_apparent_temperatures(
+            [values["temperature"][i] for i in indices],
+            [values["humidity"][i] for i in indices],
+            [values["wind_speed"][i] for i in indices],
+        )
+        for i, at in zip(indices, apparent):
+            values["apparent_temperature"][i] = at
+            score, level = calculate_climate_score({field: values[field][i] for field in values})
+            scores[i] = score
+            risk[i] = _RISK_INDEX[level]
+
+    async def refresh(self, snapshot, previous=None) -> Optional[SubRegionSnapshot]:
+        """
+        시군 스냅샷에서 읍·면·동 값 계산 (snapshot_store 리스너 시그니처)
+        예산을 넘기면 나머지 단위는 이전 값을 유지하고 다음 갱신에서 이어서 계산
+        (첫 갱신은 빈 값이 없도록 예산과 관계없이 전체 계산)
+        """
+        n = len(self.registry)
+        if n == 0:
+            return None
+        async with self._lock:
+            if self._current is not None and self._current.source is snapshot:
+                return self._current
+            return await self._refresh(snapshot, n)
+
+    async def get(self, snapshot) -> Optional[SubRegionSnapshot]:
+        """시군 스냅샷에 해당하는 읍·면·동 스냅샷 (리스너 계산이 아직 끝나지 않았으면 기다리거나 직접 계산)"""
+        current = self._current
+        if current is not None and current.source is snapshot:
+            return current
+        return await self.refresh(snapshot)
+
+    async def _refresh(self, snapshot, n: int) -> SubRegionSnapshot:
+        prior = self._current
+        with span("subregions"):
+            if prior is None:
+                values = {field: array("d", bytes(8 * n)) for field in INTERPOLATED_FIELDS + ("apparent_temperature",)}
+                scores, risk, updated = array("B", bytes(n)), array("B", bytes(n)), array("I", bytes(4 * n))
+            else:
+                values = {field: array("d", column) for field, column in prior.values.items()}
+                scores, risk, updated = array("B", prior.scores), array("B", prior.risk), array("I", prior.updated)
+            version = prior.version + 1 if prior else 1
+            parent_values = self._parent_values(snapshot)
+
+            started = time.perf_counter()
+            deadline = started + self.budget_seconds
+            done = 0
+            while done < n:
+                chunk = [(self._cursor + done + j) % n for j in range(min(REFRESH_CHUNK, n - done))]
+                self._compute(chunk, parent_values, values, scores, risk)
+                for i in chunk:
+                    updated[i] = version
+                done += len(chunk)
+                if prior is not None and time.perf_counter() >= deadline:
+                    break
+                # 긴 계산 중에도 다른 요청을 처리하도록 양보
+                await asyncio.sleep(0)
+
+            self._cursor = (self._cursor + done) % n
+            if done < n:
+                logger.info(f"읍·면·동 갱신 예산 초과: {done}/{n} 단위 계산, 나머지는 다음 갱신에서 계산")
+
+        current = SubRegionSnapshot(
+            version=version,
+            created_at=datetime.now(),
+            source=snapshot,
+            values=values,
+            scores=scores,
+            risk=risk,
+            updated=updated,
+            complete=done == n,
+        )
+        self._current = current
+        return current
+
+
+def load_registry(path: str) -> SubRegionRegistry:
+    """등록부 로드 (파일이 없으면 빈 등록부)"""
+    if not path or not os.path.exists(path):
+        logger.warning(f"읍·면·동 등록부 없음 ({path}) - 읍·면·동 기능 꺼짐 (SUBREGION_CSV로 등록부 제공 필요)")
+        return SubRegionRegistry([])
+    return SubRegionRegistry.from_csv(path)
+
+
+subregion_registry = load_registry(settings.SUBREGION_CSV)
+subregion_store = SubRegionStore(subregion_registry, settings.SUBREGION_BUDGET_SECONDS)
+track("subregion_registry", "snapshots", lambda: subregion_registry)
+track("subregion_snapshot", "snapshots", lambda: subregion_store.current)
@@ -2,11 +2,17 @@
 Supabase 클라이언트 모듈
 Backend에서 Supabase DB 연동을 위한 유틸리티
 """
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterable
+from datetime import datetime, timedelta, timezone
+import base64
+import json
 import logging
+import time
 
 from config import settings
+from memory import track
+from metrics import SUPABASE_QUERY_SECONDS, record_cache
+from tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +32,100 @@ def get_supabase():
     return _supabase
 
 
+def _execute(query, table: str, operation: str):
+    """쿼리 실행 + 테이블/작업별 소요 시간 기록"""
+    start = time.perf_counter()
+    status = "error"
+    try:
+        with span("db"):
+            response = query.execute()
+        status = "ok"
+        return response
+    finally:
+        SUPABASE_QUERY_SECONDS.observe(time.perf_counter() - start, table=table, operation=operation, status=status)
+
+
+# API가 직렬화하는 컬럼만 조회 (main.ClimateData 필드 + 버전 판단용 updated_at)
+CLIMATE_DATA_COLUMNS = (
+    "region,lat,lng,temperature,apparent_temperature,humidity,pm10,pm25,"
+    "uv_index,surface_temperature,wind_speed,precipitation,heat_wave_days,updated_at"
+)
+
+# 다른 프로세스(수집 작업 등)의 변경을 감지하기 위한 버전 확인 최소 간격 (초)
+# 캐시를 만료시키는 TTL이 아니라, max(updated_at)이 바뀌었을 때만 다시 적재
+VERSION_POLL_INTERVAL = 5.0
+
+
+class _ClimateDataCache:
+    """
+    climate_data 읽기 캐시 (read-through)
+    - 데이터 버전: 테이블의 max(updated_at)
+    - 같은 프로세스의 쓰기는 revision 카운터로 즉시 무효화
+    - 외부 쓰기는 VERSION_POLL_INTERVAL마다 버전 한 줄만 조회해 감지
+    """
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self.rows: List[Dict[str, Any]] = []
+        self.by_region: Dict[str, Dict[str, Any]] = {}
+        self.revision = 0
+        self._loaded_revision = -1
+        self._checked_at = 0.0
+
+    def invalidate(self) -> None:
+        """수집 경로에서 데이터 변경 알림"""
+        self.revision += 1
+
+    def _fetch_version(self, client) -> Optional[str]:
+        # 내림차순 정렬은 NULL이 먼저 오므로 제외 (_load의 버전 계산과 동일하게 NULL 무시)
+        response = _execute(
+            client.table('climate_data')
+            .select('updated_at')
+            .not_.is_('updated_at', 'null')
+            .order('updated_at', desc=True)
+            .limit(1),
+            'climate_data', 'version',
+        )
+        return response.data[0]['updated_at'] if response.data else None
+
+    def _load(self, client) -> None:
+        revision = self.revision
+        response = _execute(client.table('climate_data').select(CLIMATE_DATA_COLUMNS).order('region'), 'climate_data', 'select')
+        rows = response.data or []
+        self.rows = rows
+        self.by_region = {row['region']: row for row in rows}
+        self.version = max((row.get('updated_at') or '' for row in rows), default=None) or None
+        self._loaded_revision = revision
+        self._checked_at = time.monotonic()
+
+    def ensure_fresh(self, client) -> None:
+        """필요할 때만 다시 적재 (로컬 변경 알림 또는 버전 변경)"""
+        if self._loaded_revision != self.revision:
+            record_cache("climate_data", False)
+            self._load(client)
+            return
+
+        now = time.monotonic()
+        if now - self._checked_at < VERSION_POLL_INTERVAL:
+            record_cache("climate_data", True)
+            return
+
+        self._checked_at = now
+        changed = self._fetch_version(client) != self.version
+        record_cache("climate_data", not changed)
+        if changed:
+            self._load(client)
+
+
+_climate_cache = _ClimateDataCache()
+track("climate_data_cache", "db", lambda: _climate_cache)
+
+
+def notify_climate_data_changed() -> None:
+    """climate_data 변경 알림 (다음 읽기에서 캐시 재적재)"""
+    _climate_cache.invalidate()
+
+
 class ClimateDataService:
     """기후 데이터 DB 서비스"""
 
@@ -37,8 +137,9 @@ class ClimateDataService:
             return None
 
         try:
-            response = client.table('climate_data').select('*').order('region').execute()
-            return response.data
+            _climate_cache.ensure_fresh(client)
+            # 공유 캐시 행을 호출자가 바꾸지 않도록 복사본 반환
+            return [dict(row) for row in _climate_cache.rows]
         except Exception as e:
             logger.error(f"데이터 조회 오류: {e}")
             return None
@@ -51,12 +152,18 @@ class ClimateDataService:
             return None
 
         try:
-            response = client.table('climate_data').select('*').eq('region', region_name).single().execute()
-            return response.data
+            _climate_cache.ensure_fresh(client)
+            row = _climate_cache.by_region.get(region_name)
+            return dict(row) if row is not None else None
         except Exception as e:
             logger.error(f"지역 조회 오류: {e}")
             return None
 
+    @staticmethod
+    def get_data_version() -> Optional[str]:
+        """현재 캐시된 데이터 버전 (max updated_at)"""
+        return _climate_cache.version
+
     @staticmethod
     async def update_climate_data(region_name: str, data: Dict[str, Any]) -> bool:
         """기후 데이터 업데이트"""
@@ -66,7 +173,8 @@ class ClimateDataService:
 
         try:
             data['updated_at'] = datetime.now().isoformat()
-            client.table('climate_data').update(data).eq('region', region_name).execute()
+            _execute(client.table('climate_data').update(data).eq('region', region_name), 'climate_data', 'update')
+            notify_climate_data_changed()
             return True
         except Exception as e:
             logger.error(f"데이터 업데이트 오류: {e}")
@@ -81,7 +189,8 @@ class ClimateDataService:
 
         try:
             data['updated_at'] = datetime.now().isoformat()
-            client.table('climate_data').upsert(data).execute()
+            _execute(client.table('climate_data').upsert(data), 'climate_data', 'upsert')
+            notify_climate_data_changed()
             return True
         except Exception as e:
             logger.error(f"데이터 upsert 오류: {e}")
@@ -99,9 +208,15 @@ class ExplanationService:
             return None
 
         try:
-            response = client.table('ai_explanations').select('*').eq('region', region).eq('target', target).single().execute()
+            response = _execute(
+                client.table('ai_explanations').select('*').eq('region', region).eq('target', target).single(),
+                'ai_explanations', 'select',
+            )
+            record_cache("ai_explanations", bool(response.data))
             return response.data
         except Exception:
+            # single()은 행이 없으면 예외 → 캐시 미스
+            record_cache("ai_explanations", False)
             return None
 
     @staticmethod
@@ -112,37 +227,121 @@ class ExplanationService:
             return False
 
         try:
-            client.table('ai_explanations').upsert({
+            _execute(client.table('ai_explanations').upsert({
                 'region': region,
                 'target': target,
                 'explanation': explanation,
                 'updated_at': datetime.now().isoformat()
-            }).execute()
+            }), 'ai_explanations', 'upsert')
             return True
         except Exception as e:
             logger.error(f"설명 저장 오류: {e}")
             return False
 
 
+# 제보 조회 시 선택 가능한 컬럼 (user_id는 노출하지 않음)
+REPORT_COLUMNS = (
+    'id', 'region', 'lat', 'lng', 'emoji', 'feeling_label', 'sentiment_score',
+    'temp_adjustment', 'comment', 'is_air_quality', 'likes', 'nickname', 'created_at',
+)
+MAX_REPORT_PAGE_SIZE = 100
+
+
+def encode_report_cursor(row: Dict[str, Any]) -> str:
+    """마지막 행의 (created_at, id)를 불투명 커서 문자열로 변환"""
+    raw = json.dumps([row['created_at'], row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_report_cursor(cursor: str) -> tuple:
+    """
+    커서 문자열 → (created_at, id). 형식이 잘못되면 ValueError
+    값이 PostgREST 필터 문자열에 들어가므로 created_at은 ISO 시각으로 파싱해 다시 직렬화하고 id는 정수만 허용
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, report_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(created_at, str) or type(report_id) is not int:
+            raise TypeError("created_at은 문자열, id는 정수여야 합니다.")
+        return datetime.fromisoformat(created_at).isoformat(), report_id
+    except Exception as e:
+        raise ValueError(f"잘못된 커서: {cursor}") from e
+
+
+def resolve_report_fields(fields: Optional[Iterable[str]]) -> str:
+    """
+    fields 프로젝션 → select 문자열
+    커서 생성을 위해 created_at, id는 항상 포함. 알 수 없는 컬럼은 ValueError
+    """
+    if not fields:
+        return ','.join(REPORT_COLUMNS)
+
+    requested = [f.strip() for f in fields if f and f.strip()]
+    unknown = [f for f in requested if f not in REPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(unknown)}")
+
+    selected = list(dict.fromkeys(requested))
+    for key in ('created_at', 'id'):
+        if key not in selected:
+            selected.append(key)
+    return ','.join(selected)
+
+
 class UserReportService:
     """사용자 제보 서비스"""
 
     @staticmethod
-    async def get_reports(region: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
-        """사용자 제보 목록 조회"""
+    async def get_reports(
+        region: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        사용자 제보 목록 조회 (keyset 페이지네이션)
+        - 정렬: (created_at, id) 내림차순, idx_user_reports_region_time 인덱스 사용
+        - cursor: 이전 페이지의 next_cursor (OFFSET 없이 다음 페이지 조회)
+        - fields: 반환할 컬럼 목록 (REPORT_COLUMNS 중 선택)
+        반환: {"reports": [...], "next_cursor": str | None}
+        잘못된 cursor/fields는 ValueError
+        """
+        columns = resolve_report_fields(fields)
+        after = decode_report_cursor(cursor) if cursor else None
+        page_size = max(1, min(int(limit), MAX_REPORT_PAGE_SIZE))
+
         client = get_supabase()
         if not client:
-            return []
+            return {"reports": [], "next_cursor": None}
 
         try:
-            query = client.table('user_reports').select('*').order('created_at', desc=True).limit(limit)
+            # 다음 페이지 존재 여부 확인용으로 한 행 더 조회
+            query = (
+                client.table('user_reports')
+                .select(columns)
+                .order('created_at', desc=True)
+                .order('id', desc=True)
+                .limit(page_size + 1)
+            )
             if region:
                 query = query.eq('region', region)
-            response = query.execute()
-            return response.data or []
+            if after:
+                created_at, report_id = after
+                query = query.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt.{report_id})'
+                )
+            rows = _execute(query, 'user_reports', 'select').data or []
         except Exception as e:
             logger.error(f"제보 조회 오류: {e}")
-            return []
+            return {"reports": [], "next_cursor": None}
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_report_cursor(rows[-1])
+
+        return {"reports": rows, "next_cursor": next_cursor}
 
     @staticmethod
     async def create_report(report_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -152,14 +351,263 @@ class UserReportService:
             return None
 
         try:
-            response = client.table('user_reports').insert(report_data).execute()
+            response = _execute(client.table('user_reports').insert(report_data), 'user_reports', 'insert')
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"제보 생성 오류: {e}")
             return None
 
 
+# 집계 조회 페이지 크기 (PostgREST 기본 응답 행 수 상한 이하)
+STATS_PAGE_SIZE = 1000
+
+
+class ReportStatsService:
+    """지역/시간대별 제보 집계 서비스 (user_report_hourly_stats 롤업 테이블)"""
+
+    @staticmethod
+    async def get_region_counts(regions: Iterable[str], hours: int = 24) -> Dict[str, Any]:
+        """
+        최근 N시간의 지역별 시간대 제보 수
+        원본 제보를 읽지 않고 트리거가 증분 갱신하는 롤업 테이블만 조회
+        반환: {"hours", "buckets": [ISO 시각...], "regions": {지역: {"total", "counts": [...]}}}
+        counts[i]는 buckets[i] 시간대의 제보 수 (오래된 순)
+        롤업 행은 최대 시군 수 × 시간 수이므로 (bucket, region) keyset으로 페이지 단위 조회
+        """
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        start = now - timedelta(hours=hours - 1)
+        buckets = [start + timedelta(hours=i) for i in range(hours)]
+        counts = {region: [0] * hours for region in regions}
+
+        client = get_supabase()
+        if client:
+            rows: List[Dict[str, Any]] = []
+            try:
+                while True:
+                    query = (
+                        client.table('user_report_hourly_stats')
+                        .select('region,bucket,report_count')
+                        .gte('bucket', start.isoformat())
+                        .order('bucket')
+                        .order('region')
+                        .limit(STATS_PAGE_SIZE)
+                    )
+                    if rows:
+                        last = rows[-1]
+                        query = query.or_(
+                            f'bucket.gt."{last["bucket"]}",'
+                            f'and(bucket.eq."{last["bucket"]}",region.gt."{last["region"]}")'
+                        )
+                    page = _execute(query, 'user_report_hourly_stats', 'select').data or []
+                    rows.extend(page)
+                    if len(page) < STATS_PAGE_SIZE:
+                        break
+                # 모든 페이지를 받은 뒤에만 반영 (중간 실패 시 일부 시간대만 채워지지 않도록)
+                for row in rows:
+                    series = counts.get(row['region'])
+                    if series is None:
+                        continue
+                    bucket = datetime.fromisoformat(row['bucket']).astimezone(timezone.utc)
+                    idx = int((bucket - start).total_seconds() // 3600)
+                    if 0 <= idx < hours:
+                        series[idx] += row['report_count']
+            except Exception as e:
+                logger.error(f"제보 집계 조회 오류: {e}")
+
+        return {
+            "hours": hours,
+            "buckets": [b.isoformat() for b in buckets],
+            "regions": {
+                region: {"total": sum(series), "counts": series}
+                for region, series in counts.items()
+            },
+        }
+
+
+# 이력 적재 페이지 크기 (PostgREST 기본 응답 행 수 상한 이하)
+HISTORY_PAGE_SIZE = 1000
+
+
+class ScoreHistoryService:
+    """지역별 점수 이력 저장 서비스 (climate_score_history, 추가 전용)"""
+
+    @staticmethod
+    async def append_snapshot(snapshot) -> bool:
+        """스냅샷 한 건의 전체 지역 점수를 한 번의 insert로 기록"""
+        client = get_supabase()
+        if not client:
+            return False
+
+        recorded_at = snapshot.created_at.astimezone().isoformat()
+        rows = []
+        for region, entry in snapshot.regions.items():
+            data = entry["data"]
+            rows.append({
+                'region': region,
+                'recorded_at': recorded_at,
+                'score': entry["score"],
+                'temperature': data.get('temperature'),
+                'apparent_temperature': data.get('apparent_temperature'),
+                'humidity': data.get('humidity'),
+                'pm10': data.get('pm10'),
+                'pm25': data.get('pm25'),
+            })
+
+        try:
+            _execute(client.table('climate_score_history').insert(rows), 'climate_score_history', 'insert')
+            return True
+        except Exception as e:
+            logger.error(f"점수 이력 저장 오류: {e}")
+            return False
+
+    @staticmethod
+    async def load_since(since: datetime) -> List[Dict[str, Any]]:
+        """
+        since 이후 이력 조회 (recorded_at 오름차순)
+        PostgREST 응답 행 수 상한에 잘리지 않도록 (recorded_at, id) keyset으로 페이지 단위 조회
+        """
+        client = get_supabase()
+        if not client:
+            return []
+
+        rows: List[Dict[str, Any]] = []
+        try:
+            while True:
+                query = (
+                    client.table('climate_score_history')
+                    .select('id,region,recorded_at,score,temperature,apparent_temperature,humidity,pm10,pm25')
+                    .gte('recorded_at', since.astimezone().isoformat())
+                    .order('recorded_at')
+                    .order('id')
+                    .limit(HISTORY_PAGE_SIZE)
+                )
+                if rows:
+                    last = rows[-1]
+                    query = query.or_(
+                        f'recorded_at.gt."{last["recorded_at"]}",'
+                        f'and(recorded_at.eq."{last["recorded_at"]}",id.gt.{int(last["id"])})'
+                    )
+                page = _execute(query, 'climate_score_history', 'select').data or []
+                rows.extend(page)
+                if len(page) < HISTORY_PAGE_SIZE:
+                    return rows
+        except Exception as e:
+            # 중간 페이지에서 실패하면 오래된 앞부분만 남으므로 전체를 버림 (이후 스냅샷부터 다시 쌓임)
+            logger.error(f"점수 이력 조회 오류: {e}")
+            return []
+
+
+class WeatherAlertService:
+    """기상 특보 저장 서비스 (weather_alerts, 변경된 특보만 기록)"""
+
+    @staticmethod
+    async def load_active(now: datetime) -> List[Dict[str, Any]]:
+        """발효 중(is_active, 만료 전)인 특보 조회"""
+        client = get_supabase()
+        if not client:
+            return []
+
+        try:
+            response = _execute(
+                client.table('weather_alerts')
+                .select('id,type,title,message,region,issued_at,expires_at')
+                .eq('is_active', True)
+                .gte('expires_at', now.isoformat()),
+                'weather_alerts', 'select',
+            )
+            return response.data or []
+        except Exception as e:
+            logger.error(f"기상 특보 조회 오류: {e}")
+            return []
+
+    @staticmethod
+    async def insert(rows: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """새 특보 일괄 저장 → 행 id (저장하지 못하면 None)"""
+        client = get_supabase()
+        if not client:
+            return [None] * len(rows)
+
+        try:
+            response = _execute(client.table('weather_alerts').insert(rows), 'weather_alerts', 'insert')
+            return [row.get('id') for row in response.data or []] or [None] * len(rows)
+        except Exception as e:
+            logger.error(f"기상 특보 저장 오류: {e}")
+            return [None] * len(rows)
+
+    @staticmethod
+    async def update(row_id: int, row: Dict[str, Any]) -> bool:
+        """수준/발표 시각/만료 기한이 바뀐 특보 갱신"""
+        client = get_supabase()
+        if not client:
+            return False
+
+        try:
+            _execute(client.table('weather_alerts').update(row).eq('id', row_id), 'weather_alerts', 'update')
+            return True
+        except Exception as e:
+            logger.error(f"기상 특보 갱신 오류: {e}")
+            return False
+
+    @staticmethod
+    async def deactivate(row_ids: List[int]) -> bool:
+        """해제된 특보 비활성화"""
+        client = get_supabase()
+        if not client:
+            return False
+
+        try:
+            _execute(
+                client.table('weather_alerts').update({'is_active': False}).in_('id', row_ids),
+                'weather_alerts', 'update',
+            )
+            return True
+        except Exception as e:
+            logger.error(f"기상 특보 해제 오류: {e}")
+            return False
+
+
+# 구독 적재 페이지 크기 (PostgREST 기본 응답 행 수 상한 이하)
+SUBSCRIPTION_PAGE_SIZE = 1000
+
+
+class NotificationSubscriptionService:
+    """위험 알림 구독 조회 서비스 (notification_subscriptions, 알림 엔진이 한 번에 적재)"""
+
+    @staticmethod
+    async def load_active() -> Optional[List[Dict[str, Any]]]:
+        """
+        활성 구독 전체 조회 (target 열이 없는 이전 스키마도 읽도록 전체 열 선택)
+        PostgREST 응답 행 수 상한에 잘리지 않도록 id 순으로 페이지 단위 조회, 실패하면 None
+        """
+        client = get_supabase()
+        if not client:
+            return []
+
+        rows: List[Dict[str, Any]] = []
+        try:
+            while True:
+                page = _execute(
+                    client.table('notification_subscriptions')
+                    .select('*')
+                    .eq('is_active', True)
+                    .order('id')
+                    .range(len(rows), len(rows) + SUBSCRIPTION_PAGE_SIZE - 1),
+                    'notification_subscriptions', 'select',
+                ).data or []
+                rows.extend(page)
+                if len(page) < SUBSCRIPTION_PAGE_SIZE:
+                    return rows
+        except Exception as e:
+            # 일부만 적재하면 나머지 구독자가 알림을 못 받으므로 실패로 돌려 이전 색인을 유지
+            logger.error(f"알림 구독 조회 오류: {e}")
+            return None
+
+
 # 서비스 인스턴스
 climate_service = ClimateDataService()
 explanation_service = ExplanationService()
 report_service = UserReportService()
+report_stats_service = ReportStatsService()
+score_history_service = ScoreHistoryService()
+weather_alert_service = WeatherAlertService()
+notification_subscription_service = NotificationSubscriptionService()
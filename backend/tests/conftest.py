@@ -0,0 +1,28 @@
+"""
+백엔드 테스트 공통 설정
+외부 서비스(Supabase, OpenAI, 기상청)를 부르지 않도록 설정 모듈을 읽기 전에 환경 변수를 비움
+"""
+import importlib.util
+import os
+
+import pytest
+
+os.environ["SUPABASE_URL"] = ""
+os.environ["SUPABASE_KEY"] = ""
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["CLIMATE_API_KEY"] = ""
+# 실수로 호출해도 바로 연결 거부되는 주소
+os.environ["KMA_BASE_URL"] = "http://127.0.0.1:9/api/typ01/url"
+os.environ["SUBREGION_CSV"] = os.devnull + ".missing"
+
+
+API_INDEX = os.path.join(os.path.dirname(__file__), "..", "..", "api", "index.py")
+
+
+@pytest.fixture(scope="session")
+def api_index():
+    """서버리스 함수 모듈 (api/index.py, 백엔드와 같은 규칙인지 비교용)"""
+    spec = importlib.util.spec_from_file_location("api_index", API_INDEX)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
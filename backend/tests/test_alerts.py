@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from alerts import Alert, AlertFeed, AlertIndex, parse_warnings
+from kma_proxy import KST
+
+FEED = """#START7777
+# REG_UP, REG_UP_KO, REG_ID, REG_KO, TM_FC, TM_EF, WRN, LVL, CMD, ED_TM
+L1000000, 서울ㆍ인천ㆍ경기도, L1001200, 고양, 202607151100, 202607151100, 폭염, 주의보, 발표, 없음,=
+L1000000, 서울ㆍ인천ㆍ경기도, L1001200, 고양, 202607151200, 202607151200, 폭염, 경보, 대치, 없음,=
+L1000000, 서울ㆍ인천ㆍ경기도, L1002100, 용인, 202607151100, 202607151100, 호우, 주의보, 발표, 202607152100,=
+L1000000, 서울ㆍ인천ㆍ경기도, L1000900, 평택, 202607151000, 202607151000, 폭염, 주의보, 해제, 없음,=
+L1000000, 서울ㆍ인천ㆍ경기도, L1009999, 서울, 202607151000, 202607151000, 폭염, 주의보, 발표, 없음,=
+L1100000, 강원도, L1100100, 춘천, 202607151000, 202607151000, 폭염, 경보, 발표, 없음,=
+#7777END
+"""
+NOW = datetime(2026, 7, 15, 12, 30, tzinfo=KST)
+
+
+def test_parse_warnings_keeps_gyeonggi_active_alerts():
+    alerts = {alert.key: alert for alert in parse_warnings(FEED)}
+    assert set(alerts) == {("고양시", "폭염"), ("용인시", "호우")}
+    # 같은 시군·종류는 높은 수준만
+    assert alerts[("고양시", "폭염")].level == "경보"
+    assert alerts[("고양시", "폭염")].expires_at is None
+    assert alerts[("용인시", "호우")].expires_at == datetime(2026, 7, 15, 21, 0, tzinfo=KST)
+
+
+def _alert(region, kind="폭염", level="주의보", expires_in=3600):
+    return Alert(region, kind, level, NOW, NOW + timedelta(seconds=expires_in))
+
+
+def test_alert_index_expire_skips_replaced_entries():
+    index = AlertIndex()
+    index.put(_alert("수원시", expires_in=60))
+    replacement = _alert("수원시", level="경보", expires_in=7200)
+    index.put(replacement)
+    goyang = _alert("고양시", expires_in=60)
+    index.put(goyang)
+    # 교체된 수원 주의보의 힙 항목은 만료 시각이 지났어도 건너뜀
+    assert index.expire(NOW + timedelta(seconds=120)) == [goyang]
+    assert index.all() == [replacement]
+    assert index.region("고양시") == []
+    assert [a.key for a in index.expire(NOW + timedelta(hours=3))] == [("수원시", "폭염")]
+    assert len(index) == 0
+
+
+def test_alert_feed_diff_reports_issued_updated_and_cleared():
+    feed = AlertFeed(poll_seconds=300, hold_seconds=6 * 3600)
+    first = feed.diff(parse_warnings(FEED), NOW)
+    assert sorted(a.region for a in first["issued"]) == ["고양시", "용인시"]
+    # 해제 예고가 없는 특보는 hold 기한까지
+    goyang = next(a for a in first["issued"] if a.region == "고양시")
+    assert goyang.expires_at == NOW + timedelta(hours=6)
+    for alert in first["issued"]:
+        alert.row_id = hash(alert.key)
+    feed.apply(first)
+
+    # 같은 피드를 다시 받으면 변경 없음 (기한이 멀면 연장하지 않음)
+    again = feed.diff(parse_warnings(FEED), NOW + timedelta(minutes=5))
+    assert not any(again.values())
+
+    # 용인 특보가 빠지고 고양 특보 수준이 바뀜
+    changed = FEED.replace("L1002100, 용인", "L1002100, 없는구역").replace("폭염, 경보, 대치", "폭염, 주의보, 변경")
+    diff = feed.diff(parse_warnings(changed), NOW + timedelta(minutes=10))
+    assert [a.region for a in diff["cleared"]] == ["용인시"]
+    assert [(a.region, a.level) for a in diff["updated"]] == [("고양시", "주의보")]
+    assert diff["updated"][0].row_id == hash(("고양시", "폭염"))
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from batch import BatchItem, BatchRunner, validate_batch
+
+
+def test_stream_and_admin_paths_are_excluded():
+    for path in ("/api/stream", "/api/stream?region=수원시", "/api/batch", "/admin/upstreams", "/metrics"):
+        with pytest.raises(ValueError):
+            validate_batch([BatchItem(id="a", path=path)], 10)
+
+
+def test_event_stream_sub_response_is_rejected_without_buffering():
+    app = FastAPI()
+
+    @app.get("/events")
+    async def events():
+        async def body():
+            while True:
+                yield b"data: x\n\n"
+                await asyncio.sleep(0.01)
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    async def main():
+        runner = BatchRunner(app)
+        try:
+            return await asyncio.wait_for(
+                runner.run([BatchItem(id="e", path="/events"), BatchItem(id="o", path="/ok")]), 3
+            )
+        finally:
+            await runner.close()
+
+    body = asyncio.run(main())
+    assert b'"id": "e", "path": "/events","status":406' in body
+    assert b'"body":{"ok":true}' in body
@@ -0,0 +1,170 @@
+import asyncio
+
+import httpx
+import pytest
+
+import circuit_breaker as cb
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitOpenError, GuardedUpstream
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(cb.settings, "KMA_RETRIES", 0)
+    monkeypatch.setattr(cb.settings, "KMA_BREAKER_FAILURES", 2)
+
+
+def _opened(name="test"):
+    """시험 호출을 바로 허용하는 상태(차단 유지 시간이 지난 open)의 호출기"""
+    upstream = GuardedUpstream(name)
+    upstream.breaker.state = OPEN
+    upstream.breaker.opened_at = -upstream.breaker.reset_seconds
+    return upstream
+
+
+async def ok():
+    return {"success": True}
+
+
+async def down():
+    raise httpx.ConnectError("연결 실패")
+
+
+async def hang():
+    await asyncio.Event().wait()
+
+
+async def _cancel_while(upstream, fetch):
+    task = asyncio.create_task(upstream.call("key", fetch))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_opens_after_consecutive_failures_and_serves_stale():
+    async def main():
+        upstream = GuardedUpstream("test")
+        assert await upstream.call("key", ok) == {"success": True}
+        for _ in range(2):
+            stale = await upstream.call("key", down)
+            assert stale["stale"] is True and stale["success"] is True
+        assert upstream.breaker.state == OPEN
+        # 차단 중에는 fetch를 부르지 않음
+        assert (await upstream.call("key", hang))["stale"] is True
+        with pytest.raises(CircuitOpenError):
+            await upstream.call("other", hang)
+    asyncio.run(main())
+
+
+def test_half_open_trial_closes_or_reopens():
+    async def main():
+        upstream = _opened()
+        assert await upstream.call("key", ok) == {"success": True}
+        assert upstream.breaker.state == CLOSED
+
+        upstream = _opened()
+        with pytest.raises(httpx.ConnectError):
+            await upstream.call("key", down)
+        assert upstream.breaker.state == OPEN
+    asyncio.run(main())
+
+
+def test_only_one_half_open_trial_at_a_time():
+    async def main():
+        upstream = _opened()
+        trial = asyncio.create_task(upstream.call("key", hang))
+        await asyncio.sleep(0.05)
+        assert upstream.breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            await upstream.call("key", ok)
+        trial.cancel()
+        await asyncio.gather(trial, return_exceptions=True)
+    asyncio.run(main())
+
+
+def test_cancelled_trial_frees_the_slot():
+    async def main():
+        upstream = _opened()
+        await _cancel_while(upstream, hang)
+        assert await upstream.call("key", ok) == {"success": True}
+        assert upstream.breaker.state == CLOSED
+    asyncio.run(main())
+
+
+def test_trial_cancelled_during_backoff_frees_the_slot(monkeypatch):
+    monkeypatch.setattr(cb.settings, "KMA_RETRIES", 2)
+    monkeypatch.setattr(cb.settings, "KMA_DEADLINE_SECONDS", 3600)
+    monkeypatch.setattr(cb, "RETRY_BACKOFF_BASE", 10.0)
+    monkeypatch.setattr(cb, "RETRY_BACKOFF_MAX", 10.0)
+    monkeypatch.setattr(cb.random, "uniform", lambda low, high: high)
+
+    async def main():
+        upstream = _opened()
+        await _cancel_while(upstream, down)
+        assert upstream.breaker.allow()
+    asyncio.run(main())
+
+
+def test_cancelled_closed_call_keeps_another_requests_trial():
+    async def main():
+        upstream = GuardedUpstream("test")
+        task = asyncio.create_task(upstream.call("key", hang))
+        await asyncio.sleep(0.05)
+        # 닫힌 상태 요청이 도는 사이 열리고 다른 요청의 시험 호출이 시작됨
+        upstream.breaker.state = OPEN
+        upstream.breaker.opened_at = -upstream.breaker.reset_seconds
+        assert upstream.breaker.allow()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert not upstream.breaker.allow()
+    asyncio.run(main())
+
+
+def test_remember_false_skips_the_last_good_cache():
+    async def main():
+        upstream = GuardedUpstream("test")
+        await upstream.call("key", ok, remember=False)
+        assert len(upstream.last_good) == 0
+    asyncio.run(main())
+
+
+async def not_found():
+    raise httpx.HTTPStatusError("없음", request=httpx.Request("GET", "http://kma"),
+                                response=httpx.Response(404))
+
+
+def test_non_retryable_error_is_neutral():
+    async def main():
+        # 시험 호출의 4xx는 차단을 풀지 않고 자리만 비움
+        upstream = _opened()
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.call("key", not_found)
+        assert upstream.breaker.state == HALF_OPEN
+        assert upstream.breaker.allow()
+
+        # 닫힌 상태의 4xx는 누적된 실패 수를 지우지 않음
+        upstream = GuardedUpstream("test")
+        with pytest.raises(httpx.ConnectError):
+            await upstream.call("key", down)
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.call("key", not_found)
+        assert upstream.breaker.failures == 1
+        with pytest.raises(httpx.ConnectError):
+            await upstream.call("key", down)
+        assert upstream.breaker.state == OPEN
+    asyncio.run(main())
+
+
+def test_last_good_cache_is_bounded_by_size():
+    columns = {"TA": [20.5] * 1000}
+    size = cb.approx_size(columns)
+    cache = cb.LastGoodCache(max_entries=100, max_bytes=size * 3)
+    for tm in range(10):
+        cache.put(("tm", tm), columns)
+    assert len(cache) == 3 and cache.bytes == size * 3
+    assert cache.stale(("tm", 9)) is not None and cache.stale(("tm", 6)) is None
+
+    # 혼자서 상한을 넘는 응답은 보관하지 않고 같은 키의 이전 응답도 버림
+    cache.put(("tm", 9), {"TA": [20.5] * 10000})
+    assert cache.stale(("tm", 9)) is None
+    assert len(cache) == 2 and cache.bytes == size * 2
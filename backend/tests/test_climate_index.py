@@ -0,0 +1,61 @@
+import pytest
+
+from climate_index import (
+    RiskLevel,
+    calculate_apparent_temperature,
+    calculate_apparent_temperatures,
+    calculate_climate_score,
+    risk_level_for,
+    target_risk,
+)
+
+
+def test_apparent_temperature_uses_heat_index_in_summer():
+    hot = calculate_apparent_temperatures([33.0, 33.0], [40.0, 80.0], [2.0, 2.0])
+    # 기온이 같으면 습할수록 체감온도가 높음
+    assert hot[0] < hot[1]
+    assert hot[1] > 33.0
+
+
+def test_apparent_temperature_uses_wind_chill_in_winter():
+    calm, windy = calculate_apparent_temperatures([-5.0, -5.0], [50.0, 50.0], [1.0, 8.0])
+    assert calm == -5.0           # 1.3m/s 미만은 바람 영향 없음
+    assert windy < -5.0
+
+
+def test_apparent_temperature_passes_through_between_formulas():
+    assert calculate_apparent_temperatures([18.04], [50.0], [3.0]) == [18.0]
+
+
+def test_apparent_temperature_defaults_and_missing_values():
+    assert calculate_apparent_temperatures([None, 30.0]) == [None, calculate_apparent_temperature(30.0, 50.0, 2.0)]
+    assert calculate_apparent_temperatures([]) == []
+
+
+@pytest.mark.parametrize("score, level", [
+    (0, RiskLevel.SAFE), (29, RiskLevel.SAFE), (30, RiskLevel.CAUTION), (49, RiskLevel.CAUTION),
+    (50, RiskLevel.WARNING), (74, RiskLevel.WARNING), (75, RiskLevel.DANGER), (100, RiskLevel.DANGER),
+])
+def test_target_risk_thresholds(score, level):
+    assert target_risk(score, None) == (None, level)
+
+
+def test_target_risk_uses_the_adjusted_score():
+    adjusted, level = target_risk(45, "elderly")
+    assert adjusted > 45
+    assert target_risk(adjusted, None)[1] == level
+
+
+def test_risk_level_for_prefers_the_adjusted_score():
+    assert risk_level_for(45) == RiskLevel.CAUTION
+    assert risk_level_for(45, 58) == RiskLevel.WARNING
+    assert risk_level_for(45, None) == risk_level_for(45, 0) == RiskLevel.CAUTION
+    data = {"temperature": 33, "apparent_temperature": 38, "humidity": 75, "pm10": 90, "pm25": 40, "uv_index": 9}
+    score, level = calculate_climate_score(data)
+    assert level == risk_level_for(score)
+
+
+def test_serverless_risk_levels_match_backend(api_index):
+    for score in range(101):
+        for adjusted in (None, min(100, score + 13)):
+            assert api_index.risk_level_for(score, adjusted) == risk_level_for(score, adjusted).value
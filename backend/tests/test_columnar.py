@@ -0,0 +1,84 @@
+import math
+
+import msgpack
+import pytest
+
+from columnar import _INT_MAX, _INT_MIN, compact_columns, packb, wants_msgpack
+
+# 각 인코딩 형식의 경계 (fixint, uint8~64, int8~64)
+INT_BOUNDARIES = [
+    0, 127, 128, 255, 256, 0xFFFF, 0x10000, 0xFFFFFFFF, 0x100000000, (1 << 63) - 1, 1 << 63, _INT_MAX,
+    -1, -32, -33, -128, -129, -0x8000, -0x8001, -0x80000000, -0x80000001, _INT_MIN,
+]
+
+
+def _unpack(data):
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def test_int_range_is_msgpack_int64_to_uint64():
+    assert (_INT_MIN, _INT_MAX) == (-(1 << 63), (1 << 64) - 1)
+
+
+@pytest.mark.parametrize("n", INT_BOUNDARIES)
+def test_ints_match_the_reference_encoder(n):
+    assert packb(n) == msgpack.packb(n)
+    assert _unpack(packb([n, [n], {"n": n}])) == [n, [n], {"n": n}]
+
+
+# float로 바꿔도 범위 안인 경계 (uint64 최댓값은 float로 2**64가 되어 제외)
+@pytest.mark.parametrize("n", [n for n in INT_BOUNDARIES if _INT_MIN <= float(n) <= _INT_MAX])
+def test_integral_floats_round_trip_as_ints(n):
+    value = float(n)
+    assert _unpack(packb(value)) == value
+    assert _unpack(packb([value, 0.5])) == [value, 0.5]
+
+
+def test_floats_outside_the_int_range_stay_doubles():
+    for value in (float(1 << 64), -float(1 << 64) * 2, 1e300, math.inf, -math.inf, 0.1, -2.5):
+        assert _unpack(packb(value)) == value
+        assert _unpack(packb([value])) == [value]
+    assert math.isnan(_unpack(packb(math.nan)))
+
+
+@pytest.mark.parametrize("size", [0, 15, 16, 31, 32, 255, 256, 0xFFFF, 0x10000])
+def test_containers_and_strings_match_the_reference_encoder(size):
+    values = [
+        "가" * (size // 3) + "a" * (size % 3),
+        b"\x00" * size,
+        list(range(size)),
+        {str(i): None for i in range(size)},
+    ]
+    for value in values:
+        assert packb(value) == msgpack.packb(value, use_bin_type=True)
+        assert _unpack(packb(value)) == value
+
+
+def test_columns_round_trip():
+    columns = compact_columns({
+        "TM": [202607151400.0, 202607151500.0],
+        "STN": [119.0, 98.0],
+        "TA": [33.2, None],
+        "WW": ["-", "비"],
+        "SD_HR3": [None, None],
+        "ok": [True, False],
+    })
+    body = {"success": True, "count": 2, "data": columns}
+    assert _unpack(packb(body)) == body
+    assert columns["SD_HR3"] is None
+
+
+def test_serverless_encoder_matches_backend(api_index):
+    body = {"data": {"n": INT_BOUNDARIES, "f": [float(n) for n in INT_BOUNDARIES[:11]] + [0.5, None]}}
+    assert api_index.packb(body) == packb(body)
+
+
+@pytest.mark.parametrize("accept,expected", [
+    ("application/msgpack", True),
+    ("application/json, application/x-msgpack;q=0.5", True),
+    ("application/vnd.msgpack;q=0", False),
+    ("application/json", False),
+    (None, False),
+])
+def test_wants_msgpack(accept, expected):
+    assert wants_msgpack(accept) is expected
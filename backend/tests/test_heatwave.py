@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import heatwave
+import snapshot
+from heatwave import HeatWaveTracker
+from kma_proxy import KST
+
+SUWON = 119
+
+
+def _columns(start, hours, ta=30.0, apparent=35.0, stn=SUWON):
+    """start부터 hours시간의 관측소 한 곳 관측 컬럼"""
+    tms = [float((start + timedelta(hours=h)).strftime("%Y%m%d%H00")) for h in range(hours)]
+    return {"TM": tms, "STN": [float(stn)] * hours, "TA": [ta] * hours, "HM": [60.0] * hours,
+            "WS": [1.0] * hours, "AT": [apparent] * hours}
+
+
+def _ready(tracker, columns, until):
+    tracker.observe_columns(columns)
+    tracker.finish_backfill(until)
+    return tracker
+
+
+@pytest.fixture
+def tracker(monkeypatch, tmp_path):
+    fresh = HeatWaveTracker()
+    monkeypatch.setattr(heatwave, "heatwave_tracker", fresh)
+    monkeypatch.setattr(heatwave.settings, "HEATWAVE_STATE_PATH", str(tmp_path / "heatwave.json"))
+    return fresh
+
+
+def test_saved_counters_round_trip(tmp_path):
+    path = str(tmp_path / "heatwave.json")
+    start = datetime(2026, 7, 1, tzinfo=KST)
+    until = start + timedelta(hours=24 * 5 - 1)
+    saved = _ready(HeatWaveTracker(), _columns(start, 24 * 5), until)
+    saved.save(path)
+
+    restored = HeatWaveTracker()
+    assert restored.load(path, "2026") == until
+    assert restored.ready and restored.backfilling
+    assert restored.region_summary("수원시") == saved.region_summary("수원시")
+    assert restored.region_summary("수원시")["heat_wave_days"] == 5
+
+    # 다른 시즌의 저장분은 무시
+    assert HeatWaveTracker().load(path, "2027") is None
+
+
+def test_backfill_fetches_only_the_gap_after_saved_counters(tracker, monkeypatch):
+    start = datetime(2026, 7, 1, tzinfo=KST)
+    saved_until = start + timedelta(hours=47)
+    _ready(HeatWaveTracker(), _columns(start, 48), saved_until).save(heatwave.settings.HEATWAVE_STATE_PATH)
+
+    calls = []
+
+    async def fetch(tm1, tm2, stn, remember=True):
+        calls.append((tm1, tm2, stn))
+        first = datetime.strptime(tm1, "%Y%m%d%H%M").replace(tzinfo=KST)
+        hours = int((datetime.strptime(tm2, "%Y%m%d%H%M").replace(tzinfo=KST) - first).total_seconds() // 3600) + 1
+        return {"success": True, "columns": _columns(first, hours, stn=int(stn))}
+
+    monkeypatch.setattr(heatwave, "fetch_kma_period", fetch)
+    end = saved_until + timedelta(hours=24)
+    asyncio.run(heatwave.backfill_season(end))
+
+    assert {(tm1, tm2) for tm1, tm2, _ in calls} == {("202607030000", "202607032300")}
+    assert tracker.ready and not tracker.backfilling and tracker.observed_until == end
+    assert tracker.region_summary("수원시")["heat_wave_days"] == 3
+
+
+def test_backfill_retries_with_capped_backoff(tracker, monkeypatch):
+    monkeypatch.setattr(heatwave, "KMA_STATION_COORDS", {SUWON: heatwave.KMA_STATION_COORDS[SUWON]})
+    monkeypatch.setattr(heatwave, "BACKFILL_RETRY_MAX_SECONDS", 200)
+    delays = []
+    failures = iter([True, True, True, False])
+
+    async def fetch(tm1, tm2, stn, remember=True):
+        if next(failures):
+            raise RuntimeError("기상청 장애")
+        return {"success": True, "columns": _columns(datetime(2026, 1, 1, tzinfo=KST), 3)}
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(heatwave, "fetch_kma_period", fetch)
+    monkeypatch.setattr(heatwave.asyncio, "sleep", sleep)
+    asyncio.run(heatwave.backfill_season(datetime(2026, 1, 1, 2, tzinfo=KST)))
+    assert delays == [60, 120, 200]
+    assert tracker.ready
+
+
+def test_hourly_ingest_is_deferred_until_the_backfill_finishes():
+    tracker = HeatWaveTracker()
+    start = datetime(2026, 7, 1, tzinfo=KST)
+    # 시즌 채우기 중 도착한 다음 날 관측
+    tracker.ingest(_columns(start + timedelta(days=1), 24), start + timedelta(hours=47))
+    assert tracker.region_summary("수원시") is None
+
+    tracker.observe_columns(_columns(start, 24))
+    tracker.finish_backfill(start + timedelta(hours=23))
+    assert tracker.observed_until == start + timedelta(hours=47)
+    assert tracker.region_summary("수원시")["heat_wave_days"] == 2
+
+    tracker.ingest(_columns(start + timedelta(days=2), 24), start + timedelta(hours=71))
+    assert tracker.region_summary("수원시")["heat_wave_days"] == 3
+
+
+def test_snapshot_reports_null_heat_counters_until_the_tracker_is_ready(tracker, monkeypatch):
+    monkeypatch.setattr(snapshot, "heatwave_tracker", tracker)
+    current = asyncio.run(snapshot.SnapshotStore(refresh_seconds=3600).refresh())
+    assert all(entry["data"]["heat_wave_days"] is None for entry in current.regions.values())
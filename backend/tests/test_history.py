@@ -0,0 +1,55 @@
+import math
+
+import pytest
+from fastapi.testclient import TestClient
+
+from history import lttb_indices
+
+
+def test_lttb_keeps_all_points_under_the_threshold():
+    assert lttb_indices([0, 1, 2], [5, 6, 7], 10) == [0, 1, 2]
+    assert lttb_indices(list(range(10)), [0] * 10, 2) == list(range(10))
+
+
+def test_lttb_keeps_endpoints_and_threshold_count():
+    xs = list(range(1000))
+    ys = [math.sin(x / 20) for x in xs]
+    indices = lttb_indices(xs, ys, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert indices == sorted(set(indices))
+
+
+def test_lttb_keeps_a_spike():
+    xs = list(range(500))
+    ys = [0.0] * 500
+    ys[321] = 100.0
+    assert 321 in lttb_indices(xs, ys, 20)
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("query", [
+    "from=2026-10-01T00:00:00Z",
+    "from=2026-10-01T00:00:00Z&to=2026-10-02T00:00:00",
+    "from=2026-10-01T00:00:00&to=2026-10-02T09:00:00%2B09:00",
+    "from=2026-10-01&to=2026-10-02",
+])
+def test_history_accepts_mixed_timezone_bounds(client, query):
+    response = client.get(f"/api/climate/수원시/history?{query}")
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["start"] < body["end"]
+
+
+@pytest.mark.parametrize("query", [
+    "from=yesterday",
+    "to=2026-13-01T00:00:00",
+    "from=2026-10-02T00:00:00Z&to=2026-10-01T00:00:00Z",
+])
+def test_history_rejects_bad_bounds(client, query):
+    assert client.get(f"/api/climate/수원시/history?{query}").status_code == 400
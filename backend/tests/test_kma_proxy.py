@@ -0,0 +1,71 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import kma_proxy
+from kma_proxy import DAILY_MAX_DAYS, KST, daily_range
+
+SAMPLE = """#START7777
+# YYMMDDHHMI STN  WD   WS GST  GST  GST     PA     PS PT    PR    TA    TD    HM    PV     RN     RN     RN     RN     SD     SD     SD WC WP WW                      CA  CA MS  CT    CH VS  SS    SI ST    TS    TE    TE    TE    TE  ST   WH BF IR IX
+202607151400 119  20  3.1  -9 -9.0   -9 1003.2 1009.1 -9 -9.0  33.2  24.1  59.0  30.0   -9.0   -9.0   -9.0   -9.0   -9.0   -9.0   -9.0 -9 -9 -                        6  6  -  -     -9 2000 1.0  2.50 -9  45.1  30.2  29.1  28.0  27.5 -9  -9.0 -9  3 -9
+202607151400 98  18  2.4  -9 -9.0   -9 1002.1 1008.7 -9 -9.0  31.0  23.0  62.0  28.1   -9.0   -9.0   -9.0   -9.0   -9.0   -9.0   -9.0 -9 -9 -                        5  5  -  -     -9 2000 1.0  2.10 -9  41.0  29.0  28.0  27.0  26.0 -9  -9.0 -9  3 -9
+#7777END
+"""
+
+
+def _today() -> str:
+    return datetime.now(KST).strftime("%Y%m%d")
+
+
+def test_daily_range_keeps_a_past_span():
+    assert daily_range("202601010000", "202601312300") == ("20260101", "20260131")
+
+
+def test_daily_range_clamps_the_end_to_today():
+    future = (datetime.now(KST) + timedelta(days=30)).strftime("%Y%m%d0000")
+    start = (datetime.now(KST) - timedelta(days=3)).strftime("%Y%m%d0000")
+    assert daily_range(start, future) == (start[:8], _today())
+
+
+def test_daily_range_rejects_reversed_and_future_only_spans():
+    with pytest.raises(ValueError):
+        daily_range("202602010000", "202601010000")
+    future = (datetime.now(KST) + timedelta(days=3)).strftime("%Y%m%d0000")
+    with pytest.raises(ValueError):
+        daily_range(future, future)
+
+
+def test_daily_range_caps_the_span():
+    start = datetime(2024, 1, 1)
+    assert daily_range(f"{start:%Y%m%d}0000", f"{start + timedelta(days=DAILY_MAX_DAYS - 1):%Y%m%d}0000")
+    with pytest.raises(ValueError):
+        daily_range(f"{start:%Y%m%d}0000", f"{start + timedelta(days=DAILY_MAX_DAYS):%Y%m%d}0000")
+
+
+def test_daily_range_rejects_malformed_dates():
+    with pytest.raises(ValueError):
+        daily_range("2026-01-01", "202601020000")
+
+
+def test_serverless_daily_range_matches_backend(api_index):
+    for tm1, tm2 in (("202601010000", "202601312300"), ("202501010000", "202512312300")):
+        assert api_index.daily_range(tm1, tm2) == daily_range(tm1, tm2)
+    with pytest.raises(ValueError):
+        api_index.daily_range("202401010000", "202601010000")
+
+
+def test_parse_kma_response_returns_json_rows():
+    rows = kma_proxy.parse_kma_response(SAMPLE)
+    assert [row["STN"] for row in rows] == [119.0, 98.0]
+    assert rows[0]["TA"] == 33.2
+    assert json.loads(json.dumps(rows)) == rows
+
+
+def test_kma_json_matches_row_dicts():
+    columns = kma_proxy.add_apparent_temperature(kma_proxy.parse_kma_columns(SAMPLE))
+    result = {"success": True, "count": 2, "columns": columns}
+    body = json.loads(kma_proxy.kma_json(result))
+    assert body["success"] is True and body["count"] == 2
+    assert body["data"] == kma_proxy.kma_rows(columns)
+    assert json.loads(kma_proxy.kma_json({"success": True, "columns": {}}))["data"] == []
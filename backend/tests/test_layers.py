@@ -0,0 +1,45 @@
+import pytest
+
+from layers import accepts_gzip, etag_matches
+
+ETAG = '"0123456789abcdef01234567"'
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("gzip, deflate, br", True),
+    ("GZIP", True),
+    ("x-gzip", True),
+    ("br;q=1.0, gzip;q=0.8", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, deflate", False),
+    ("gzip;q=abc", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("deflate, br", False),
+    ("notgzip", False),
+    ("", False),
+    (None, False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+@pytest.mark.parametrize("header,expected", [
+    (ETAG, True),
+    (f'"other", {ETAG}', True),
+    (f"W/{ETAG}", True),
+    ("*", True),
+    ('"0123456789abcdef"', False),
+    (f'"x{ETAG[1:]}', False),
+    (f"{ETAG[:-1]}0\"", False),
+    ("", False),
+    (None, False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, ETAG) is expected
+
+
+def test_etag_substring_no_longer_matches():
+    # 이전에는 부분 문자열 검사라 ETag를 포함한 더 긴 태그도 일치로 봄
+    assert not etag_matches(f'"{ETAG}"', ETAG)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import types
+from datetime import datetime
+
+import pytest
+
+import notifications
+
+from notifications import DeliveryQueue, LocalSink, NotificationEngine, NotificationSink, alert_types
+
+HOT = {"apparent_temperature": 36, "pm10": 30, "pm25": 10, "uv_index": 2}
+
+
+def _snapshot(score, data, version=1):
+    return types.SimpleNamespace(
+        version=version,
+        created_at=datetime(2026, 7, 15, 12),
+        regions={"수원시": {"data": data, "score": score}},
+    )
+
+
+def _engine(rows):
+    async def loader():
+        return rows
+    queue = DeliveryQueue(LocalSink(), rate_per_second=100, max_attempts=1, retry_seconds=1, dedup_seconds=60)
+    return NotificationEngine(queue, reload_seconds=3600, loader=loader)
+
+
+def _subscription(id, notify_types):
+    return {"id": id, "user_id": f"user-{id}", "regions": ["수원시"], "threshold": 50,
+            "target": "general", "notify_types": notify_types}
+
+
+def test_alert_types():
+    assert alert_types(HOT) == ["highTemp"]
+    assert alert_types({"apparent_temperature": -12}) == ["lowTemp"]
+    assert alert_types({"temperature": 20, "pm25": 40, "uv_index": 9}) == ["dust", "uv"]
+    assert alert_types({"temperature": 20, "heat_wave_streak": 2}) == ["highTemp"]
+    assert alert_types({"temperature": 20, "humidity": 90}) == []
+
+
+def test_evaluate_skips_subscriptions_with_the_alert_types_turned_off():
+    engine = _engine([
+        _subscription(1, {"highTemp": True, "dust": False}),
+        _subscription(2, {"highTemp": False, "dust": True}),
+        _subscription(3, {}),
+    ])
+
+    queued = asyncio.run(engine.evaluate(_snapshot(60, HOT, 2), _snapshot(40, HOT)))
+    assert queued == 2 and engine.last_filtered == 1
+    assert sorted(d.payload["subscription_id"] for d in engine.queue._pending) == [1, 3]
+    assert engine.queue._pending[0].payload["types"] == ["highTemp"]
+
+
+def test_untyped_alert_skips_only_subscriptions_with_every_type_off():
+    engine = _engine([
+        _subscription(1, {"highTemp": False}),
+        _subscription(2, {t: False for t in ("highTemp", "lowTemp", "dust", "uv")}),
+    ])
+    humid = {"temperature": 20, "humidity": 90}
+
+    assert asyncio.run(engine.evaluate(_snapshot(60, humid, 2), _snapshot(40, humid))) == 1
+    assert engine.queue._pending[0].payload["subscription_id"] == 1
+
+
+def test_sink_must_implement_send():
+    class Silent(NotificationSink):
+        pass
+
+    with pytest.raises(TypeError):
+        Silent()
+
+
+def test_local_sink_appends_jsonl(tmp_path):
+    path = tmp_path / "sent.jsonl"
+    sink = LocalSink(str(path))
+
+    async def main():
+        await sink.send({"region": "수원시", "score": 60})
+        await sink.send({"region": "고양시", "score": 55})
+    asyncio.run(main())
+
+    assert [json.loads(line)["region"] for line in path.read_text(encoding="utf-8").splitlines()] == ["수원시", "고양시"]
+    assert len(sink.sent) == 2
+
+
+def test_create_sink_falls_back_to_local_when_misconfigured(monkeypatch, caplog):
+    monkeypatch.setattr(notifications.settings, "NOTIFY_WEBHOOK_URL", "")
+    assert isinstance(notifications.create_sink("webhook"), LocalSink)
+    assert isinstance(notifications.create_sink("pager"), LocalSink)
+    assert len([r for r in caplog.records if r.levelname == "ERROR"]) == 2
+
+    monkeypatch.setattr(notifications.settings, "NOTIFY_WEBHOOK_URL", "http://127.0.0.1:9/notify")
+    sink = notifications.create_sink("webhook")
+    assert isinstance(sink, notifications.WebhookSink)
+    asyncio.run(sink.close())
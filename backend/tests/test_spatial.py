@@ -0,0 +1,36 @@
+import math
+import random
+
+from spatial import GridIndex, project
+
+
+def _brute_nearest(index, lat, lng):
+    x, y = project(lat, lng)
+    return min(range(len(index)), key=lambda i: (index.x[i] - x) ** 2 + (index.y[i] - y) ** 2)
+
+
+def test_grid_nearest_matches_brute_force():
+    rng = random.Random(7)
+    lats = [rng.uniform(36.9, 38.3) for _ in range(300)]
+    lngs = [rng.uniform(126.4, 127.9) for _ in range(300)]
+    index = GridIndex(lats, lngs, cell_km=2.0)
+    for _ in range(2000):
+        lat, lng = rng.uniform(36.8, 38.4), rng.uniform(126.3, 128.0)
+        found = index.nearest(lat, lng)
+        assert found is not None
+        best = _brute_nearest(index, lat, lng)
+        x, y = project(lat, lng)
+        # 같은 거리의 다른 점이 골라져도 거리는 같아야 함
+        assert math.isclose(found[1], math.hypot(index.x[best] - x, index.y[best] - y), abs_tol=1e-9)
+
+
+def test_grid_nearest_returns_none_beyond_max_distance():
+    index = GridIndex([37.5], [127.0], max_km=50.0)
+    assert index.nearest(37.5, 127.0)[0] == 0
+    assert index.nearest(37.5 + 40 / 111.195, 127.0) is not None
+    assert index.nearest(37.5 + 60 / 111.195, 127.0) is None
+    assert index.nearest(33.0, 126.5) is None
+
+
+def test_empty_grid():
+    assert GridIndex([], []).nearest(37.5, 127.0) is None
@@ -0,0 +1,64 @@
+import asyncio
+
+from stream import StreamHub
+
+ALERT = {"version": 1, "issued": [{"region": "수원시"}], "updated": [], "cleared": []}
+
+
+async def _frames(gen, n):
+    return [await asyncio.wait_for(gen.__anext__(), 1) for _ in range(n)]
+
+
+def _kind(frame: bytes) -> str:
+    return next(line for line in frame.decode().splitlines() if line.startswith("event: "))[7:]
+
+
+def _hub(buffer=8):
+    hub = StreamHub(replay_events=4, buffer_events=buffer, heartbeat_seconds=0.2, max_connections=10)
+    for _ in range(3):
+        hub.publish("alerts", ALERT)
+    return hub
+
+
+def test_replay_after_last_event_id():
+    async def main():
+        hub = _hub()
+        frames = await _frames(hub.stream(None, None, f"{hub.epoch}-1"), 3)
+        assert _kind(frames[0]) == "hello"
+        assert [f.split(b"\n")[0] for f in frames[1:]] == [f"id: {hub.epoch}-2".encode(), f"id: {hub.epoch}-3".encode()]
+    asyncio.run(main())
+
+
+def test_resync_for_ids_from_another_process():
+    async def main():
+        hub = _hub()
+        for since in ("0000dead-2", "2", "garbage"):
+            frames = await _frames(hub.stream(None, None, since), 2)
+            assert _kind(frames[1]) == "resync"
+            assert b'"reason": "restarted"' in frames[1]
+    asyncio.run(main())
+
+
+def test_resync_when_replay_history_was_trimmed():
+    async def main():
+        hub = _hub()
+        for _ in range(5):
+            hub.publish("alerts", ALERT)
+        frames = await _frames(hub.stream(None, None, f"{hub.epoch}-1"), 2)
+        assert b'"reason": "too_old"' in frames[1]
+    asyncio.run(main())
+
+
+def test_overflow_with_a_one_event_buffer():
+    async def main():
+        hub = _hub(buffer=1)
+        gen = hub.stream(None, None, None)
+        await _frames(gen, 1)
+        for _ in range(5):
+            hub.publish("alerts", ALERT)
+        resync, latest = await _frames(gen, 2)
+        assert b'"reason": "buffer_overflow"' in resync
+        assert latest.startswith(f"id: {hub.epoch}-8".encode())
+        await gen.aclose()
+        assert len(hub) == 0
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+import asyncio
+import base64
+import json
+import types
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import supabase_client
+from supabase_client import decode_report_cursor, encode_report_cursor
+
+
+def _cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_report_cursor_round_trip():
+    row = {"created_at": "2026-07-15T14:05:00.123456+09:00", "id": 42}
+    assert decode_report_cursor(encode_report_cursor(row)) == (row["created_at"], 42)
+
+
+@pytest.mark.parametrize("value", [
+    ["2026-07-15T14:05:00+09:00\",id.gt.0)", 1],    # 필터 주입
+    ["2026-07-15T14:05:00+09:00", "1,id.gt.0"],
+    ["2026-07-15T14:05:00+09:00", 1.5],
+    ["2026-07-15T14:05:00+09:00", True],
+    [20260715, 1],
+    ["2026-07-15T14:05:00+09:00"],
+    {"created_at": "2026-07-15T14:05:00+09:00", "id": 1},
+])
+def test_report_cursor_rejects_unsafe_values(value):
+    with pytest.raises(ValueError):
+        decode_report_cursor(_cursor(value))
+
+
+def test_report_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_report_cursor("not a cursor!")
+
+
+class FakeQuery:
+    """PostgREST 쿼리 빌더 흉내 (keyset/범위 조건을 메모리 행에 적용)"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.limit_n = None
+        self.range_ = None
+
+    def __getattr__(self, name):
+        # select/order/not_/is_ 등 결과에 영향이 없는 호출은 그대로 이어 받음
+        return lambda *args, **kwargs: self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def or_(self, expression):
+        self.filters.append(("or", expression))
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def range(self, start, end):
+        self.range_ = (start, end)
+        return self
+
+
+def _keyset_after(row, expression, time_column, id_column):
+    """'t.gt."v",and(t.eq."v",id.gt.N)' 조건 평가 (두 번째 키는 정수 또는 "문자열")"""
+    value = expression.split('"')[1]
+    last = expression.split(f"{id_column}.gt.", 1)[1][:-1]
+    last = last.strip('"') if last.startswith('"') else int(last)
+    return row[time_column] > value or (row[time_column] == value and row[id_column] > last)
+
+
+def test_score_history_load_since_pages_past_the_row_cap(monkeypatch):
+    rows = [
+        {"id": i, "region": "수원시", "recorded_at": f"2026-07-{1 + i // 1000:02d}T00:00:00+09:00", "score": i % 100}
+        for i in range(2500)
+    ]
+
+    def execute(query, table, operation):
+        matched = [row for row in rows if all(
+            _keyset_after(row, f[1], "recorded_at", "id") if isinstance(f, tuple) else f(row)
+            for f in query.filters
+        )]
+        return types.SimpleNamespace(data=matched[:query.limit_n])
+
+    monkeypatch.setattr(supabase_client, "get_supabase", lambda: types.SimpleNamespace(table=lambda name: FakeQuery(rows)))
+    monkeypatch.setattr(supabase_client, "_execute", execute)
+    monkeypatch.setattr(supabase_client, "HISTORY_PAGE_SIZE", 700)
+
+    loaded = asyncio.run(supabase_client.ScoreHistoryService.load_since(datetime(2026, 1, 1)))
+    assert [row["id"] for row in loaded] == list(range(2500))
+
+
+def test_report_region_counts_pages_past_the_row_cap(monkeypatch):
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    regions = [f"지역{i:02d}" for i in range(31)]
+    rows = [
+        {"region": region, "bucket": (now - timedelta(hours=h)).isoformat(), "report_count": 1}
+        for h in range(168)
+        for region in regions
+    ]
+    rows.sort(key=lambda row: (row["bucket"], row["region"]))
+
+    def execute(query, table, operation):
+        matched = [row for row in rows if all(
+            _keyset_after(row, f[1], "bucket", "region") if isinstance(f, tuple) else f(row)
+            for f in query.filters
+        )]
+        return types.SimpleNamespace(data=matched[:query.limit_n])
+
+    monkeypatch.setattr(supabase_client, "get_supabase", lambda: types.SimpleNamespace(table=lambda name: FakeQuery(rows)))
+    monkeypatch.setattr(supabase_client, "_execute", execute)
+
+    stats = asyncio.run(supabase_client.ReportStatsService.get_region_counts(regions, hours=168))
+    assert len(rows) > supabase_client.STATS_PAGE_SIZE
+    assert all(stats["regions"][region]["counts"] == [1] * 168 for region in regions)
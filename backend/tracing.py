@@ -0,0 +1,181 @@
+"""
+요청 단계별 시간 측정 모듈
+요청마다 Trace를 contextvar에 두고 span()으로 단계(fetch → parse → score → explain → serialize)를 기록
+- 응답의 Server-Timing 헤더로 단계별 소요 시간 노출
+- TRACE_LOG가 켜져 있으면 샘플링된 트레이스를 로그로 내보냄 (exporter 추가 가능)
+- 샘플링되지 않은 요청에서는 span()이 아무 것도 하지 않음
+"""
+import functools
+import inspect
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Server-Timing 헤더에 넣을 최대 단계 수 (헤더 크기 제한)
+MAX_TIMING_ENTRIES = 20
+
+
+class Span:
+    __slots__ = ("name", "start", "duration", "parent")
+
+    def __init__(self, name: str, start: float, parent: Optional[str]):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.parent = parent
+
+
+class Trace:
+    """한 요청의 단계 기록"""
+
+    __slots__ = ("trace_id", "route", "start", "spans", "_stack", "_pending")
+
+    def __init__(self, route: str = ""):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.route = route
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self._stack: List[str] = []
+        self._pending: Optional[Span] = None
+
+    def begin(self, name: str) -> Span:
+        span = Span(name, time.perf_counter(), self._stack[-1] if self._stack else None)
+        self.spans.append(span)
+        self._stack.append(name)
+        return span
+
+    def end(self, span: Span) -> None:
+        span.duration = time.perf_counter() - span.start
+        if self._stack and self._stack[-1] == span.name:
+            self._stack.pop()
+
+    def open_pending(self, name: str) -> None:
+        """핸들러 밖에서 끝나는 단계 시작 (예: 응답 직렬화)"""
+        self._pending = self.begin(name)
+        self._stack.pop()
+
+    def close_pending(self) -> None:
+        if self._pending is not None:
+            self._pending.duration = time.perf_counter() - self._pending.start
+            self._pending = None
+
+    def totals(self) -> Dict[str, float]:
+        """같은 이름의 단계는 합산 (최상위 순서 유지)"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+    def server_timing(self) -> str:
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.totals().items()]
+        entries = entries[:MAX_TIMING_ENTRIES]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "route": self.route,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 2),
+            "spans": [
+                {
+                    "name": span.name,
+                    "parent": span.parent,
+                    "offset_ms": round((span.start - self.start) * 1000, 2),
+                    "duration_ms": round(span.duration * 1000, 2),
+                }
+                for span in self.spans
+            ],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+TraceExporter = Callable[[Trace], None]
+_exporters: List[TraceExporter] = []
+
+
+def add_exporter(exporter: TraceExporter) -> None:
+    """완료된 트레이스를 받을 exporter 등록"""
+    _exporters.append(exporter)
+
+
+def log_exporter(trace: Trace) -> None:
+    logger.info("trace %s", json.dumps(trace.to_dict(), ensure_ascii=False))
+
+
+if settings.TRACE_LOG:
+    add_exporter(log_exporter)
+
+
+def start_trace(route: str = "") -> Optional[Trace]:
+    """샘플링 비율에 따라 트레이스 시작 (미샘플링이면 None)"""
+    rate = settings.TRACE_SAMPLE_RATE
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return None
+    trace = Trace(route)
+    _current_trace.set(trace)
+    return trace
+
+
+def finish_trace(trace: Trace) -> None:
+    trace.close_pending()
+    _current_trace.set(None)
+    for exporter in _exporters:
+        try:
+            exporter(trace)
+        except Exception as e:
+            logger.warning(f"트레이스 내보내기 실패: {e}")
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str):
+    """현재 요청의 단계 기록 (트레이스가 없으면 no-op)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    s = trace.begin(name)
+    try:
+        yield
+    finally:
+        trace.end(s)
+
+
+def _traced_endpoint(endpoint):
+    """엔드포인트 실행을 handler 단계로 감싸고, 반환 후 직렬화 단계를 시작"""
+    if not inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        with span("handler"):
+            result = await endpoint(*args, **kwargs)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.open_pending("serialize")
+        return result
+
+    return wrapper
+
+
+class TracedRoute(APIRoute):
+    """handler/serialize 단계를 자동 기록하는 라우트 (app.router.route_class로 지정)"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _traced_endpoint(endpoint), **kwargs)
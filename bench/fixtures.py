@@ -0,0 +1,225 @@
+"""
+KMA / 기후 API 응답 픽스처
+실제 응답과 같은 형식(주석 헤더, START7777/7777END 마커, 결측값, EUC-KR 예보)을
+시드 고정 난수로 생성해 실행마다 같은 바이트가 나오도록 함
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+# 전국 ASOS 관측소 번호
+ASOS_STATIONS = [
+    90, 93, 95, 98, 99, 100, 101, 102, 104, 105, 106, 108, 112, 114, 115, 119,
+    121, 127, 129, 130, 131, 133, 135, 136, 137, 138, 140, 143, 146, 152, 155,
+    156, 159, 162, 165, 168, 169, 170, 172, 174, 177, 184, 185, 188, 189, 192,
+    201, 202, 203, 211, 212, 216, 217, 221, 226, 232, 235, 236, 238, 239, 243,
+    244, 245, 247, 248, 251, 252, 253, 254, 255, 257, 258, 259, 260, 261, 262,
+    263, 264, 266, 268, 271, 272, 273, 276, 277, 278, 279, 281, 283, 284, 285,
+    288, 289, 294, 295,
+]
+
+SFCTM_HEADER = """#START7777
+#--------------------------------------------------------------------------------------------------
+#  KMA surface hourly observations [tm={tm}&stn={stn}]
+#--------------------------------------------------------------------------------------------------
+# YYMMDDHHMI STN  WD   WS GST  GST  GST     PA     PS PT    PR    TA    TD    HM    PV     RN     RN     RN     RN     SD     SD     SD WC WP WW                   CA  CA   CH CT         CT  CT  CT    VS   SS    SI ST    TS    TE    TE    TE    TE  ST   WH BF IR IX
+#        KST  ID  16  m/s  WD   WS   TM    hPa    hPa  -   hPa     C     C     %   hPa     mm    DAY    JUN    INT    HR3    DAY    TOT -- -- --                 TOT MID  MIN -- TOP  MID LOW    10m   hr MJ/m2 GD     C   5cm  10cm  20cm  30cm SEA    m -- -- --
+"""
+SFCTM_FOOTER = "#7777END\n"
+
+FORECAST_HEADER = """#START7777
+# 동네예보 육상예보 (단기) [reg={reg}]
+# REG_ID TM_FC        TM_EF        MOD NE STN C MAN_ID MAN_FC       W1 T W2 TA ST SKY  PREP WF
+"""
+FORECAST_FOOTER = "#7777END\n"
+
+WARNING_HEADER = """#START7777
+#--------------------------------------------------------------------------------------------------
+#  기상특보 현황 [tm={tm}]
+#--------------------------------------------------------------------------------------------------
+# REG_UP, REG_UP_KO, REG_ID, REG_KO, TM_FC, TM_EF, WRN, LVL, CMD, ED_TM
+"""
+WARNING_FOOTER = "#7777END\n"
+# 특보구역: (상위 구역 코드, 상위 구역 이름, 구역 이름 목록) - 경기도는 시군 단위, 이웃 지역은 필터링 확인용
+WARNING_ZONES = [
+    ("L1000000", "서울ㆍ인천ㆍ경기도", [
+        "서울동남권", "인천", "수원", "성남", "의정부", "안양", "부천", "광명", "평택", "동두천", "안산", "고양",
+        "과천", "구리", "남양주", "오산", "시흥", "군포", "의왕", "하남", "용인", "파주", "이천", "안성",
+        "김포", "화성", "광주", "양주", "포천", "여주", "연천", "가평", "양평",
+    ]),
+    ("L1050000", "광주ㆍ전라남도", ["광주", "나주"]),
+    ("L1020000", "강원도", ["춘천", "원주"]),
+]
+
+SKY_TEXT = {"DB01": "맑음", "DB02": "구름조금", "DB03": "구름많음", "DB04": "흐림", "DB05": "비"}
+WIND_DIRS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+
+
+def _rng(*key) -> random.Random:
+    """요청 파라미터별로 독립된 시드 난수 (같은 요청 → 같은 응답)"""
+    return random.Random("|".join(str(k) for k in key))
+
+
+def _station_row(rng: random.Random, tm: datetime, stn: int) -> str:
+    hour = tm.hour
+    # 일교차: 15시 최고, 05시 최저
+    diurnal = math.cos((hour - 15) / 24 * 2 * math.pi)
+    seasonal = 12 - 14 * math.cos((tm.timetuple().tm_yday - 15) / 365 * 2 * math.pi)
+    ta = seasonal + 5 * diurnal + rng.uniform(-1.5, 1.5) - (stn % 7) * 0.3
+    hm = max(15.0, min(100.0, 70 - 20 * diurnal + rng.uniform(-8, 8)))
+    td = ta - (100 - hm) / 5
+    ws = abs(rng.gauss(2.5, 1.4))
+    rn = rng.choice([-9.0] * 9 + [round(rng.uniform(0.1, 8.0), 1)])
+    pa = 1005 + rng.uniform(-8, 8)
+
+    values = [
+        tm.strftime("%Y%m%d%H%M"), str(stn), str(rng.randrange(0, 37)), f"{ws:.1f}",
+        "-9", "-9.0", "-9", f"{pa:.1f}", f"{pa + 1.6:.1f}", "-9", "-9.0",
+        f"{ta:.1f}", f"{td:.1f}", f"{hm:.1f}", f"{max(0.1, td + 12):.1f}",
+        f"{rn:.1f}", "-9.0", "-9.0", "-9.0", "-9.0", "-9.0", "-9.0",
+        "-9", "-9", "-", str(rng.randrange(0, 11)), str(rng.randrange(0, 6)),
+        str(rng.randrange(5, 30)), rng.choice(["Sc", "Cu", "As", "-"]),
+        "-9", "-9", "-9", str(rng.randrange(500, 5000, 100)),
+        f"{rng.uniform(0, 1):.1f}", f"{rng.uniform(0, 3):.2f}", "-9",
+        f"{ta + rng.uniform(0, 6):.1f}", "-9.0", "-9.0", "-9.0", "-9.0",
+        "-9", "-9.0", "-9", str(rng.choice([1, 3])), "-9",
+    ]
+    return " ".join(values)
+
+
+def kma_sfctm2(tm: str, stn: str = "0") -> bytes:
+    """단일 시각 관측 (kma_sfctm2.php)"""
+    when = datetime.strptime(tm[:12].ljust(12, "0"), "%Y%m%d%H%M")
+    stations = ASOS_STATIONS if stn == "0" else [int(stn)]
+    lines = [SFCTM_HEADER.format(tm=tm, stn=stn)]
+    for s in stations:
+        lines.append(_station_row(_rng("sfctm", when, s), when, s) + "\n")
+    lines.append(SFCTM_FOOTER)
+    return "".join(lines).encode("utf-8")
+
+
+def kma_sfctm3(tm1: str, tm2: str, stn: str = "0") -> bytes:
+    """기간 관측 (kma_sfctm3.php), 시각 → 관측소 순"""
+    start = datetime.strptime(tm1[:12].ljust(12, "0"), "%Y%m%d%H%M")
+    end = datetime.strptime(tm2[:12].ljust(12, "0"), "%Y%m%d%H%M")
+    stations = ASOS_STATIONS if stn == "0" else [int(stn)]
+    lines = [SFCTM_HEADER.format(tm=f"{tm1}~{tm2}", stn=stn)]
+    when = start
+    while when <= end:
+        for s in stations:
+            lines.append(_station_row(_rng("sfctm", when, s), when, s) + "\n")
+        when += timedelta(hours=1)
+    lines.append(SFCTM_FOOTER)
+    return "".join(lines).encode("utf-8")
+
+
+def fct_afs_dl(reg: str, tmfc: str = "0", base: str = "202607150500") -> bytes:
+    """단기예보 (fct_afs_dl.php), 실제 응답처럼 EUC-KR 인코딩"""
+    rng = _rng("fct", reg, tmfc, base)
+    issued = datetime.strptime(base, "%Y%m%d%H%M")
+    lines = [FORECAST_HEADER.format(reg=reg)]
+    for step in range(0, 72, 3):
+        ef = issued + timedelta(hours=step + 7)
+        diurnal = math.cos((ef.hour - 15) / 24 * 2 * math.pi)
+        ta = round(27 + 5 * diurnal + rng.uniform(-1, 1))
+        sky = rng.choice(list(SKY_TEXT))
+        pop = rng.choice([0, 10, 20, 30, 60, 80]) if sky != "DB01" else 0
+        lines.append(
+            f"{reg} {issued:%Y%m%d%H%M} {ef:%Y%m%d%H%M} A02 {step // 3} 119 1 fct01 "
+            f"{issued:%Y%m%d%H%M} {rng.choice(WIND_DIRS)} - {rng.choice(WIND_DIRS)} "
+            f"{ta} -99 {sky} {pop} \"{SKY_TEXT[sky]}\"\n"
+        )
+    lines.append(FORECAST_FOOTER)
+    return "".join(lines).encode("euc-kr")
+
+
+def _zone_warning(zone: str, when: datetime):
+    """구역 하나의 그날 특보 전개: 오전 발표, 일부는 3시간 뒤 경보로 대치, 저녁 해제"""
+    rng = _rng("wrn", zone, when.strftime("%Y%m%d"))
+    if rng.random() >= 0.35:
+        return None
+    kind = "폭염" if 5 <= when.month <= 9 else "한파" if when.month in (12, 1, 2) else rng.choice(["건조", "강풍"])
+    start, end = rng.randrange(6, 14), rng.randrange(18, 24)
+    escalate = rng.random() < 0.4
+    if not start <= when.hour < end:
+        return None
+    day = when.replace(hour=0, minute=0)
+    if escalate and when.hour >= start + 3:
+        issued = day + timedelta(hours=start + 3)
+        return kind, "경보", "대치", issued
+    return kind, "주의보", "발표", day + timedelta(hours=start)
+
+
+def wrn_now_data(tm: str) -> bytes:
+    """현재 발효 중인 특보 (wrn_now_data.php), 시각마다 결정적으로 발표/대치/해제가 바뀜"""
+    when = datetime.strptime(tm[:12].ljust(12, "0"), "%Y%m%d%H%M") if tm and tm != "0" else datetime(2026, 7, 15, 14)
+    lines = [WARNING_HEADER.format(tm=tm)]
+    for up_id, up_name, zones in WARNING_ZONES:
+        for i, zone in enumerate(zones):
+            warning = _zone_warning(f"{up_id}{zone}", when)
+            if warning is None:
+                continue
+            kind, level, command, issued = warning
+            lines.append(
+                f"{up_id}, {up_name}, {up_id[:4]}{i + 1:02d}00, {zone}, {issued:%Y%m%d%H%M}, {issued:%Y%m%d%H%M}, "
+                f"{kind}, {level}, {command}, 없음,=\n"
+            )
+    lines.append(WARNING_FOOTER)
+    return "".join(lines).encode("euc-kr")
+
+
+def climate_api(region_code: str, data_type: str = "temperature") -> bytes:
+    """경기도 기후변화 API (JSON)"""
+    rng = _rng("climate", region_code, data_type)
+    payload = {
+        "regionCode": region_code,
+        "dataType": data_type,
+        "data": [{"year": 2000 + i, "value": round(rng.uniform(10, 16), 2)} for i in range(25)],
+    }
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def subregions_csv(per_region: int = 18, radius_km: float = 8.0) -> str:
+    """
+    합성 읍·면·동 등록부 CSV (31개 시군 × per_region, 기본 558개)
+    실제 행정동이 아니라 시군 중심 반경 안에 무작위로 흩뿌린 단위 (이름에 '합성' 표시)
+    """
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+    from climate_api import GYEONGGI_REGIONS
+
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(["code", "name", "parent", "lat", "lng"])
+    for parent, info in GYEONGGI_REGIONS.items():
+        rng = _rng("subregion", parent)
+        for i in range(per_region):
+            distance = radius_km * math.sqrt(rng.random())
+            angle = rng.uniform(0, 2 * math.pi)
+            lat = info["lat"] + distance * math.sin(angle) / 111.195
+            lng = info["lng"] + distance * math.cos(angle) / (111.195 * math.cos(math.radians(info["lat"])))
+            writer.writerow([f"{info['code']}{510 + i * 10:03d}00", f"{parent} 합성{i + 1:02d}동", parent,
+                             f"{lat:.5f}", f"{lng:.5f}"])
+    return out.getvalue()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="픽스처 파일 생성")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub_regions = sub.add_parser("subregions", help="합성 읍·면·동 등록부 CSV 출력")
+    sub_regions.add_argument("--per-region", type=int, default=18)
+    sub_regions.add_argument("-o", "--output", help="저장 경로 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    if args.command == "subregions":
+        text = subregions_csv(args.per_region)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text)
@@ -0,0 +1,298 @@
+"""
+KMA / 경기도 기후 API 로컬 대역 서버
+업스트림 키 없이 재현 가능한 성능 테스트를 위해 응답을 재생하고
+지연 분포, 오류율, 느린(trickle) 본문, 타임아웃을 주입
+
+사용 예:
+    python bench/kma_standin.py --port 9100 --latency lognormal:80:0.6 --error-rate 0.02
+    KMA_BASE_URL=http://127.0.0.1:9100/api/typ01/url uvicorn main:app   # backend/
+    KMA_BASE_URL=http://127.0.0.1:9100/api/typ01/url python bench/loadtest.py ...
+
+응답 선택 순서:
+    1. --recorded 디렉터리의 녹화 파일 (엔드포인트 + 파라미터 기준)
+    2. fixtures.py의 결정적 생성 응답 (같은 요청 → 같은 바이트)
+--record URL을 주면 실제 업스트림으로 전달하고 응답을 --recorded 디렉터리에 저장
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from urllib.request import urlopen
+
+import fixtures
+
+KMA_PATH_PREFIX = "/api/typ01/url"
+CLIMATE_PATH = "/climate"
+
+# 엔드포인트 → (콘텐츠 타입, 응답 생성 함수)
+GENERATORS = {
+    "kma_sfctm2": ("text/plain; charset=utf-8",
+                   lambda q: fixtures.kma_sfctm2(q.get("tm", "202607151400"), q.get("stn", "0"))),
+    "kma_sfctm3": ("text/plain; charset=utf-8",
+                   lambda q: fixtures.kma_sfctm3(q.get("tm1", "202607150000"), q.get("tm2", "202607152300"),
+                                                 q.get("stn", "0"))),
+    "fct_afs_dl": ("text/plain; charset=euc-kr",
+                   lambda q: fixtures.fct_afs_dl(q.get("reg", "11B20601"), q.get("tmfc", "0"))),
+    "wrn_now_data": ("text/plain; charset=euc-kr",
+                     lambda q: fixtures.wrn_now_data(q.get("tm", "0"))),
+    "climate": ("application/json; charset=utf-8",
+                lambda q: fixtures.climate_api(q.get("regionCode", "41110"), q.get("dataType", "temperature"))),
+}
+
+
+class LatencyModel:
+    """
+    지연 분포 (밀리초)
+    fixed:MS | uniform:LO:HI | normal:MEAN:SD | lognormal:MEDIAN:SIGMA
+    """
+
+    def __init__(self, spec: str):
+        kind, *args = spec.split(":")
+        self.kind = kind
+        self.args = [float(a) for a in args]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"알 수 없는 지연 분포: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        a = self.args
+        if self.kind == "fixed":
+            ms = a[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(a[0], a[1])
+        elif self.kind == "normal":
+            ms = rng.gauss(a[0], a[1])
+        else:
+            ms = a[0] * rng.lognormvariate(0, a[1])
+        return max(0.0, ms) / 1000
+
+
+class FaultProfile:
+    """엔드포인트 하나의 장애 주입 설정"""
+
+    def __init__(self, latency="fixed:0", error_rate=0.0, error_status=503,
+                 timeout_rate=0.0, hang_seconds=60.0, trickle_rate=0.0,
+                 trickle_chunk=256, trickle_delay_ms=50.0):
+        self.latency = LatencyModel(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.trickle_rate = trickle_rate
+        self.trickle_chunk = trickle_chunk
+        self.trickle_delay = trickle_delay_ms / 1000
+
+    @classmethod
+    def from_dict(cls, base: "FaultProfile", overrides: dict) -> "FaultProfile":
+        merged = {
+            "latency": overrides.get("latency"),
+            "error_rate": overrides.get("error_rate", base.error_rate),
+            "error_status": overrides.get("error_status", base.error_status),
+            "timeout_rate": overrides.get("timeout_rate", base.timeout_rate),
+            "hang_seconds": overrides.get("hang_seconds", base.hang_seconds),
+            "trickle_rate": overrides.get("trickle_rate", base.trickle_rate),
+            "trickle_chunk": overrides.get("trickle_chunk", base.trickle_chunk),
+            "trickle_delay_ms": overrides.get("trickle_delay_ms", base.trickle_delay * 1000),
+        }
+        profile = cls(**{k: v for k, v in merged.items() if k != "latency"})
+        profile.latency = LatencyModel(overrides["latency"]) if overrides.get("latency") else base.latency
+        return profile
+
+
+class StandinState:
+    """서버 전역 설정 및 통계 (핸들러 스레드 간 공유)"""
+
+    def __init__(self, default: FaultProfile, endpoints: dict, recorded_dir: str,
+                 record_upstream: str, seed: int):
+        self.default = default
+        self.endpoints = endpoints
+        self.recorded_dir = recorded_dir
+        self.record_upstream = record_upstream
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def rng(self) -> random.Random:
+        # 요청 순서대로 시드를 뽑아 스레드별 난수 생성 (동일 순서 → 동일 장애 패턴)
+        with self._lock:
+            return random.Random(self._rng.getrandbits(64))
+
+    def profile(self, endpoint: str) -> FaultProfile:
+        return self.endpoints.get(endpoint, self.default)
+
+    def count(self, endpoint: str, outcome: str) -> None:
+        with self._lock:
+            bucket = self.stats.setdefault(endpoint, {})
+            bucket[outcome] = bucket.get(outcome, 0) + 1
+
+
+def _recorded_key(endpoint: str, query: dict) -> str:
+    params = {k: v for k, v in sorted(query.items()) if k not in ("authKey", "apiKey")}
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{endpoint}-{digest}.bin"
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "KMAStandin/1.0"
+    state: StandinState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _endpoint(self, path: str):
+        if path.startswith(KMA_PATH_PREFIX):
+            name = path[len(KMA_PATH_PREFIX):].strip("/").removesuffix(".php")
+            return name if name in GENERATORS else None
+        if path.rstrip("/") == CLIMATE_PATH:
+            return "climate"
+        return None
+
+    def _body(self, endpoint: str, query: dict, raw_query: str) -> bytes:
+        state = self.state
+        name = _recorded_key(endpoint, query)
+        path = os.path.join(state.recorded_dir, name) if state.recorded_dir else None
+
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+
+        if state.record_upstream:
+            suffix = CLIMATE_PATH if endpoint == "climate" else f"{KMA_PATH_PREFIX}/{endpoint}.php"
+            with urlopen(f"{state.record_upstream.rstrip('/')}{suffix}?{raw_query}", timeout=60) as response:
+                body = response.read()
+            if path:
+                os.makedirs(state.recorded_dir, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(body)
+            return body
+
+        return GENERATORS[endpoint][1](query)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == "/__stats":
+            self._send(200, "application/json", json.dumps(self.state.stats).encode())
+            return
+
+        endpoint = self._endpoint(parsed.path)
+        if endpoint is None:
+            self._send(404, "text/plain", b"not found")
+            return
+
+        state = self.state
+        profile = state.profile(endpoint)
+        rng = state.rng()
+        time.sleep(profile.latency.sample(rng))
+
+        if rng.random() < profile.timeout_rate:
+            # 응답 없이 붙잡고 있다가 연결 종료 (클라이언트 read timeout 유도)
+            state.count(endpoint, "timeout")
+            time.sleep(profile.hang_seconds)
+            self.close_connection = True
+            return
+
+        if rng.random() < profile.error_rate:
+            state.count(endpoint, f"error_{profile.error_status}")
+            self._send(profile.error_status, "text/plain", b"upstream error (injected)")
+            return
+
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        body = self._body(endpoint, query, parsed.query)
+        content_type = GENERATORS[endpoint][0]
+
+        if rng.random() < profile.trickle_rate:
+            state.count(endpoint, "trickle")
+            self._send(200, content_type, body, chunk=profile.trickle_chunk, delay=profile.trickle_delay)
+        else:
+            state.count(endpoint, "ok")
+            self._send(200, content_type, body)
+
+    def _send(self, status: int, content_type: str, body: bytes, chunk: int = 0, delay: float = 0.0):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not chunk:
+                self.wfile.write(body)
+                return
+            for i in range(0, len(body), chunk):
+                self.wfile.write(body[i:i + chunk])
+                self.wfile.flush()
+                time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError, socket.timeout):
+            pass
+
+
+def build_state(args) -> StandinState:
+    default = FaultProfile(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        trickle_rate=args.trickle_rate,
+        trickle_chunk=args.trickle_chunk,
+        trickle_delay_ms=args.trickle_delay_ms,
+    )
+    endpoints = {}
+    if args.profile:
+        with open(args.profile, encoding="utf-8") as f:
+            config = json.load(f)
+        if config.get("default"):
+            default = FaultProfile.from_dict(default, config["default"])
+        for name, overrides in config.get("endpoints", {}).items():
+            endpoints[name] = FaultProfile.from_dict(default, overrides)
+    return StandinState(default, endpoints, args.recorded, args.record, args.seed)
+
+
+def serve(state: StandinState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """백그라운드 스레드로 서버 시작 (벤치마크/부하 테스트에서 사용)"""
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="KMA/기후 API 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=1227)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:MS | uniform:LO:HI | normal:MEAN:SD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="응답 없이 hang-seconds 동안 대기하는 비율")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--trickle-rate", type=float, default=0.0, help="본문을 조금씩 느리게 보내는 비율")
+    parser.add_argument("--trickle-chunk", type=int, default=256)
+    parser.add_argument("--trickle-delay-ms", type=float, default=50.0)
+    parser.add_argument("--profile", help="엔드포인트별 장애 설정 JSON ({\"default\": {...}, \"endpoints\": {\"kma_sfctm3\": {...}}})")
+    parser.add_argument("--recorded", default=os.path.join(os.path.dirname(__file__), "recorded"),
+                        help="녹화 응답 디렉터리")
+    parser.add_argument("--record", help="실제 업스트림 기준 URL (예: https://apihub.kma.go.kr) - 전달 후 응답 저장")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = serve(build_state(args), args.host, args.port)
+    host, port = server.server_address
+    print(f"KMA stand-in: http://{host}:{port}{KMA_PATH_PREFIX}  (climate: http://{host}:{port}{CLIMATE_PATH})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+"""
+엔드투엔드 부하 테스트
+로컬 대역 서버(kma_standin.py)를 업스트림으로 두고 FastAPI 백엔드(uvicorn) 또는
+서버리스 handler를 띄운 뒤, 시나리오 파일에 정의된 요청 혼합으로 부하를 걸어
+엔드포인트별 처리량, p50/p95/p99 지연, 오류율과 서버 프로세스 자원 사용량을 보고
+
+사용 예:
+    python bench/loadtest.py bench/scenarios/mixed.json --target backend
+    python bench/loadtest.py bench/scenarios/mixed.json --target serverless -o results/serverless.json
+    python bench/loadtest.py bench/scenarios/mixed.json --url http://127.0.0.1:8000   # 이미 떠 있는 서버
+    python bench/loadtest.py bench/scenarios/mixed.json --target backend --only explain
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+BACKEND_DIR = os.path.join(REPO_ROOT, "backend")
+SERVERLESS_DIR = os.path.join(REPO_ROOT, "api")
+
+# 서버별 헬스 체크 경로
+HEALTH_PATHS = {"backend": "/health", "serverless": "/api/health"}
+
+STARTUP_TIMEOUT = 30.0
+RESOURCE_SAMPLE_INTERVAL = 0.5
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_serverless(port: int) -> None:
+    """서버리스 handler를 로컬 스레드 서버로 실행 (--serve-serverless 내부 모드)"""
+    from http.server import ThreadingHTTPServer
+
+    sys.path.insert(0, SERVERLESS_DIR)
+    from index import handler
+
+    class Server(ThreadingHTTPServer):
+        # 기본 listen 백로그(5)는 동시 접속 시 SYN 재전송으로 수 초 지연을 만들어 측정을 왜곡
+        request_queue_size = 1024
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", port), handler)
+    server.serve_forever()
+
+
+class Scenario:
+    """
+    시나리오 파일 (JSON)
+    {
+      "name": "...",
+      "mode": "closed" | "open",     closed: 동시 사용자 수 고정, open: 초당 도착률 고정(포아송)
+      "concurrency": 32, "rate": 100,
+      "duration": 30, "warmup": 5,
+      "regions": [...],               {region} 치환 후보 (생략 시 전체 31개 시군)
+      "date_range": ["20260701", "20260831"],   {tm}/{tm1}/{tm2} 치환 범위
+      "period_hours": 24,
+      "upstream": {"latency": "lognormal:80:0.6", "error_rate": 0.01, ...},   kma_standin 옵션
+      "requests": [{"name": "all", "path": "/api/climate/all", "weight": 5, "targets": ["backend"]}]
+    }
+    """
+
+    def __init__(self, config: dict):
+        self.name = config.get("name", "scenario")
+        self.mode = config.get("mode", "closed")
+        self.concurrency = int(config.get("concurrency", 16))
+        self.rate = float(config.get("rate", 50))
+        self.duration = float(config.get("duration", 30))
+        self.warmup = float(config.get("warmup", 5))
+        self.regions = config.get("regions") or default_regions()
+        start, end = config.get("date_range", ["20260701", "20260831"])
+        self.date_start = datetime.strptime(start, "%Y%m%d")
+        self.date_hours = int((datetime.strptime(end, "%Y%m%d") - self.date_start).total_seconds() // 3600)
+        self.period_hours = int(config.get("period_hours", 24))
+        self.upstream = config.get("upstream", {})
+        self.requests = config["requests"]
+
+    @classmethod
+    def load(cls, path: str) -> "Scenario":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def for_target(self, target: str, only=None):
+        requests = [
+            r for r in self.requests
+            if (not r.get("targets") or target in r["targets"]) and (not only or r["name"] in only)
+        ]
+        if not requests:
+            raise SystemExit(f"'{self.name}' 시나리오에 {target} 대상 요청이 없습니다")
+        return requests
+
+    def render(self, path: str, rng: random.Random) -> str:
+        if "{region}" in path:
+            path = path.replace("{region}", quote(rng.choice(self.regions)))
+        if "{tm" in path:
+            hour = rng.randrange(max(1, self.date_hours - self.period_hours))
+            tm1 = self.date_start + timedelta(hours=hour)
+            tm2 = tm1 + timedelta(hours=self.period_hours - 1)
+            path = (path.replace("{tm}", tm1.strftime("%Y%m%d%H00"))
+                        .replace("{tm1}", tm1.strftime("%Y%m%d%H00"))
+                        .replace("{tm2}", tm2.strftime("%Y%m%d%H00")))
+        return path
+
+
+def default_regions():
+    sys.path.insert(0, SERVERLESS_DIR)
+    from index import GYEONGGI_REGIONS
+    return list(GYEONGGI_REGIONS)
+
+
+class EndpointStats:
+    __slots__ = ("latencies", "statuses", "errors", "bytes")
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = {}
+        self.bytes = 0
+
+    def summary(self, elapsed: float) -> dict:
+        lat = sorted(self.latencies)
+        total = len(lat) + sum(self.errors.values())
+        failed = sum(self.errors.values()) + sum(n for s, n in self.statuses.items() if s >= 500)
+        return {
+            "requests": total,
+            "rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": percentile(lat, 50),
+            "p95_ms": percentile(lat, 95),
+            "p99_ms": percentile(lat, 99),
+            "max_ms": round(lat[-1], 2) if lat else None,
+            "error_rate": round(failed / total, 4) if total else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "errors": self.errors,
+            "bytes": self.bytes,
+        }
+
+
+def percentile(sorted_values, pct: float):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return round(sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo), 2)
+
+
+class ProcessMonitor:
+    """/proc 기반 서버 프로세스 자원 사용량 샘플링 (Linux 외에서는 생략)"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self.available = os.path.exists(f"/proc/{pid}/stat")
+        self.rss_peak = 0
+        self.threads_peak = 0
+        self.fds_peak = 0
+        self._cpu_start = None
+        self._wall_start = None
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime, stime (필드 14, 15 → 괄호 뒤 기준 11, 12)
+        return (int(fields[11]) + int(fields[12])) / self.clock_ticks
+
+    def sample(self) -> None:
+        if not self.available:
+            return
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        self.rss_peak = max(self.rss_peak, int(line.split()[1]))
+                    elif line.startswith("Threads:"):
+                        self.threads_peak = max(self.threads_peak, int(line.split()[1]))
+            self.fds_peak = max(self.fds_peak, len(os.listdir(f"/proc/{self.pid}/fd")))
+        except (FileNotFoundError, PermissionError, ProcessLookupError):
+            self.available = False
+
+    def start(self) -> None:
+        if self.available:
+            self._cpu_start = self._cpu_seconds()
+            self._wall_start = time.monotonic()
+            self.sample()
+
+    async def run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(RESOURCE_SAMPLE_INTERVAL)
+
+    def summary(self):
+        if not self.available or self._cpu_start is None:
+            return None
+        cpu = self._cpu_seconds() - self._cpu_start
+        wall = time.monotonic() - self._wall_start
+        return {
+            "cpu_seconds": round(cpu, 2),
+            "cpu_percent": round(cpu / wall * 100, 1) if wall else 0.0,
+            "rss_peak_mb": round(self.rss_peak / 1024, 1),
+            "threads_peak": self.threads_peak,
+            "open_fds_peak": self.fds_peak,
+        }
+
+
+class LoadRun:
+    def __init__(self, scenario: Scenario, requests, base_url: str, seed: int, timeout: float):
+        self.scenario = scenario
+        self.requests = requests
+        self.weights = [r.get("weight", 1) for r in requests]
+        self.base_url = base_url
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.stats = {r["name"]: EndpointStats() for r in requests}
+        self.measure_from = 0.0
+        self.in_flight = 0
+
+    async def one(self, client: httpx.AsyncClient) -> None:
+        request = self.rng.choices(self.requests, self.weights)[0]
+        path = self.scenario.render(request["path"], self.rng)
+        start = time.perf_counter()
+        status = error = None
+        size = 0
+        self.in_flight += 1
+        try:
+            response = await client.get(path)
+            status = response.status_code
+            size = len(response.content)
+        except httpx.TimeoutException:
+            error = "timeout"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        finally:
+            self.in_flight -= 1
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if start < self.measure_from:
+            return  # 워밍업 구간
+        stats = self.stats[request["name"]]
+        if error:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+            return
+        stats.latencies.append(elapsed_ms)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.bytes += size
+
+    async def closed_loop(self, client, deadline: float) -> None:
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self.one(client)
+        await asyncio.gather(*(worker() for _ in range(self.scenario.concurrency)))
+
+    async def open_loop(self, client, deadline: float) -> None:
+        tasks = set()
+        next_at = time.perf_counter()
+        while next_at < deadline:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self.one(client))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            next_at += self.rng.expovariate(self.scenario.rate)
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def run(self, monitor) -> dict:
+        limits = httpx.Limits(max_connections=max(self.scenario.concurrency, 256), max_keepalive_connections=64)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            start = time.perf_counter()
+            self.measure_from = start + self.scenario.warmup
+            deadline = self.measure_from + self.scenario.duration
+
+            async def begin_measure():
+                await asyncio.sleep(self.scenario.warmup)
+                if monitor:
+                    monitor.start()
+
+            sampler = asyncio.create_task(monitor.run()) if monitor else None
+            measure = asyncio.create_task(begin_measure())
+            if self.scenario.mode == "open":
+                await self.open_loop(client, deadline)
+            else:
+                await self.closed_loop(client, deadline)
+            await measure
+            if sampler:
+                sampler.cancel()
+            elapsed = time.perf_counter() - self.measure_from
+
+        endpoints = {name: s.summary(elapsed) for name, s in self.stats.items()}
+        overall = EndpointStats()
+        for s in self.stats.values():
+            overall.latencies.extend(s.latencies)
+            overall.bytes += s.bytes
+            for k, v in s.statuses.items():
+                overall.statuses[k] = overall.statuses.get(k, 0) + v
+            for k, v in s.errors.items():
+                overall.errors[k] = overall.errors.get(k, 0) + v
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "overall": overall.summary(elapsed),
+            "endpoints": endpoints,
+            "resources": monitor.summary() if monitor else None,
+        }
+
+
+def start_process(args, cwd, env, name):
+    # 요청 로그로 파이프가 차서 서버가 멈추지 않도록 stderr는 임시 파일로 받음
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(args, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    process.label = name
+    process.log = log
+    return process
+
+
+def wait_ready(url: str, process) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            process.log.seek(0)
+            stderr = process.log.read().decode(errors="replace")
+            raise SystemExit(f"{process.label} 시작 실패:\n{stderr}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"{url} 준비 대기 시간 초과")
+
+
+def standin_args(upstream: dict, port: int, seed: int):
+    args = [sys.executable, os.path.join(BENCH_DIR, "kma_standin.py"), "--port", str(port), "--seed", str(seed)]
+    for key, value in upstream.items():
+        args += [f"--{key.replace('_', '-')}", str(value)]
+    return args
+
+
+def launch(target: str, scenario: Scenario, seed: int, workers: int):
+    """대역 서버와 대상 서버를 띄우고 (기준 URL, 서버 프로세스, 정리할 프로세스 목록) 반환"""
+    standin_port = free_port()
+    standin = start_process(standin_args(scenario.upstream, standin_port, seed), BENCH_DIR, os.environ.copy(), "kma_standin")
+    wait_ready(f"http://127.0.0.1:{standin_port}/__stats", standin)
+
+    env = os.environ.copy()
+    env.update({
+        "KMA_BASE_URL": f"http://127.0.0.1:{standin_port}/api/typ01/url",
+        "CLIMATE_API_BASE_URL": f"http://127.0.0.1:{standin_port}/climate",
+        # 외부 서비스 호출 방지 (빈 값이면 폴백 경로 사용)
+        "SUPABASE_URL": "",
+        "SUPABASE_KEY": "",
+        "OPENAI_API_KEY": "",
+    })
+    port = free_port()
+    if target == "backend":
+        args = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                "--log-level", "warning", "--no-access-log"]
+        if workers > 1:
+            args += ["--workers", str(workers)]
+        server = start_process(args, BACKEND_DIR, env, "uvicorn")
+    else:
+        server = start_process([sys.executable, os.path.abspath(__file__), "--serve-serverless", str(port)],
+                               BENCH_DIR, env, "serverless")
+
+    base_url = f"http://127.0.0.1:{port}"
+    wait_ready(base_url + HEALTH_PATHS[target], server)
+    return base_url, server, [server, standin]
+
+
+def print_report(report: dict) -> None:
+    print(f"\n== {report['scenario']} / {report['target']} ({report['elapsed_seconds']}s) ==")
+    header = f"{'endpoint':16} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'err%':>6}"
+    print(header)
+    rows = list(report["endpoints"].items()) + [("ALL", report["overall"])]
+    for name, s in rows:
+        fmt = lambda v: f"{v:8.1f}" if v is not None else f"{'-':>8}"
+        print(f"{name:16} {s['requests']:>7} {s['rps']:>8.1f} {fmt(s['p50_ms'])} {fmt(s['p95_ms'])} "
+              f"{fmt(s['p99_ms'])} {fmt(s['max_ms'])} {s['error_rate'] * 100:>5.1f}%")
+    resources = report.get("resources")
+    if resources:
+        print(f"server: cpu {resources['cpu_percent']}%  rss peak {resources['rss_peak_mb']} MB  "
+              f"threads {resources['threads_peak']}  fds {resources['open_fds_peak']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="API 엔드투엔드 부하 테스트")
+    parser.add_argument("scenario", nargs="?", help="시나리오 JSON 경로")
+    parser.add_argument("--target", choices=["backend", "serverless"], default="backend")
+    parser.add_argument("--url", help="이미 실행 중인 서버 기준 URL (서버/대역 서버를 띄우지 않음)")
+    parser.add_argument("--only", help="쉼표로 구분한 요청 이름만 실행 (엔드포인트별 자원 사용량 분리 측정용)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수")
+    parser.add_argument("--timeout", type=float, default=30.0, help="요청 타임아웃(초)")
+    parser.add_argument("--seed", type=int, default=1227)
+    parser.add_argument("-o", "--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--serve-serverless", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.serve_serverless:
+        serve_serverless(args.serve_serverless)
+        return 0
+    if not args.scenario:
+        raise SystemExit("시나리오 파일을 지정하세요")
+
+    scenario = Scenario.load(args.scenario)
+    requests = scenario.for_target(args.target, args.only.split(",") if args.only else None)
+
+    processes = []
+    try:
+        if args.url:
+            base_url, server = args.url.rstrip("/"), None
+        else:
+            base_url, server, processes = launch(args.target, scenario, args.seed, args.workers)
+        monitor = ProcessMonitor(server.pid) if server else None
+
+        result = asyncio.run(LoadRun(scenario, requests, base_url, args.seed, args.timeout).run(monitor))
+    finally:
+        for process in processes:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    report = {
+        "scenario": scenario.name,
+        "target": args.url or args.target,
+        "mode": scenario.mode,
+        "concurrency": scenario.concurrency if scenario.mode == "closed" else None,
+        "rate": scenario.rate if scenario.mode == "open" else None,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        **result,
+    }
+    print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+핫패스 마이크로벤치마크
+파싱/점수 계산/직렬화를 고정 픽스처와 고정 시드로 측정하고 결과를 JSON으로 저장
+
+사용 예:
+    python bench/microbench.py -o results/base.json
+    python bench/microbench.py -o results/new.json --compare results/base.json
+    python bench/microbench.py --filter parse --repeat 9
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import fixtures
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+BACKEND_DIR = os.path.join(REPO_ROOT, "backend")
+SERVERLESS_PATH = os.path.join(REPO_ROOT, "api", "index.py")
+
+DEFAULT_SEED = 1227
+
+# 고정 픽스처: 단일 시각 전국(95개 관측소), 하루 전국(2,280행), 3일 단기예보
+FIXTURE_TM = "202607151400"
+FIXTURE_DAY = ("202607150000", "202607152300")
+FIXTURE_FORECAST_REG = "11B20601"
+
+# 비교 시 유의미한 변화로 보는 비율
+SIGNIFICANT_CHANGE = 0.05
+
+
+def load_serverless():
+    """api/index.py를 모듈로 로드 (백엔드 모듈 이름과 겹치지 않게 별칭 사용)"""
+    spec = importlib.util.spec_from_file_location("serverless_index", SERVERLESS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_backend():
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import climate_api
+    import climate_index
+    import kma_proxy
+    return climate_api, climate_index, kma_proxy
+
+
+def load_backend_models():
+    """FastAPI 응답 모델 (main 임포트 실패 시 None)"""
+    try:
+        import main
+    except Exception as e:
+        print(f"[skip] backend 응답 모델 로드 실패: {e}", file=sys.stderr)
+        return None
+    return main
+
+
+def build_benchmarks(seed: int):
+    """
+    (이름, 준비 함수, 측정 함수) 목록
+    준비 함수는 측정 전 매 반복마다 호출되어 난수 상태를 고정
+    """
+    single_text = fixtures.kma_sfctm2(FIXTURE_TM).decode("utf-8")
+    day_text = fixtures.kma_sfctm3(*FIXTURE_DAY).decode("utf-8")
+    forecast_text = fixtures.fct_afs_dl(FIXTURE_FORECAST_REG).decode("euc-kr")
+
+    def reseed():
+        random.seed(seed)
+
+    serverless = load_serverless()
+    climate_api, climate_index, kma_proxy = load_backend()
+    main = load_backend_models()
+
+    # 점수 계산 입력은 시드 고정 목 데이터 한 벌을 재사용
+    random.seed(seed)
+    backend_rows = climate_api.get_all_mock_data()
+    random.seed(seed)
+    serverless_rows = serverless.fill_apparent_temperature(
+        [serverless.get_mock_climate_data(r) for r in serverless.GYEONGGI_REGIONS]
+    )
+    backend_scores = [climate_index.calculate_climate_score(row)[0] for row in backend_rows]
+    serverless_scores = [serverless.calculate_climate_score(row)[0] for row in serverless_rows]
+    targets = list(climate_index.TargetGroup)
+    serverless_targets = list(serverless.TARGET_MULTIPLIERS)
+
+    random.seed(seed)
+    serverless_payload = serverless.get_all_climate_data()
+    import columnar
+    day_result = {"success": True, "count": 0, "columns": kma_proxy.add_apparent_temperature(
+        kma_proxy.parse_kma_columns(day_text))}
+
+    def score_all_backend():
+        for row in backend_rows:
+            climate_index.calculate_climate_score(row)
+
+    def score_all_serverless():
+        for row in serverless_rows:
+            serverless.calculate_climate_score(row)
+
+    def adjust_all_backend():
+        for target in targets:
+            for score in backend_scores:
+                climate_index.adjust_score_for_target(score, target)
+
+    def adjust_all_serverless():
+        for target in serverless_targets:
+            for score in serverless_scores:
+                serverless.adjust_score_for_target(score, target)
+
+    benchmarks = [
+        ("parse_kma_response.backend.single", None, lambda: kma_proxy.parse_kma_response(single_text)),
+        ("parse_kma_response.backend.day", None, lambda: kma_proxy.parse_kma_response(day_text)),
+        ("parse_kma_response.serverless.single", None, lambda: serverless.parse_kma_response(single_text)),
+        ("parse_kma_response.serverless.day", None, lambda: serverless.parse_kma_response(day_text)),
+        ("parse_kma_columns.backend.day", None, lambda: kma_proxy.parse_kma_columns(day_text)),
+        ("serialize.backend.kma_day.json", None,
+         lambda: kma_proxy.kma_json(day_result)),
+        ("serialize.backend.kma_day.msgpack", None,
+         lambda: columnar.packb(kma_proxy.kma_columnar(day_result))),
+        ("parse_kma_hub_forecast.serverless", None, lambda: serverless.parse_kma_hub_forecast(forecast_text)),
+        ("calculate_climate_score.backend.all_regions", None, score_all_backend),
+        ("calculate_climate_score.serverless.all_regions", None, score_all_serverless),
+        ("adjust_score_for_target.backend.all_targets", None, adjust_all_backend),
+        ("adjust_score_for_target.serverless.all_targets", None, adjust_all_serverless),
+        ("get_all_climate_data.serverless", reseed, lambda: serverless.get_all_climate_data("elderly")),
+        ("get_all_mock_data.backend", reseed, climate_api.get_all_mock_data),
+        ("serialize.serverless.all_regions", None,
+         lambda: json.dumps(serverless_payload, ensure_ascii=False).encode("utf-8")),
+    ]
+
+    if main is not None:
+        def build_backend_response():
+            return main.AllRegionsResponse(
+                regions=[
+                    main.ClimateScore(
+                        region=row["region"],
+                        lat=row["lat"],
+                        lng=row["lng"],
+                        score=score,
+                        adjusted_score=None,
+                        risk_level="safe",
+                        risk_label="안전",
+                        risk_color="#4CAF50",
+                        climate_data=main.ClimateData(**row),
+                    )
+                    for row, score in zip(backend_rows, backend_scores)
+                ],
+                timestamp=datetime(2026, 7, 15, 14, 0).isoformat(),
+            )
+
+        backend_response = build_backend_response()
+        benchmarks.append(("serialize.backend.build_models", None, build_backend_response))
+        benchmarks.append(("serialize.backend.model_dump_json", None, backend_response.model_dump_json))
+
+    return benchmarks
+
+
+def calibrate(func, setup, min_time: float) -> int:
+    """한 반복이 min_time 이상 걸리도록 호출 횟수 결정"""
+    number = 1
+    while True:
+        elapsed = run_once(func, setup, number)
+        if elapsed >= min_time or number >= 1 << 20:
+            return number
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+
+
+def run_once(func, setup, number: int) -> float:
+    if setup:
+        setup()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def measure(func, setup, repeat: int, min_time: float) -> dict:
+    func()  # 워밍업 (지연 초기화/캐시)
+    number = calibrate(func, setup, min_time)
+    per_call = [run_once(func, setup, number) / number * 1e6 for _ in range(repeat)]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "mean_us": round(statistics.fmean(per_call), 3),
+        "stdev_us": round(statistics.stdev(per_call), 3) if repeat > 1 else 0.0,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """기준 결과 대비 median 변화율 출력"""
+    base_results = baseline.get("results", {})
+    print(f"\n비교: {baseline.get('meta', {}).get('commit', '?')} → {current['meta']['commit']}")
+    print(f"{'benchmark':52} {'base(us)':>12} {'now(us)':>12} {'change':>9}")
+    for name, result in current["results"].items():
+        base = base_results.get(name)
+        if not base:
+            print(f"{name:52} {'-':>12} {result['median_us']:>12.2f} {'new':>9}")
+            continue
+        ratio = result["median_us"] / base["median_us"] - 1
+        flag = ""
+        if ratio <= -SIGNIFICANT_CHANGE:
+            flag = " faster"
+        elif ratio >= SIGNIFICANT_CHANGE:
+            flag = " SLOWER"
+        print(f"{name:52} {base['median_us']:>12.2f} {result['median_us']:>12.2f} {ratio:>+8.1%}{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="파싱/점수/직렬화 마이크로벤치마크")
+    parser.add_argument("-o", "--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--filter", help="이름에 이 문자열이 포함된 벤치마크만 실행")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="반복 1회 최소 측정 시간(초)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    benchmarks = build_benchmarks(args.seed)
+    if args.filter:
+        benchmarks = [b for b in benchmarks if args.filter in b[0]]
+
+    results = {}
+    for name, setup, func in benchmarks:
+        results[name] = measure(func, setup, args.repeat, args.min_time)
+        r = results[name]
+        print(f"{name:52} median {r['median_us']:>12.2f} us  (min {r['min_us']:.2f}, ±{r['stdev_us']:.2f}, n={r['number']})")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
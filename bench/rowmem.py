@@ -0,0 +1,123 @@
+"""
+관측 응답 메모리 측정
+여러 날 전국(95개 관측소) 시간별 관측 픽스처를 파싱해 유지 메모리와 JSON 직렬화 최대 메모리를 행당 바이트로 비교
+모든 값은 컬럼 버퍼(parse_kma_columns, 값 객체 포함)를 포함한 합계
+- columns: 컬럼 버퍼만 (응답 경로가 유지하는 형태)
+- dict_rows: 컬럼 버퍼 + 행마다 46개 키 dict (kma_rows, 값 객체는 버퍼와 공유)
+- json_peak.dict_rows: 컬럼 버퍼 + 행 dict 목록을 한 번에 직렬화할 때 최대 메모리 (이전 kma_json + JSONResponse)
+- json_peak.kma_json: 컬럼 버퍼 + JSON_CHUNK_ROWS행씩 직렬화할 때 최대 메모리 (kma_json)
+
+사용 예:
+    python bench/rowmem.py
+    python bench/rowmem.py --days 14 -o bench/results/rowmem.json
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+import fixtures
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(os.path.dirname(BENCH_DIR), "backend")
+
+DEFAULT_START = "202607150000"
+DEFAULT_DAYS = 7
+
+
+def load_kma_proxy():
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import kma_proxy
+    return kma_proxy
+
+
+def retained(build):
+    """build() 결과가 유지하는 메모리 (바이트) → (결과, 바이트)"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def peak(run):
+    """run() 실행 중 최대 추가 메모리 (바이트, 결과는 버리지 않고 포함)"""
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = run()
+    used = tracemalloc.get_traced_memory()[1] - before
+    del result
+    return used
+
+
+def dict_rows(columns):
+    """이전 kma_rows: 행마다 dict"""
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def dict_json(kma_proxy, result):
+    """이전 kma_json + JSONResponse 직렬화"""
+    body = {key: value for key, value in result.items() if key != "columns"}
+    body["data"] = dict_rows(result["columns"])
+    return kma_proxy._dumps(body).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="관측 행 표현별 메모리 측정")
+    parser.add_argument("--start", default=DEFAULT_START, help="시작 시각 (YYYYMMDDHHMM)")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="기간 (일)")
+    parser.add_argument("-o", "--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    kma_proxy = load_kma_proxy()
+    end = datetime.strptime(args.start, "%Y%m%d%H%M") + timedelta(days=args.days, hours=-1)
+    text = fixtures.kma_sfctm3(args.start, end.strftime("%Y%m%d%H%M")).decode("utf-8")
+
+    tracemalloc.start()
+    columns, columns_bytes = retained(lambda: kma_proxy.add_apparent_temperature(kma_proxy.parse_kma_columns(text)))
+    rows = len(columns["TM"])
+    result = {"success": True, "count": rows, "columns": columns}
+
+    value, rows_bytes = retained(lambda: kma_proxy.kma_rows(columns))
+    del value
+    # 컬럼 버퍼는 응답이 끝날 때까지 함께 살아 있으므로 모든 값에 포함
+    measured = {
+        "columns": columns_bytes,
+        "dict_rows": columns_bytes + rows_bytes,
+        "json_peak.dict_rows": columns_bytes + peak(lambda: dict_json(kma_proxy, result)),
+        "json_peak.kma_json": columns_bytes + peak(lambda: kma_proxy.kma_json(result)),
+    }
+    tracemalloc.stop()
+
+    assert dict_json(kma_proxy, result) == kma_proxy.kma_json(result), "JSON 출력이 다릅니다"
+
+    report = {
+        "start": args.start,
+        "days": args.days,
+        "rows": rows,
+        "columns": len(columns),
+        "python": sys.version.split()[0],
+        "bytes_per_row": {name: round(value / rows, 1) for name, value in measured.items()},
+        "total_mib": {name: round(value / 2 ** 20, 2) for name, value in measured.items()},
+    }
+    print(f"{rows:,}행 × {len(columns)}컬럼 ({args.days}일, 전국)")
+    print(f"{'표현':<22}{'행당 바이트':>12}{'합계 MiB':>12}")
+    for name in measured:
+        print(f"{name:<22}{report['bytes_per_row'][name]:>12,.1f}{report['total_mib'][name]:>12,.2f}")
+    print(f"컬럼 버퍼 / 행 dict 유지: {measured['columns'] / measured['dict_rows']:.1%}, "
+          f"JSON 최대 메모리 kma_json / 행 dict: {measured['json_peak.kma_json'] / measured['json_peak.dict_rows']:.1%}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
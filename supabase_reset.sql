@@ -14,6 +14,8 @@ DROP POLICY IF EXISTS "Users can view own notification settings" ON notification
 DROP POLICY IF EXISTS "Users can insert own notification settings" ON notification_subscriptions;
 DROP POLICY IF EXISTS "Users can update own notification settings" ON notification_subscriptions;
 DROP POLICY IF EXISTS "Users can delete own notification settings" ON notification_subscriptions;
+DROP POLICY IF EXISTS "Allow public read access on user_report_hourly_stats" ON user_report_hourly_stats;
+DROP POLICY IF EXISTS "Allow public read access on climate_score_history" ON climate_score_history;
 
 -- 기존 트리거 삭제
 DROP TRIGGER IF EXISTS on_auth_user_created ON auth.users;
@@ -47,6 +47,16 @@ BEGIN
     DROP POLICY IF EXISTS "Users can update own notification settings" ON notification_subscriptions;
     DROP POLICY IF EXISTS "Users can delete own notification settings" ON notification_subscriptions;
   END IF;
+
+  -- user_report_hourly_stats
+  IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'user_report_hourly_stats') THEN
+    DROP POLICY IF EXISTS "Allow public read access on user_report_hourly_stats" ON user_report_hourly_stats;
+  END IF;
+
+  -- climate_score_history
+  IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'climate_score_history') THEN
+    DROP POLICY IF EXISTS "Allow public read access on climate_score_history" ON climate_score_history;
+  END IF;
 END $$;
 
 -- 트리거/함수/뷰 삭제
@@ -150,6 +160,7 @@ CREATE TABLE IF NOT EXISTS notification_subscriptions (
   user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE UNIQUE,
   regions TEXT[] NOT NULL DEFAULT '{}',
   threshold INTEGER DEFAULT 50,
+  target VARCHAR(20) DEFAULT 'general',  -- 임계값 비교 기준 대상 (elderly/child/outdoor/general)
   notify_types JSONB DEFAULT '{"highTemp": true, "dust": true, "uv": true}',
   is_active BOOLEAN DEFAULT true,
   push_subscription JSONB,
@@ -157,6 +168,27 @@ CREATE TABLE IF NOT EXISTS notification_subscriptions (
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+CREATE TABLE IF NOT EXISTS user_report_hourly_stats (
+  region VARCHAR(50) NOT NULL,
+  bucket TIMESTAMP WITH TIME ZONE NOT NULL,       -- 시간 단위 버킷 (date_trunc('hour'))
+  report_count INTEGER NOT NULL DEFAULT 0,
+  sentiment_sum INTEGER NOT NULL DEFAULT 0,
+  air_quality_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (region, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS climate_score_history (
+  id BIGSERIAL PRIMARY KEY,
+  region VARCHAR(50) NOT NULL,
+  recorded_at TIMESTAMP WITH TIME ZONE NOT NULL,  -- 스냅샷 갱신 시각
+  score SMALLINT NOT NULL,
+  temperature REAL,
+  apparent_temperature REAL,
+  humidity REAL,
+  pm10 REAL,
+  pm25 REAL
+);
+
 -- ========================================
 -- 2. RLS 활성화
 -- ========================================
@@ -168,6 +200,8 @@ ALTER TABLE user_reports ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_profiles ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_favorite_regions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE notification_subscriptions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_report_hourly_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE climate_score_history ENABLE ROW LEVEL SECURITY;
 
 -- ========================================
 -- 3. RLS 정책 생성
@@ -220,6 +254,12 @@ CREATE POLICY "Users can update own notification settings"
 CREATE POLICY "Users can delete own notification settings"
   ON notification_subscriptions FOR DELETE USING (auth.uid() = user_id);
 
+CREATE POLICY "Allow public read access on user_report_hourly_stats"
+  ON user_report_hourly_stats FOR SELECT USING (true);
+
+CREATE POLICY "Allow public read access on climate_score_history"
+  ON climate_score_history FOR SELECT USING (true);
+
 -- ========================================
 -- 4. 인덱스 생성
 -- ========================================
@@ -244,6 +284,10 @@ CREATE INDEX IF NOT EXISTS idx_user_profiles_phone ON user_profiles(phone);
 CREATE INDEX IF NOT EXISTS idx_user_favorite_regions_user ON user_favorite_regions(user_id);
 CREATE INDEX IF NOT EXISTS idx_notification_subscriptions_user ON notification_subscriptions(user_id);
 CREATE INDEX IF NOT EXISTS idx_notification_subscriptions_active ON notification_subscriptions(is_active) WHERE is_active = true;
+CREATE INDEX IF NOT EXISTS idx_user_report_hourly_stats_bucket ON user_report_hourly_stats(bucket);
+CREATE INDEX IF NOT EXISTS idx_climate_score_history_region_time ON climate_score_history(region, recorded_at);
+-- 재시작 시 이력 적재 keyset 페이지 조회용
+CREATE INDEX IF NOT EXISTS idx_climate_score_history_time_id ON climate_score_history(recorded_at, id);
 
 -- ========================================
 -- 5. 뷰 생성
@@ -268,6 +312,9 @@ GROUP BY region;
 ALTER TABLE user_reports ADD COLUMN IF NOT EXISTS user_id UUID;
 ALTER TABLE user_reports ADD COLUMN IF NOT EXISTS nickname VARCHAR(50);
 
+-- notification_subscriptions 추가 컬럼 (서버 알림 엔진의 대상 보정 기준)
+ALTER TABLE notification_subscriptions ADD COLUMN IF NOT EXISTS target VARCHAR(20) DEFAULT 'general';
+
 -- ========================================
 -- 7. 함수 및 트리거
 -- ========================================
@@ -301,10 +348,40 @@ BEGIN
         updated_at = NOW()
     WHERE id = NEW.user_id;
   END IF;
+
+  -- 지역/시간대별 제보 집계 증분 갱신
+  INSERT INTO user_report_hourly_stats (region, bucket, report_count, sentiment_sum, air_quality_count)
+  VALUES (
+    NEW.region,
+    date_trunc('hour', COALESCE(NEW.created_at, NOW())),
+    1,
+    COALESCE(NEW.sentiment_score, 0),
+    CASE WHEN NEW.is_air_quality THEN 1 ELSE 0 END
+  )
+  ON CONFLICT (region, bucket) DO UPDATE SET
+    report_count = user_report_hourly_stats.report_count + 1,
+    sentiment_sum = user_report_hourly_stats.sentiment_sum + EXCLUDED.sentiment_sum,
+    air_quality_count = user_report_hourly_stats.air_quality_count + EXCLUDED.air_quality_count;
+
   RETURN NEW;
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
+-- 기존 제보로 집계 테이블 채우기 (재실행해도 동일 결과)
+INSERT INTO user_report_hourly_stats (region, bucket, report_count, sentiment_sum, air_quality_count)
+SELECT
+  region,
+  date_trunc('hour', created_at),
+  COUNT(*),
+  COALESCE(SUM(sentiment_score), 0),
+  COUNT(*) FILTER (WHERE is_air_quality)
+FROM user_reports
+GROUP BY region, date_trunc('hour', created_at)
+ON CONFLICT (region, bucket) DO UPDATE SET
+  report_count = EXCLUDED.report_count,
+  sentiment_sum = EXCLUDED.sentiment_sum,
+  air_quality_count = EXCLUDED.air_quality_count;
+
 CREATE TRIGGER on_report_created
   AFTER INSERT ON user_reports
   FOR EACH ROW EXECUTE FUNCTION public.update_user_report_stats();
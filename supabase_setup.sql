@@ -288,6 +288,39 @@ CREATE TRIGGER on_auth_user_created
   AFTER INSERT ON auth.users
   FOR EACH ROW EXECUTE FUNCTION public.handle_new_user();
 
+-- 22-1. 지역/시간대별 제보 집계 테이블 (지도용 제보 수, 트리거로 증분 갱신)
+CREATE TABLE IF NOT EXISTS user_report_hourly_stats (
+  region VARCHAR(50) NOT NULL,
+  bucket TIMESTAMP WITH TIME ZONE NOT NULL,       -- 시간 단위 버킷 (date_trunc('hour'))
+  report_count INTEGER NOT NULL DEFAULT 0,
+  sentiment_sum INTEGER NOT NULL DEFAULT 0,
+  air_quality_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (region, bucket)
+);
+
+ALTER TABLE user_report_hourly_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access on user_report_hourly_stats"
+  ON user_report_hourly_stats FOR SELECT
+  USING (true);
+
+CREATE INDEX IF NOT EXISTS idx_user_report_hourly_stats_bucket ON user_report_hourly_stats(bucket);
+
+-- 22-2. 기존 제보로 집계 테이블 채우기 (재실행해도 동일 결과)
+INSERT INTO user_report_hourly_stats (region, bucket, report_count, sentiment_sum, air_quality_count)
+SELECT
+  region,
+  date_trunc('hour', created_at),
+  COUNT(*),
+  COALESCE(SUM(sentiment_score), 0),
+  COUNT(*) FILTER (WHERE is_air_quality)
+FROM user_reports
+GROUP BY region, date_trunc('hour', created_at)
+ON CONFLICT (region, bucket) DO UPDATE SET
+  report_count = EXCLUDED.report_count,
+  sentiment_sum = EXCLUDED.sentiment_sum,
+  air_quality_count = EXCLUDED.air_quality_count;
+
 -- 23. 제보 시 사용자 통계 업데이트 함수
 CREATE OR REPLACE FUNCTION public.update_user_report_stats()
 RETURNS TRIGGER AS $$
@@ -299,6 +332,21 @@ BEGIN
         updated_at = NOW()
     WHERE id = NEW.user_id;
   END IF;
+
+  -- 지역/시간대별 제보 집계 증분 갱신
+  INSERT INTO user_report_hourly_stats (region, bucket, report_count, sentiment_sum, air_quality_count)
+  VALUES (
+    NEW.region,
+    date_trunc('hour', COALESCE(NEW.created_at, NOW())),
+    1,
+    COALESCE(NEW.sentiment_score, 0),
+    CASE WHEN NEW.is_air_quality THEN 1 ELSE 0 END
+  )
+  ON CONFLICT (region, bucket) DO UPDATE SET
+    report_count = user_report_hourly_stats.report_count + 1,
+    sentiment_sum = user_report_hourly_stats.sentiment_sum + EXCLUDED.sentiment_sum,
+    air_quality_count = user_report_hourly_stats.air_quality_count + EXCLUDED.air_quality_count;
+
   RETURN NEW;
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
@@ -319,6 +367,7 @@ CREATE TABLE IF NOT EXISTS notification_subscriptions (
   user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE UNIQUE,
   regions TEXT[] NOT NULL DEFAULT '{}',           -- 관심 지역 목록
   threshold INTEGER DEFAULT 50,                    -- 위험도 임계값 (30, 50, 75)
+  target VARCHAR(20) DEFAULT 'general',            -- 임계값 비교 기준 대상 (elderly/child/outdoor/general)
   notify_types JSONB DEFAULT '{"highTemp": true, "dust": true, "uv": true}',
   is_active BOOLEAN DEFAULT true,
   push_subscription JSONB,                         -- Web Push 구독 정보
@@ -326,6 +375,9 @@ CREATE TABLE IF NOT EXISTS notification_subscriptions (
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- 기존 테이블 호환: 추가 컬럼 (서버 알림 엔진의 대상 보정 기준)
+ALTER TABLE notification_subscriptions ADD COLUMN IF NOT EXISTS target VARCHAR(20) DEFAULT 'general';
+
 -- 26. notification_subscriptions RLS 및 정책
 ALTER TABLE notification_subscriptions ENABLE ROW LEVEL SECURITY;
 
@@ -349,3 +401,32 @@ CREATE POLICY "Users can delete own notification settings"
 -- 27. notification_subscriptions 인덱스
 CREATE INDEX IF NOT EXISTS idx_notification_subscriptions_user ON notification_subscriptions(user_id);
 CREATE INDEX IF NOT EXISTS idx_notification_subscriptions_active ON notification_subscriptions(is_active) WHERE is_active = true;
+
+-- ========================================
+-- 기후 점수 이력 테이블
+-- ========================================
+
+-- 28. 지역별 점수 이력 (스냅샷 갱신마다 추가, 수정/삭제 없음)
+CREATE TABLE IF NOT EXISTS climate_score_history (
+  id BIGSERIAL PRIMARY KEY,
+  region VARCHAR(50) NOT NULL,
+  recorded_at TIMESTAMP WITH TIME ZONE NOT NULL,  -- 스냅샷 갱신 시각
+  score SMALLINT NOT NULL,
+  temperature REAL,
+  apparent_temperature REAL,
+  humidity REAL,
+  pm10 REAL,
+  pm25 REAL
+);
+
+-- 29. climate_score_history RLS 및 정책
+ALTER TABLE climate_score_history ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access on climate_score_history"
+  ON climate_score_history FOR SELECT
+  USING (true);
+
+-- 30. climate_score_history 인덱스
+CREATE INDEX IF NOT EXISTS idx_climate_score_history_region_time ON climate_score_history(region, recorded_at);
+-- 재시작 시 이력 적재 keyset 페이지 조회용
+CREATE INDEX IF NOT EXISTS idx_climate_score_history_time_id ON climate_score_history(recorded_at, id);